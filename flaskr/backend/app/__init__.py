@@ -10,7 +10,7 @@ from flask_cors import CORS
 from sqlalchemy import create_engine
 from flask.cli import with_appcontext
 
-from app.db import db
+from app.db import db, upgrade_schema
 from app.models import Users, Post, UserResults, Fixture
 from app.monitoring import CloudWatchHandler, CustomJSONFormatter, RateLimiter, ApplicationMonitor
 
@@ -53,6 +53,7 @@ def init_services(app):
             from app.services.match_monitor import MatchMonitorService
             from app.services.task_scheduler import TaskScheduler
             from app.services.score_processing import ScoreProcessingService
+            from app.services.analytics_warmer import AnalyticsWarmer
             from app.models import MatchStatus, GroupPrivacyType, MemberRole, PredictionStatus
             
             app.logger.info("Starting API services initialization...")
@@ -82,6 +83,11 @@ def init_services(app):
             score_processor = ScoreProcessingService(football_api)
             app.config['SCORE_PROCESSOR'] = score_processor
             app.logger.info("ScoreProcessingService initialized successfully")
+
+            # Refreshes group analytics in the background once a round has settled
+            app.config['ANALYTICS_WARMER'] = AnalyticsWarmer(
+                max_workers=app.config.get('ANALYTICS_WARM_WORKERS', 4)
+            )
             
             # Initialize match monitoring
             match_monitor = MatchMonitorService(
@@ -201,6 +207,7 @@ def create_app(test_config=None):
         # Create database tables if needed
         if app.config.get('CREATE_TABLES_ON_STARTUP'):
             db.create_all()
+            upgrade_schema()
             app.logger.info("Database tables created successfully")
         
         # Initialize services
@@ -8,6 +8,8 @@ from app.services.group_service import GroupService
 from app.services.permission_service import PermissionService
 from app.services.analytics_service import AnalyticsService
 from app.services.team_service import TeamService
+from app.services.standings_service import StandingsService
+from app.services.provisional_standings import ProvisionalStandingsService
 
 bp = Blueprint('groups', __name__, url_prefix='/groups')
 
@@ -175,6 +177,65 @@ def get_group(group_id):
             'message': 'Error fetching group details'
         }), HTTPStatus.INTERNAL_SERVER_ERROR
 
+@bp.route('/<int:group_id>/standings', methods=['GET'])
+@login_required_api
+def get_group_standings(group_id: int):
+    """Get the group leaderboard"""
+    try:
+        if not PermissionService.check_group_permission(current_user.id, group_id, MemberRole.MEMBER):
+            return jsonify({
+                'status': 'error',
+                'message': 'Unauthorized access'
+            }), HTTPStatus.FORBIDDEN
+
+        standings = StandingsService.get_leaderboard(
+            group_id,
+            season=request.args.get('season'),
+            limit=request.args.get('limit', type=int),
+            offset=request.args.get('offset', 0, type=int)
+        )
+        return jsonify({
+            'status': 'success',
+            'data': standings
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching group standings: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to fetch group standings'
+        }), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/<int:group_id>/standings/live', methods=['GET'])
+@login_required_api
+def get_group_provisional_standings(group_id: int):
+    """Get the group leaderboard as it stands with live scores"""
+    try:
+        if not PermissionService.check_group_permission(current_user.id, group_id, MemberRole.MEMBER):
+            return jsonify({
+                'status': 'error',
+                'message': 'Unauthorized access'
+            }), HTTPStatus.FORBIDDEN
+
+        standings = ProvisionalStandingsService().get(group_id)
+        if standings is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Group not found'
+            }), HTTPStatus.NOT_FOUND
+
+        return jsonify({
+            'status': 'success',
+            'data': standings
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching provisional standings: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to fetch provisional standings'
+        }), HTTPStatus.INTERNAL_SERVER_ERROR
+
 @bp.route('/<int:group_id>', methods=['PUT'])
 @login_required_api
 def update_group(group_id):
@@ -1,12 +1,11 @@
 import boto3
 import os
-import time
 from botocore.exceptions import ClientError
 from flask import current_app
 from app.services.football_api import FootballAPIService
 from app.services.score_processing import ScoreProcessingService
-from app.models import db, Fixture, Team
-from app.db import get_teams_from_fixtures
+from app.services.fixture_ingestion import FixtureIngestionService
+from app.services.ingestion_orchestrator import IngestionOrchestrator
 from datetime import datetime, timezone
 
 def get_secret():
@@ -70,118 +69,25 @@ def populate_initial_data():
         }
         
         season = 2024
+        ingestion = FixtureIngestionService()
 
-        status_mapping = {
-            "Not Started": "NOT_STARTED",
-            "First Half": "FIRST_HALF",
-            "Halftime": "HALFTIME",
-            "Second Half": "SECOND_HALF",
-            "Extra Time": "EXTRA_TIME",
-            "Penalty In Progress": "PENALTY",
-            "Match Finished": "FINISHED",
-            "Match Finished After Extra Time": "FINISHED_AET",
-            "Match Finished After Penalty": "FINISHED_PEN",
-            "Break Time": "BREAK_TIME",
-            "Match Suspended": "SUSPENDED",
-            "Match Interrupted": "INTERRUPTED",
-            "Match Postponed": "POSTPONED",
-            "Match Cancelled": "CANCELLED",
-            "Match Abandoned": "ABANDONED",
-            "Technical Loss": "TECHNICAL_LOSS",
-            "Walkover": "WALKOVER",
-            "Live": "LIVE"
-        }
-
-        # Step 1: Populate fixtures table
-        for league_name, league_id in leagues.items():
-            try:
-                current_app.logger.info(f"Processing league: {league_name} for season {season}")
-                
-                fixtures = football_api.get_fixtures_by_season(league_id=league_id, season=season)
-                
-                if not fixtures:
-                    current_app.logger.info(f"No fixtures found for {league_name} in season {season}")
-                    time.sleep(0.5)  # Small delay between leagues even on empty results
-                    continue
-                
-                for fixture_data in fixtures:
-                    try:
-                        fixture_date = fixture_data['fixture']['date']
-                        if isinstance(fixture_date, int):
-                            fixture_datetime = datetime.fromtimestamp(fixture_date)
-                        else:
-                            fixture_datetime = datetime.strptime(fixture_date, '%Y-%m-%dT%H:%M:%S%z')
-                        
-                        status = status_mapping.get(
-                            fixture_data['fixture']['status']['long'],
-                            "NOT_STARTED"
-                        )
-                        
-                        existing_fixture = Fixture.query.filter_by(
-                            fixture_id=fixture_data['fixture']['id']
-                        ).first()
-                        
-                        if not existing_fixture:
-                            new_fixture = Fixture(
-                                fixture_id=fixture_data['fixture']['id'],
-                                home_team=fixture_data['teams']['home']['name'],
-                                away_team=fixture_data['teams']['away']['name'],
-                                home_team_logo=fixture_data['teams']['home']['logo'],
-                                away_team_logo=fixture_data['teams']['away']['logo'],
-                                date=fixture_datetime,
-                                league=league_name,
-                                season=str(season),
-                                round=fixture_data['league']['round'],
-                                status=status,
-                                home_score=fixture_data['goals']['home'] if fixture_data['goals']['home'] is not None else 0,
-                                away_score=fixture_data['goals']['away'] if fixture_data['goals']['away'] is not None else 0,
-                                venue_city=fixture_data['fixture']['venue']['city'],
-                                competition_id=league_id,
-                                match_timestamp=fixture_datetime,
-                                last_checked=datetime.utcnow()
-                            )
-                            
-                            db.session.add(new_fixture)
-                            current_app.logger.info(f"Added new fixture: {new_fixture.home_team} vs {new_fixture.away_team}")
-                        else:
-                            # Update existing fixture
-                            existing_fixture.status = status
-                            existing_fixture.home_score = fixture_data['goals']['home'] if fixture_data['goals']['home'] is not None else existing_fixture.home_score
-                            existing_fixture.away_score = fixture_data['goals']['away'] if fixture_data['goals']['away'] is not None else existing_fixture.away_score
-                            existing_fixture.last_checked = datetime.utcnow()
-                            
-                            current_app.logger.info(f"Updated existing fixture: {existing_fixture.home_team} vs {existing_fixture.away_team}")
-                        
-                        db.session.commit()
-                        
-                    except Exception as e:
-                        db.session.rollback()
-                        current_app.logger.error(f"Error processing fixture: {str(e)}")
-                        continue
-                
-                time.sleep(0.5)  # Small delay between leagues
-                
-            except Exception as e:
-                current_app.logger.error(f"Error processing league {league_name}: {str(e)}")
-                time.sleep(1)  # Longer delay on league processing error
-                continue
+        # Step 1: Populate fixtures table; leagues are fetched concurrently and upserted as they arrive
+        # Season bodies are decoded as they download and written in bounded batches
+        batch_size = current_app.config.get('INGESTION_BATCH_SIZE', 500)
+        orchestrator = IngestionOrchestrator(
+            fetch=lambda league_id, season: football_api.stream_fixtures_by_season(league_id, season),
+            write=lambda job, records, fetch_seconds: ingestion.ingest_league_stream(records, *job, batch_size),
+            max_fetchers=current_app.config.get('INGESTION_WORKERS', 4),
+            batch_size=batch_size
+        )
+        orchestrator.run([
+            (league_name, league_id, season)
+            for league_name, league_id in leagues.items()
+        ])
 
         # Step 2: Populate teams table
         current_app.logger.info("Populating teams from fixtures...")
-        teams = get_teams_from_fixtures()  # Extract unique teams from fixtures
-        if teams:
-            for team in teams:
-                existing_team = Team.query.filter_by(team_name=team['team']).first()
-                if not existing_team:
-                    new_team = Team(
-                        team_name=team['team'],
-                        team_logo=team['logo']
-                    )
-                    db.session.add(new_team)
-            db.session.commit()
-            current_app.logger.info(f"Populated {len(teams)} teams into the teams table.")
-        else:
-            current_app.logger.warning("No teams extracted from fixtures.")
+        ingestion.populate_teams()
 
         current_app.logger.info("Completed initial data population")
         
@@ -232,36 +138,28 @@ def get_fixtures(league_id: int, season: str, round_name: str = None):
         current_app.logger.error(f"Error fetching fixtures: {str(e)}")
         return None
 
+LEAGUE_IDS = {
+    "Premier League": 39,
+    "La Liga": 140,
+    "UEFA Champions League": 2
+}
+
 def get_league_id(league_name: str) -> int:
     """Get league ID from name"""
-    league_mapping = {
-        "Premier League": 39,
-        "La Liga": 140,
-        "UEFA Champions League": 2
-    }
-    return league_mapping.get(league_name)
+    return LEAGUE_IDS.get(league_name)
 
 def process_live_scores():
-    """Process live scores for all leagues with enhanced error handling"""
+    """Process live scores for all leagues with a single combined API request"""
     try:
-        _, score_processor = initialize_services()
-        
-        leagues = {
-            "Premier League": 39,
-            "La Liga": 140,
-            "UEFA Champions League": 2
-        }
-        
-        for league_name, league_id in leagues.items():
-            current_app.logger.info(f"Processing live scores for {league_name}")
-            try:
-                score_processor.process_live_matches(league_id)
-                time.sleep(0.5)  # Small delay between processing different leagues
-            except Exception as e:
-                current_app.logger.error(f"Error processing live scores for {league_name}: {str(e)}")
-                time.sleep(1)  # Longer delay on error
-                continue
+        # Reuse the services built at startup instead of fetching the secret again
+        score_processor = current_app.config.get('SCORE_PROCESSOR')
+        if score_processor is None:
+            _, score_processor = initialize_services()
+
+        leagues = current_app.config.get('LIVE_LEAGUES', LEAGUE_IDS)
+        current_app.logger.info(f"Processing live scores for {', '.join(leagues)}")
+        return score_processor.process_all_live_matches(list(leagues.values()))
             
     except Exception as e:
         current_app.logger.error(f"Error in process_live_scores: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from flask import current_app
 from app.services.football_api import FootballAPIService
 from app.services.match_processing import MatchProcessingService
+from app.services.ingestion_orchestrator import IngestionOrchestrator
 from app.models import db
 
 def daily_update():
@@ -20,9 +21,17 @@ def daily_update():
             "UEFA Champions League": 2
         }
 
-        for league_name, league_id in leagues.items():
-            current_app.logger.info(f"Processing daily update for {league_name}")
-            match_processor.process_daily_matches(league_id)
+        # Leagues are fetched concurrently; updates are applied as each one arrives
+        season = datetime.now().year
+        orchestrator = IngestionOrchestrator(
+            fetch=lambda league_id, season: match_processor.fetch_daily_matches(league_id, season),
+            write=lambda job, matches, fetch_seconds: match_processor.apply_daily_matches(job[1], matches),
+            max_fetchers=current_app.config.get('INGESTION_WORKERS', 4)
+        )
+        orchestrator.run([
+            (league_name, league_id, season)
+            for league_name, league_id in leagues.items()
+        ])
 
         current_app.logger.info("Daily update completed successfully")
 
@@ -6,6 +6,42 @@ import click
 # Set up the SQLAlchemy instance
 db = SQLAlchemy()
 
+# Changes to tables that already exist, which create_all() never alters.
+# Each statement is idempotent; they run in order on every startup.
+SCHEMA_UPGRADES = [
+    # Settlement upserts season totals ON CONFLICT (author_id, season).
+    # Fold duplicate rows into the oldest one before adding the constraint.
+    """
+    UPDATE user_results r SET points = d.points
+    FROM (
+        SELECT min(id) AS id, sum(points) AS points
+        FROM user_results GROUP BY author_id, season HAVING count(*) > 1
+    ) d
+    WHERE r.id = d.id
+    """,
+    """
+    DELETE FROM user_results r USING user_results keep
+    WHERE r.author_id = keep.author_id AND r.season = keep.season AND r.id > keep.id
+    """,
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '_user_season_uc') THEN
+            ALTER TABLE user_results ADD CONSTRAINT _user_season_uc UNIQUE (author_id, season);
+        END IF;
+    END $$
+    """,
+    # Daily sync compares provider data against this fingerprint
+    "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS content_hash VARCHAR(40)",
+    # Incremental verification scans both timestamps from its watermark
+    "CREATE INDEX IF NOT EXISTS idx_predictions_last_modified ON user_predictions (last_modified)",
+    "CREATE INDEX IF NOT EXISTS idx_fixture_last_updated ON fixtures (last_updated)",
+    # Groups without it have never had their analytics rollups backfilled
+    "ALTER TABLE groups ADD COLUMN IF NOT EXISTS rollups_built_at TIMESTAMP WITHOUT TIME ZONE",
+]
+
+# Key of the advisory lock held while upgrading, so workers starting together take turns
+SCHEMA_UPGRADE_LOCK = 7300
+
 def get_db():
     """Get the SQLAlchemy database instance."""
     if 'db' not in g:
@@ -39,11 +75,24 @@ def init_db():
         
         # Create tables
         db.create_all()
+        upgrade_schema()
         current_app.logger.info("Database initialized successfully")
     except Exception as e:
         current_app.logger.error(f"Database initialization failed: {str(e)}")
         raise
 
+def upgrade_schema():
+    """Apply SCHEMA_UPGRADES to an existing database in one transaction."""
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': SCHEMA_UPGRADE_LOCK})
+            for statement in SCHEMA_UPGRADES:
+                conn.execute(text(statement))
+        current_app.logger.info("Database schema upgrades applied")
+    except Exception as e:
+        current_app.logger.error(f"Database schema upgrade failed: {str(e)}")
+        raise
+
 def close_db(e=None):
     """Close the database session if it exists."""
     db_session = g.pop('db', None)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import select, union
 from app.db import db
 from flask_login import UserMixin
 from enum import Enum
@@ -82,12 +83,12 @@ class Group(db.Model):
     invite_code = db.Column(db.String(8), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     teams = db.Column(db.JSON)  # Store selected teams as JSON array
+    rollups_built_at = db.Column(db.DateTime)  # Last full rebuild of the analytics rollups
     
     # Relationships
     admin = db.relationship('Users', backref='administered_groups')
-    members = db.relationship('Users', 
-                            secondary='user_groups',
-                            backref=db.backref('groups', lazy='dynamic'))
+    users = db.relationship('Users', secondary='user_groups', back_populates='groups')
+    members = db.synonym('users')
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -114,6 +115,10 @@ class UserResults(db.Model):
     points = db.Column(db.Integer, nullable=False)
     season = db.Column(db.String, nullable=False)
 
+    __table_args__ = (
+        db.UniqueConstraint('author_id', 'season', name='_user_season_uc'),
+    )
+
 class UserPredictions(db.Model):
     __tablename__ = 'user_predictions'
 
@@ -135,7 +140,8 @@ class UserPredictions(db.Model):
     __table_args__ = (
         db.UniqueConstraint('author_id', 'fixture_id', name='_user_fixture_uc'),
         db.Index('idx_predictions_status', 'prediction_status'),
-        db.Index('idx_predictions_fixture', 'fixture_id')
+        db.Index('idx_predictions_fixture', 'fixture_id'),
+        db.Index('idx_predictions_last_modified', 'last_modified')
     )
 
 class Fixture(db.Model):
@@ -160,6 +166,7 @@ class Fixture(db.Model):
     competition_id = db.Column(db.Integer, nullable=False)
     match_timestamp = db.Column(db.DateTime, nullable=False)
     last_checked = db.Column(db.DateTime, nullable=True)
+    content_hash = db.Column(db.String(40), nullable=True)  # Hash of the provider fields we store
     referee = db.Column(db.String)
     league_id = db.Column(db.Integer)
     
@@ -177,7 +184,8 @@ class Fixture(db.Model):
     __table_args__ = (
         db.Index('idx_fixture_date_status', 'date', 'status'),
         db.Index('idx_fixture_league_season', 'league', 'season'),
-        db.Index('idx_fixture_competition', 'competition_id')
+        db.Index('idx_fixture_competition', 'competition_id'),
+        db.Index('idx_fixture_last_updated', 'last_updated')
     )
 
 class TeamTracker(db.Model):
@@ -206,6 +214,84 @@ class GroupMember(db.Model):
         db.UniqueConstraint('group_id', 'user_id', name='_group_member_uc'),
     )
 
+def group_membership():
+    """(group_id, user_id) of every membership as a subquery.
+
+    GroupService records members in group_members while the group API
+    appends to user_groups, so membership is the union of both.
+    """
+    return union(
+        select(GroupMember.group_id, GroupMember.user_id),
+        select(user_groups.c.group_id, user_groups.c.user_id)
+    ).subquery('group_membership')
+
+class GroupStanding(db.Model):
+    __tablename__ = 'group_standings'
+
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    season = db.Column(db.String, nullable=False)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    exact_hits = db.Column(db.Integer, nullable=False, default=0)
+    correct_results = db.Column(db.Integer, nullable=False, default=0)
+    predictions = db.Column(db.Integer, nullable=False, default=0)
+    rank = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'user_id', 'season', name='_group_standing_uc'),
+        db.Index('idx_standings_group_rank', 'group_id', 'season', 'rank')
+    )
+
+class GroupWeekRollup(db.Model):
+    __tablename__ = 'group_week_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    season = db.Column(db.String, nullable=False)
+    week = db.Column(db.Integer, nullable=False)
+    predictions = db.Column(db.Integer, nullable=False, default=0)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    exact_hits = db.Column(db.Integer, nullable=False, default=0)  # predictions worth 3 points
+    participants = db.Column(db.Integer, nullable=False, default=0)
+    home_predicted = db.Column(db.Integer, nullable=False, default=0)
+    home_correct = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'season', 'week', name='_group_week_rollup_uc'),
+    )
+
+class GroupWeekParticipant(db.Model):
+    __tablename__ = 'group_week_participants'
+
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    season = db.Column(db.String, nullable=False)
+    week = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'season', 'week', 'user_id', name='_group_week_participant_uc'),
+    )
+
+class GroupWeekScorePair(db.Model):
+    __tablename__ = 'group_week_score_pairs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    season = db.Column(db.String, nullable=False)
+    week = db.Column(db.Integer, nullable=False)
+    score1 = db.Column(db.Integer, nullable=False)
+    score2 = db.Column(db.Integer, nullable=False)
+    predictions = db.Column(db.Integer, nullable=False, default=0)
+    exact_hits = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'season', 'week', 'score1', 'score2', name='_group_week_score_pair_uc'),
+    )
+
 class PendingMembership(db.Model):
     __tablename__ = 'pending_memberships'
 
@@ -255,6 +341,29 @@ class InitializationStatus(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     details = db.Column(db.Text)
 
+class VerificationCheckpoint(db.Model):
+    __tablename__ = 'verification_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(50), unique=True, nullable=False)
+    watermark = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class VerificationChecksum(db.Model):
+    __tablename__ = 'verification_checksums'
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(20), nullable=False)  # 'fixture', 'group'
+    scope_id = db.Column(db.Integer, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    points_sum = db.Column(db.Integer, nullable=False, default=0)
+    digest = db.Column(db.String(32), nullable=False)
+    verified_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'scope_id', name='_verification_scope_uc'),
+    )
+
 class Team(db.Model):
     __tablename__ = 'teams'
 
@@ -55,6 +55,18 @@ class ApplicationMonitor:
                     'cache_memory_used': redis_info['used_memory']
                 })
             
+            # Football API response cache counters
+            football_api = current_app.config.get('FOOTBALL_API_SERVICE')
+            if football_api is not None:
+                cache_metrics.update({
+                    f"api_cache_{name}": value
+                    for name, value in football_api.response_cache.stats().items()
+                })
+                cache_metrics.update({
+                    f"api_{name}": value
+                    for name, value in football_api.api_metrics().items()
+                })
+            
             return {**db_metrics, **cache_metrics}
     
     def send_metrics_to_cloudwatch(self, metrics: Dict[str, float]):
@@ -0,0 +1,151 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from sqlalchemy import func, select
+
+from app.models import db, Fixture, UserPredictions, PredictionStatus, group_membership
+from app.services.scoring_rules import exact_score_clause
+
+# Upper bounds (hours before kickoff) of the late and normal brackets
+TIME_BRACKET_EDGES = np.array([12.0, 24.0])
+TIME_BRACKETS = ('late', 'normal', 'early')
+
+
+class PredictionColumns(NamedTuple):
+    """Processed predictions of a league as parallel arrays"""
+    author: np.ndarray
+    score1: np.ndarray
+    score2: np.ndarray
+    points: np.ndarray
+    exact: np.ndarray       # True where the score was predicted exactly
+    lead_hours: np.ndarray  # hours between submission and kickoff, NaN when not submitted
+    home: np.ndarray        # team codes into ``teams``
+    away: np.ndarray
+    teams: List[str]
+
+
+class AnalyticsEngine:
+    """Prediction pattern metrics computed column-wise with NumPy.
+
+    One joined projection pulls the columns the patterns need, so there is
+    no lazy fixture load per prediction, and every metric is a vectorized
+    pass over the same arrays.
+    """
+
+    def load(self, league: str, group_id: Optional[int] = None) -> PredictionColumns:
+        """Fetch a league's processed predictions, or only a group's members', as columns in one query"""
+        query = db.session.query(
+            UserPredictions.author_id,
+            UserPredictions.score1,
+            UserPredictions.score2,
+            UserPredictions.points,
+            exact_score_clause(UserPredictions.score1, UserPredictions.score2, Fixture.home_score, Fixture.away_score),
+            func.extract('epoch', Fixture.date - UserPredictions.submission_time),
+            Fixture.home_team,
+            Fixture.away_team
+        ).join(
+            Fixture
+        ).filter(
+            Fixture.league == league,
+            UserPredictions.prediction_status == PredictionStatus.PROCESSED
+        )
+        if group_id is not None:
+            members = group_membership()
+            query = query.filter(
+                UserPredictions.author_id.in_(select(members.c.user_id).where(members.c.group_id == group_id))
+            )
+        return self.columns(query.all())
+
+    @staticmethod
+    def columns(rows: Sequence[Sequence]) -> PredictionColumns:
+        """Build columns from (author, score1, score2, points, exact, lead_seconds, home, away) rows"""
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return PredictionColumns(empty, empty, empty, empty, np.zeros(0, dtype=bool), np.zeros(0), empty, empty, [])
+
+        author, score1, score2, points, exact, lead_seconds, home, away = zip(*rows)
+        codes: Dict[str, int] = {}
+        count = len(rows)
+        return PredictionColumns(
+            np.array(author, dtype=np.int64),
+            np.array(score1, dtype=np.int64),
+            np.array(score2, dtype=np.int64),
+            np.array(points, dtype=np.int64),
+            np.array(exact, dtype=bool),
+            np.array([np.nan if s is None else float(s) for s in lead_seconds]) / 3600,
+            np.fromiter((codes.setdefault(team, len(codes)) for team in home), dtype=np.int64, count=count),
+            np.fromiter((codes.setdefault(team, len(codes)) for team in away), dtype=np.int64, count=count),
+            list(codes)
+        )
+
+    def prediction_patterns(self, league: str, group_id: Optional[int] = None) -> Dict:
+        return self.patterns(self.load(league, group_id))
+
+    def patterns(self, cols: PredictionColumns) -> Dict:
+        """All prediction pattern metrics from one set of columns"""
+        hit = cols.points > 0
+        return {
+            'home_bias': self._home_bias(cols, hit),
+            'score_distribution': self._score_distribution(cols),
+            'success_by_team': self._team_success(cols, hit),
+            'time_based_accuracy': self._time_based_accuracy(cols, hit)
+        }
+
+    @staticmethod
+    def _home_bias(cols: PredictionColumns, hit: np.ndarray) -> Dict:
+        total = len(cols.points)
+        if not total:
+            return {'rate': 0, 'accuracy': 0}
+
+        home_win = cols.score1 > cols.score2
+        predicted = int(home_win.sum())
+        correct = int((home_win & hit).sum())
+        return {
+            'rate': round(predicted / total * 100, 2),
+            'accuracy': round(correct / predicted * 100, 2) if predicted else 0
+        }
+
+    @staticmethod
+    def _score_distribution(cols: PredictionColumns, top: int = 5) -> Dict:
+        if not len(cols.points):
+            return {}
+
+        width = int(cols.score2.max()) + 1
+        pairs, inverse, counts = np.unique(cols.score1 * width + cols.score2, return_inverse=True, return_counts=True)
+        exact = np.bincount(inverse, weights=cols.exact, minlength=len(pairs))
+
+        # Top 5 by frequency
+        order = np.argsort(-counts, kind='stable')[:top]
+        return {
+            f"{pairs[i] // width}-{pairs[i] % width}": {'count': int(counts[i]), 'correct': int(exact[i])}
+            for i in order
+        }
+
+    @staticmethod
+    def _team_success(cols: PredictionColumns, hit: np.ndarray) -> Dict:
+        if not cols.teams:
+            return {}
+
+        sides = np.concatenate([cols.home, cols.away])
+        totals = np.bincount(sides, minlength=len(cols.teams))
+        correct = np.bincount(sides, weights=np.concatenate([hit, hit]), minlength=len(cols.teams))
+        return {
+            team: {
+                'success_rate': round(correct[code] / totals[code] * 100, 2) if totals[code] else 0,
+                'predictions': int(totals[code])
+            }
+            for code, team in enumerate(cols.teams)
+        }
+
+    @staticmethod
+    def _time_based_accuracy(cols: PredictionColumns, hit: np.ndarray) -> Dict:
+        submitted = ~np.isnan(cols.lead_hours)
+        brackets = np.searchsorted(TIME_BRACKET_EDGES, cols.lead_hours[submitted], side='left')
+        counts = np.bincount(brackets, minlength=len(TIME_BRACKETS))
+        correct = np.bincount(brackets, weights=hit[submitted], minlength=len(TIME_BRACKETS))
+        return {
+            name: {
+                'accuracy': round(correct[i] / counts[i] * 100, 2) if counts[i] else 0,
+                'predictions': int(counts[i])
+            }
+            for name, i in (('early', 2), ('normal', 1), ('late', 0))
+        }
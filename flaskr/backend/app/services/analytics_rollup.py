@@ -0,0 +1,220 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import (
+    db, Fixture, UserPredictions, Group, PredictionStatus, GroupWeekRollup,
+    GroupWeekParticipant, GroupWeekScorePair, group_membership
+)
+from app.services.scoring_rules import exact_score_clause
+
+
+class AnalyticsRollupService:
+    """Maintains per-group, per-week analytics rollups.
+
+    Settlement adds the predictions it just scored to ``group_week_rollups``
+    (counts, points, exact hits, home bias), ``group_week_score_pairs`` and
+    ``group_week_participants`` for every group of the fixture's league the
+    author belongs to. Group analytics then read O(weeks) rollup rows
+    instead of every prediction. ``rebuild`` recomputes them from scratch
+    and stamps ``Group.rollups_built_at``; settlement deltas alone never
+    cover predictions settled before a group's first rebuild.
+    """
+
+    @staticmethod
+    def _member_predictions(actual, *conditions):
+        """Predictions of group members on fixtures of the group's league, one row per group.
+
+        ``actual`` is the (home, away) final score to classify them against.
+        """
+        members = group_membership()
+        exact = exact_score_clause(UserPredictions.score1, UserPredictions.score2, *actual)
+        return select(
+            members.c.group_id.label('group_id'),
+            UserPredictions.author_id.label('user_id'),
+            UserPredictions.season.label('season'),
+            UserPredictions.week.label('week'),
+            UserPredictions.score1.label('score1'),
+            UserPredictions.score2.label('score2'),
+            UserPredictions.points.label('points'),
+            case((exact, 1), else_=0).label('exact')
+        ).join(
+            members, members.c.user_id == UserPredictions.author_id
+        ).join(
+            Group, Group.id == members.c.group_id
+        ).join(
+            Fixture, and_(Fixture.fixture_id == UserPredictions.fixture_id, Fixture.league == Group.league)
+        ).where(*conditions).subquery()
+
+    @staticmethod
+    def apply_settlement(fixture: Fixture, settled_ids: List[int], home_goals: int, away_goals: int) -> None:
+        """Add the freshly settled predictions of a fixture to the rollups of its league's groups"""
+        conditions = (UserPredictions.id.in_(settled_ids),)
+        AnalyticsRollupService._add((literal(home_goals), literal(away_goals)), conditions)
+
+    @staticmethod
+    def rebuild(group_ids: Optional[List[int]] = None) -> int:
+        """Recompute the rollups of the given groups, or all groups, from processed predictions"""
+        if group_ids is not None and not group_ids:
+            return 0
+
+        for model in (GroupWeekRollup, GroupWeekParticipant, GroupWeekScorePair):
+            stmt = delete(model)
+            if group_ids is not None:
+                stmt = stmt.where(model.group_id.in_(group_ids))
+            db.session.execute(stmt)
+
+        conditions = [UserPredictions.prediction_status == PredictionStatus.PROCESSED]
+        built = update(Group).values(rollups_built_at=datetime.utcnow())
+        if group_ids is not None:
+            conditions.append(Group.id.in_(group_ids))
+            built = built.where(Group.id.in_(group_ids))
+        touched = AnalyticsRollupService._add((Fixture.home_score, Fixture.away_score), conditions)
+        db.session.execute(built.execution_options(synchronize_session=False))
+        return touched
+
+    @staticmethod
+    def _add(actual, conditions) -> int:
+        """Fold the matching predictions into the rollup tables; returns rollup rows touched"""
+        keys = ('group_id', 'season', 'week')
+
+        # Participants first, so the rollup can count them after this batch
+        rows = AnalyticsRollupService._member_predictions(actual, *conditions)
+        stmt = insert(GroupWeekParticipant).from_select(
+            [*keys, 'user_id'],
+            select(rows.c.group_id, rows.c.season, rows.c.week, rows.c.user_id).distinct()
+        ).on_conflict_do_nothing(constraint='_group_week_participant_uc')
+        db.session.execute(stmt)
+
+        rows = AnalyticsRollupService._member_predictions(actual, *conditions)
+        home_win = rows.c.score1 > rows.c.score2
+        totals = select(
+            rows.c.group_id,
+            rows.c.season,
+            rows.c.week,
+            func.count(),
+            func.sum(rows.c.points),
+            func.sum(rows.c.exact),
+            func.count(func.distinct(rows.c.user_id)),
+            func.sum(case((home_win, 1), else_=0)),
+            func.sum(case((and_(home_win, rows.c.points > 0), 1), else_=0))
+        ).group_by(rows.c.group_id, rows.c.season, rows.c.week)
+
+        stmt = insert(GroupWeekRollup).from_select(
+            [*keys, 'predictions', 'points', 'exact_hits', 'participants', 'home_predicted', 'home_correct'],
+            totals
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint='_group_week_rollup_uc',
+            set_={
+                'predictions': GroupWeekRollup.predictions + stmt.excluded.predictions,
+                'points': GroupWeekRollup.points + stmt.excluded.points,
+                'exact_hits': GroupWeekRollup.exact_hits + stmt.excluded.exact_hits,
+                'home_predicted': GroupWeekRollup.home_predicted + stmt.excluded.home_predicted,
+                'home_correct': GroupWeekRollup.home_correct + stmt.excluded.home_correct,
+                'updated_at': datetime.utcnow()
+            }
+        ).returning(GroupWeekRollup.id)
+        touched = db.session.execute(stmt).scalars().all()
+
+        # Distinct participants cannot be summed, so recount the weeks just touched
+        if touched:
+            participants = select(func.count()).where(
+                GroupWeekParticipant.group_id == GroupWeekRollup.group_id,
+                GroupWeekParticipant.season == GroupWeekRollup.season,
+                GroupWeekParticipant.week == GroupWeekRollup.week
+            ).scalar_subquery()
+            db.session.execute(
+                update(GroupWeekRollup).where(
+                    GroupWeekRollup.id.in_(touched)
+                ).values(participants=participants).execution_options(synchronize_session=False)
+            )
+
+        rows = AnalyticsRollupService._member_predictions(actual, *conditions)
+        pairs = select(
+            rows.c.group_id,
+            rows.c.season,
+            rows.c.week,
+            rows.c.score1,
+            rows.c.score2,
+            func.count(),
+            func.sum(rows.c.exact)
+        ).group_by(rows.c.group_id, rows.c.season, rows.c.week, rows.c.score1, rows.c.score2)
+
+        stmt = insert(GroupWeekScorePair).from_select(
+            [*keys, 'score1', 'score2', 'predictions', 'exact_hits'],
+            pairs
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint='_group_week_score_pair_uc',
+            set_={
+                'predictions': GroupWeekScorePair.predictions + stmt.excluded.predictions,
+                'exact_hits': GroupWeekScorePair.exact_hits + stmt.excluded.exact_hits
+            }
+        )
+        db.session.execute(stmt)
+        return len(touched)
+
+    @staticmethod
+    def is_built(group_id: int) -> bool:
+        """Whether a group's rollups have been rebuilt from its full prediction history"""
+        return db.session.query(
+            select(Group.id).where(Group.id == group_id, Group.rollups_built_at.isnot(None)).exists()
+        ).scalar()
+
+    @staticmethod
+    def weeks(group_id: int, limit: Optional[int] = None,
+              season: Optional[str] = None) -> List[GroupWeekRollup]:
+        """A group's weekly rollups, latest season and week first"""
+        query = GroupWeekRollup.query.filter_by(group_id=group_id)
+        if season is not None:
+            query = query.filter_by(season=season)
+        query = query.order_by(GroupWeekRollup.season.desc(), GroupWeekRollup.week.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def totals(group_id: int) -> Dict[str, int]:
+        """Season-spanning totals for a group, summed from its weekly rollups.
+
+        ``participants`` counts current members who predicted in any week.
+        """
+        row = db.session.query(
+            func.coalesce(func.sum(GroupWeekRollup.predictions), 0).label('predictions'),
+            func.coalesce(func.sum(GroupWeekRollup.points), 0).label('points'),
+            func.coalesce(func.sum(GroupWeekRollup.exact_hits), 0).label('exact_hits'),
+            func.coalesce(func.sum(GroupWeekRollup.home_predicted), 0).label('home_predicted'),
+            func.coalesce(func.sum(GroupWeekRollup.home_correct), 0).label('home_correct')
+        ).filter(GroupWeekRollup.group_id == group_id).one()
+
+        members = group_membership()
+        participants = db.session.query(
+            func.count(func.distinct(GroupWeekParticipant.user_id))
+        ).join(
+            members,
+            and_(members.c.group_id == GroupWeekParticipant.group_id, members.c.user_id == GroupWeekParticipant.user_id)
+        ).filter(GroupWeekParticipant.group_id == group_id).scalar()
+
+        return dict(row._asdict(), participants=participants or 0)
+
+    @staticmethod
+    def score_distribution(group_id: int, top: int = 5) -> Dict:
+        """Most predicted score pairs across a group's weeks"""
+        count = func.sum(GroupWeekScorePair.predictions)
+        rows = db.session.query(
+            GroupWeekScorePair.score1,
+            GroupWeekScorePair.score2,
+            count.label('count'),
+            func.sum(GroupWeekScorePair.exact_hits).label('correct')
+        ).filter(
+            GroupWeekScorePair.group_id == group_id
+        ).group_by(
+            GroupWeekScorePair.score1, GroupWeekScorePair.score2
+        ).order_by(count.desc()).limit(top).all()
+
+        return {
+            f"{r.score1}-{r.score2}": {'count': int(r.count), 'correct': int(r.correct or 0)}
+            for r in rows
+        }
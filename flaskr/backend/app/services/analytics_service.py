@@ -1,45 +1,43 @@
 from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import func, and_, case
+from sqlalchemy import func, case, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert
 from flask import current_app
 import json
 
 from app.models import (
     Group, Users, UserPredictions, GroupAnalytics, 
-    PredictionStatus, Fixture, MatchStatus
+    PredictionStatus, Fixture, MatchStatus, group_membership
 )
 from app.db import db
 from app.services.cache_service import CacheService
+from app.services.analytics_engine import AnalyticsEngine
+from app.services.analytics_rollup import AnalyticsRollupService
+from app.services.scoring_rules import exact_score_clause
+
+ANALYTICS_CACHE_TIMEOUT = 3600  # 1 hour
 
 class AnalyticsService:
     def __init__(self):
         self.cache = CacheService()
+        self.engine = AnalyticsEngine()
 
     def generate_group_analytics(self, group_id: int) -> Dict:
         """Generate comprehensive analytics for a group."""
         try:
+            cache_key = self.cache_key(group_id)
             try:
-                cache_key = f"group_analytics:{group_id}"
                 cached_data = self.cache.get(cache_key)
                 if cached_data:
                     return cached_data
             except Exception as cache_error:
                 current_app.logger.warning(f"Cache retrieval failed: {str(cache_error)}")
 
-            analytics = {
-                'overall_stats': self._get_overall_stats(group_id),
-                'member_performance': self._get_member_performance(group_id),
-                'prediction_patterns': self._get_prediction_patterns(group_id),
-                'weekly_trends': self._get_weekly_trends(group_id),
-                'generated_at': datetime.now(timezone.utc).isoformat()
-            }
+            analytics = self._compute_analytics(group_id)
 
-            # Store in database for historical tracking
-            self._store_analytics(group_id, analytics)
-            
             # Try to cache, but don't fail if cache is unavailable
             try:
-                self.cache.set(cache_key, analytics, timeout=3600)  # 1 hour cache
+                self.cache.set(cache_key, analytics, timeout=ANALYTICS_CACHE_TIMEOUT)
             except Exception as cache_error:
                 current_app.logger.warning(f"Cache storage failed: {str(cache_error)}")
             
@@ -56,20 +54,44 @@ class AnalyticsService:
                 'error': 'Error generating analytics'
             }
 
+    def refresh_group_analytics(self, group_id: int) -> bool:
+        """Recompute a group's analytics and overwrite its cache entry in place.
+
+        The old entry is never deleted first, so readers keep getting it
+        until the new one lands and never fall through to a recompute.
+        """
+        try:
+            analytics = self._compute_analytics(group_id)
+        except Exception as e:
+            current_app.logger.error(f"Error refreshing analytics for group {group_id}: {str(e)}")
+            return False
+        return self.cache.set(self.cache_key(group_id), analytics, timeout=ANALYTICS_CACHE_TIMEOUT)
+
+    @staticmethod
+    def cache_key(group_id: int) -> str:
+        return f"group_analytics:{group_id}"
+
+    def _compute_analytics(self, group_id: int) -> Dict:
+        self._ensure_rollups(group_id)
+
+        analytics = {
+            'overall_stats': self._get_overall_stats(group_id),
+            'member_performance': self._get_member_performance(group_id),
+            'prediction_patterns': self._get_prediction_patterns(group_id),
+            'weekly_trends': self._get_weekly_trends(group_id),
+            'generated_at': datetime.now(timezone.utc).isoformat()
+        }
+
+        # Store in database for historical tracking
+        self._store_analytics(group_id, analytics)
+        return analytics
+
     def _get_overall_stats(self, group_id: int) -> Dict:
         """Get overall group statistics."""
         try:
-            group = Group.query.get(group_id)
-            
-            # Get all predictions for the group
-            predictions = UserPredictions.query.join(
-                Fixture
-            ).filter(
-                Fixture.league == group.league,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
-            ).all()
+            totals = AnalyticsRollupService.totals(group_id)
 
-            total_predictions = len(predictions)
+            total_predictions = totals['predictions']
             if not total_predictions:
                 return {
                     'total_predictions': 0,
@@ -78,14 +100,12 @@ class AnalyticsService:
                     'participation_rate': 0
                 }
 
-            perfect_predictions = sum(1 for p in predictions if p.points == 3)
-            total_points = sum(p.points for p in predictions)
-
+            total_members = self._member_count(group_id)
             return {
                 'total_predictions': total_predictions,
-                'average_points': round(total_points / total_predictions, 2),
-                'perfect_predictions': perfect_predictions,
-                'participation_rate': self._calculate_participation_rate(group_id)
+                'average_points': round(totals['points'] / total_predictions, 2),
+                'perfect_predictions': totals['exact_hits'],
+                'participation_rate': round(totals['participants'] / total_members * 100, 2) if total_members else 0.0
             }
 
         except Exception as e:
@@ -102,14 +122,15 @@ class AnalyticsService:
                 func.count(UserPredictions.id).label('total_predictions'),
                 func.sum(UserPredictions.points).label('total_points'),
                 func.avg(UserPredictions.points).label('average_points'),
-                func.sum(case(whens=[(UserPredictions.points == 3, 1)], else_=0)).label('perfect_predictions')
+                func.sum(case((exact_score_clause(
+                    UserPredictions.score1, UserPredictions.score2, Fixture.home_score, Fixture.away_score
+                ), 1), else_=0)).label('perfect_predictions')
             ).join(
                 UserPredictions, Users.id == UserPredictions.author_id
             ).join(
                 Fixture, UserPredictions.fixture_id == Fixture.fixture_id
             ).filter(
-                Fixture.league == group.league,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
+                *self._processed_by_members(group)
             ).group_by(
                 Users.username
             ).all()
@@ -130,219 +151,160 @@ class AnalyticsService:
         """Analyze prediction patterns within the group."""
         try:
             group = Group.query.get(group_id)
-            
-            predictions = UserPredictions.query.join(
-                Fixture
-            ).filter(
-                Fixture.league == group.league,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
-            ).all()
 
-            patterns = {
-                'home_bias': self._calculate_home_bias(predictions),
-                'score_distribution': self._analyze_score_distribution(predictions),
-                'success_by_team': self._analyze_team_success(predictions),
-                'time_based_accuracy': self._analyze_time_based_accuracy(predictions)
-            }
+            # One projection and vectorized passes instead of one aggregate query per pattern
+            if current_app.config.get('ANALYTICS_ENGINE', 'sql') == 'numpy':
+                return self.engine.prediction_patterns(group.league, group.id)
 
-            return patterns
+            # Home bias and the score histogram are kept per week by the rollups
+            filters = self._processed_by_members(group)
+            return {
+                'home_bias': self._calculate_home_bias(group_id),
+                'score_distribution': AnalyticsRollupService.score_distribution(group_id),
+                'success_by_team': self._analyze_team_success(filters),
+                'time_based_accuracy': self._analyze_time_based_accuracy(filters)
+            }
 
         except Exception as e:
             current_app.logger.error(f"Error analyzing prediction patterns: {str(e)}")
             return {}
 
-    def _get_weekly_trends(self, group_id: int) -> List[Dict]:
-        """Get weekly performance trends."""
+    def _get_weekly_trends(self, group_id: int, weeks: Optional[int] = 10,
+                           season: Optional[str] = None) -> List[Dict]:
+        """Get weekly performance trends for the last ``weeks`` weeks, or every week when None."""
         try:
-            group = Group.query.get(group_id)
-            
-            weeks = db.session.query(
-                UserPredictions.week
-            ).join(
-                Fixture
-            ).filter(
-                Fixture.league == group.league,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
-            ).distinct().order_by(
-                UserPredictions.week.desc()
-            ).limit(10).all()
-
-            trends = []
-            for week in weeks:
-                week_num = week[0]
-                stats = self._calculate_weekly_stats(group_id, week_num)
-                trends.append({
-                    'week': week_num,
-                    'stats': stats
-                })
-
-            return trends
+            rollups = AnalyticsRollupService.weeks(group_id, limit=weeks, season=season)
+            if not rollups:
+                return []
+
+            total_members = self._member_count(group_id)
+            return [{
+                'week': r.week,
+                'stats': {
+                    'average_points': round(r.points / r.predictions, 2) if r.predictions else 0,
+                    'participation': round(r.participants / total_members * 100, 2) if total_members else 0,
+                    'perfect_predictions': r.exact_hits
+                }
+            } for r in rollups]
 
         except Exception as e:
             current_app.logger.error(f"Error getting weekly trends: {str(e)}")
             return []
 
-    def _calculate_participation_rate(self, group_id: int) -> float:
-        """Calculate member participation rate."""
+    @staticmethod
+    def _processed_by_members(group: Group) -> List:
+        """Filters for members' processed predictions on the group league's fixtures; the query must join Fixture"""
+        members = group_membership()
+        return [
+            Fixture.league == group.league,
+            UserPredictions.prediction_status == PredictionStatus.PROCESSED,
+            UserPredictions.author_id.in_(select(members.c.user_id).where(members.c.group_id == group.id))
+        ]
+
+    @staticmethod
+    def _member_count(group_id: int) -> int:
+        members = group_membership()
+        return db.session.query(func.count()).select_from(members).filter(
+            members.c.group_id == group_id
+        ).scalar() or 0
+
+    def _ensure_rollups(self, group_id: int) -> None:
+        """Backfill a group's rollups from its processed predictions until it has been rebuilt once"""
         try:
-            group = Group.query.get(group_id)
-            total_members = len(group.users)
-            if not total_members:
-                return 0.0
-
-            active_predictors = db.session.query(
-                func.count(func.distinct(UserPredictions.author_id))
-            ).join(
-                Fixture
-            ).filter(
-                Fixture.league == group.league,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
-            ).scalar()
-
-            return round((active_predictors or 0) / total_members * 100, 2)
-
+            if not AnalyticsRollupService.is_built(group_id):
+                AnalyticsRollupService.rebuild([group_id])
+                db.session.commit()
         except Exception as e:
-            current_app.logger.error(f"Error calculating participation rate: {str(e)}")
-            return 0.0
+            db.session.rollback()
+            current_app.logger.error(f"Error building analytics rollups for group {group_id}: {str(e)}")
 
     def _store_analytics(self, group_id: int, data: Dict) -> None:
-        """Store analytics data in database."""
+        """Store analytics data in database, one snapshot per group and week."""
         try:
             now = datetime.now(timezone.utc)
             week_number = now.isocalendar()[1]
-            
-            analytics = GroupAnalytics(
+
+            stmt = insert(GroupAnalytics).values(
                 group_id=group_id,
                 analysis_type='weekly',
                 period=f"{now.year}-W{week_number}",
                 data=data
             )
-            
-            db.session.add(analytics)
+            stmt = stmt.on_conflict_do_update(
+                constraint='_analytics_period_uc',
+                set_={'data': stmt.excluded.data, 'created_at': datetime.utcnow()}
+            )
+            db.session.execute(stmt)
             db.session.commit()
 
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error storing analytics: {str(e)}")
 
-    def _calculate_home_bias(self, predictions: List[UserPredictions]) -> Dict:
+    def _calculate_home_bias(self, group_id: int) -> Dict:
         """Calculate home team prediction bias."""
-        total = len(predictions)
+        totals = AnalyticsRollupService.totals(group_id)
+        total = totals['predictions']
         if not total:
             return {'rate': 0, 'accuracy': 0}
 
-        home_wins_predicted = sum(1 for p in predictions if p.score1 > p.score2)
-        home_wins_correct = sum(1 for p in predictions 
-                              if p.score1 > p.score2 and p.points > 0)
-
+        home_wins_predicted = totals['home_predicted']
+        home_wins_correct = totals['home_correct']
         return {
-            'rate': round(home_wins_predicted / total * 100, 2) if total else 0,
+            'rate': round(home_wins_predicted / total * 100, 2),
             'accuracy': round(home_wins_correct / home_wins_predicted * 100, 2) if home_wins_predicted else 0
         }
 
-    def _analyze_score_distribution(self, predictions: List[UserPredictions]) -> Dict:
-        """Analyze the distribution of predicted scores."""
-        scores = {}
-        for pred in predictions:
-            score_key = f"{pred.score1}-{pred.score2}"
-            if score_key not in scores:
-                scores[score_key] = {'count': 0, 'correct': 0}
-            scores[score_key]['count'] += 1
-            if pred.points == 3:
-                scores[score_key]['correct'] += 1
-
-        # Sort by frequency and get top 5
-        return dict(sorted(
-            scores.items(),
-            key=lambda x: x[1]['count'],
-            reverse=True
-        )[:5])
-
-    def _analyze_team_success(self, predictions: List[UserPredictions]) -> Dict:
+    def _analyze_team_success(self, filters: List) -> Dict:
         """Analyze prediction success rates by team."""
-        team_stats = {}
-        for pred in predictions:
-            fixture = pred.fixture
-            for team in [fixture.home_team, fixture.away_team]:
-                if team not in team_stats:
-                    team_stats[team] = {'total': 0, 'correct': 0}
-                team_stats[team]['total'] += 1
-                if pred.points > 0:
-                    team_stats[team]['correct'] += 1
+        correct = case((UserPredictions.points > 0, 1), else_=0)
+        sides = union_all(*[
+            select(team.label('team'), correct.label('correct')).select_from(UserPredictions).join(Fixture).where(*filters)
+            for team in (Fixture.home_team, Fixture.away_team)
+        ]).subquery()
+
+        rows = db.session.query(
+            sides.c.team,
+            func.count().label('total'),
+            func.sum(sides.c.correct).label('correct')
+        ).group_by(sides.c.team).all()
 
         return {
-            team: {
-                'success_rate': round(stats['correct'] / stats['total'] * 100, 2) if stats['total'] else 0,
-                'predictions': stats['total']
+            r.team: {
+                'success_rate': round(int(r.correct or 0) / r.total * 100, 2) if r.total else 0,
+                'predictions': r.total
             }
-            for team, stats in team_stats.items()
+            for r in rows
         }
 
-    def _analyze_time_based_accuracy(self, predictions: List[UserPredictions]) -> Dict:
+    def _analyze_time_based_accuracy(self, filters: List) -> Dict:
         """Analyze prediction accuracy based on submission timing."""
-        time_brackets = {
-            'early': {'count': 0, 'correct': 0},  # >24h before
-            'normal': {'count': 0, 'correct': 0}, # 12-24h before
-            'late': {'count': 0, 'correct': 0}    # <12h before
-        }
-
-        for pred in predictions:
-            if not pred.submission_time:
-                continue
-                
-            fixture_time = pred.fixture.date
-            submission_time = pred.submission_time
-            hours_before = (fixture_time - submission_time).total_seconds() / 3600
-            
-            if hours_before > 24:
-                bracket = 'early'
-            elif hours_before > 12:
-                bracket = 'normal'
-            else:
-                bracket = 'late'
-
-            time_brackets[bracket]['count'] += 1
-            if pred.points > 0:
-                time_brackets[bracket]['correct'] += 1
-
+        hours_before = func.extract('epoch', Fixture.date - UserPredictions.submission_time) / 3600
+        bracket = case(
+            (hours_before > 24, literal_column("'early'")),   # >24h before
+            (hours_before > 12, literal_column("'normal'")),  # 12-24h before
+            else_=literal_column("'late'")                    # <12h before
+        ).label('bracket')
+
+        timed = db.session.query(
+            bracket,
+            case((UserPredictions.points > 0, 1), else_=0).label('correct')
+        ).join(Fixture).filter(
+            *filters,
+            UserPredictions.submission_time.isnot(None)
+        ).subquery()
+
+        rows = db.session.query(
+            timed.c.bracket,
+            func.count().label('count'),
+            func.sum(timed.c.correct).label('correct')
+        ).group_by(timed.c.bracket).all()
+
+        counts = {r.bracket: (r.count, int(r.correct or 0)) for r in rows}
         return {
-            bracket: {
-                'accuracy': round(stats['correct'] / stats['count'] * 100, 2) if stats['count'] else 0,
-                'predictions': stats['count']
+            name: {
+                'accuracy': round(counts[name][1] / counts[name][0] * 100, 2) if name in counts else 0,
+                'predictions': counts[name][0] if name in counts else 0
             }
-            for bracket, stats in time_brackets.items()
+            for name in ('early', 'normal', 'late')
         }
-
-    def _calculate_weekly_stats(self, group_id: int, week: int) -> Dict:
-        """Calculate statistics for a specific week."""
-        try:
-            group = Group.query.get(group_id)
-            
-            predictions = UserPredictions.query.join(
-                Fixture
-            ).filter(
-                Fixture.league == group.league,
-                UserPredictions.week == week,
-                UserPredictions.prediction_status == PredictionStatus.PROCESSED
-            ).all()
-
-            if not predictions:
-                return {
-                    'average_points': 0,
-                    'participation': 0,
-                    'perfect_predictions': 0
-                }
-
-            total_points = sum(p.points for p in predictions)
-            perfect_predictions = sum(1 for p in predictions if p.points == 3)
-            participants = len(set(p.author_id for p in predictions))
-
-            return {
-                'average_points': round(total_points / len(predictions), 2),
-                'participation': round(participants / len(group.users) * 100, 2) if len(group.users) > 0 else 0,
-                'perfect_predictions': perfect_predictions
-            }
-
-        except Exception as e:
-            current_app.logger.error(f"Error calculating weekly stats: {str(e)}")
-            return {}
\ No newline at end of file
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+from flask import Flask, current_app
+from sqlalchemy import func
+
+from app.models import db, Fixture, Group, UserPredictions, MatchStatus, PredictionStatus, group_membership
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.match_processing import MatchProcessingService
+
+# Fixtures that won't be played in their round; they never hold up its settlement
+UNPLAYED_STATUSES = [MatchStatus.POSTPONED, MatchStatus.CANCELLED, MatchStatus.ABANDONED]
+
+
+class AnalyticsWarmer:
+    """Recomputes group analytics in the background once a round has settled.
+
+    When the last fixture of a round is settled, every group of that
+    league is queued on a worker pool, largest groups first, and its
+    cached analytics are overwritten with fresh ones. Readers keep getting
+    the previous entry until then, so the post-matchday rush hits a warm
+    cache instead of recomputing every group at once. A Redis claim per
+    round keeps concurrent settlements and app instances from warming the
+    same round twice.
+    """
+
+    def __init__(self, max_workers: int = 4, claim_timeout: int = 6 * 3600):
+        self.max_workers = max_workers
+        self.claim_timeout = claim_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analytics-warm')
+
+    def fixture_settled(self, fixture: Fixture) -> List[Future]:
+        """Warm the league's groups if this settlement completed the fixture's round"""
+        try:
+            league, season, round_name = fixture.league, fixture.season, fixture.round
+            if not self.round_settled(league, season, round_name):
+                return []
+
+            claim_key = f"analytics_warm:{league}:{season}:{round_name}"
+            if not CacheService().add(claim_key, time.time(), timeout=self.claim_timeout):
+                return []
+
+            group_ids = self.groups_by_size(league)
+            current_app.logger.info(
+                f"Round {round_name} of {league} {season} settled, warming analytics for {len(group_ids)} groups"
+            )
+            return self.warm(group_ids)
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error scheduling analytics warm-up for fixture {fixture.fixture_id}: {str(e)}")
+            return []
+
+    @staticmethod
+    def round_settled(league: str, season: str, round_name: str) -> bool:
+        """True when every played fixture of the round is final and none has predictions left to score"""
+        in_round = (Fixture.league == league, Fixture.season == season, Fixture.round == round_name)
+
+        open_fixtures = db.session.query(func.count(Fixture.id)).filter(
+            *in_round,
+            ~Fixture.status.in_(MatchProcessingService.FINAL_STATUSES + UNPLAYED_STATUSES)
+        ).scalar()
+        if open_fixtures:
+            return False
+
+        unscored = db.session.query(func.count(UserPredictions.id)).join(Fixture).filter(
+            *in_round,
+            ~Fixture.status.in_(UNPLAYED_STATUSES),
+            UserPredictions.prediction_status == PredictionStatus.LOCKED
+        ).scalar()
+        return not unscored
+
+    @staticmethod
+    def groups_by_size(league: str) -> List[int]:
+        """A league's groups, most members first"""
+        membership = group_membership()
+        members = func.count(membership.c.user_id)
+        rows = db.session.query(Group.id).join(
+            membership, membership.c.group_id == Group.id
+        ).filter(
+            Group.league == league
+        ).group_by(Group.id).order_by(members.desc(), Group.id).all()
+        return [row.id for row in rows]
+
+    def warm(self, group_ids: List[int]) -> List[Future]:
+        """Queue the given groups for a refresh; the pool starts them in this order"""
+        app = current_app._get_current_object()
+        queued_at = time.perf_counter()
+        return [self._pool.submit(self._warm_one, app, group_id, queued_at) for group_id in group_ids]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def _warm_one(self, app: Flask, group_id: int, queued_at: float) -> bool:
+        with app.app_context():
+            try:
+                warmed = AnalyticsService().refresh_group_analytics(group_id)
+            except Exception as e:
+                current_app.logger.error(f"Analytics warm-up failed for group {group_id}: {str(e)}")
+                return False
+
+            current_app.logger.debug(
+                f"Warmed analytics for group {group_id} "
+                f"{round(time.perf_counter() - queued_at, 3)}s after the round settled"
+            )
+            return warmed
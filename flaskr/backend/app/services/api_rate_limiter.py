@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Optional
+from flask import current_app
+
+# KEYS[1] bucket key; ARGV: capacity, refill rate per second, tokens requested.
+# Takes the tokens and returns 0 when enough are available, otherwise takes
+# nothing and returns the seconds until they will be. Redis server time is
+# used so workers with skewed clocks agree.
+ACQUIRE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# KEYS[1] bucket key; ARGV: tokens the provider says are left.
+# Lowers the bucket to the provider's count, never raises it.
+SYNC_SCRIPT = """
+local remaining = tonumber(ARGV[1])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens and remaining < tokens then
+    redis.call('HSET', KEYS[1], 'tokens', remaining)
+end
+return 1
+"""
+
+
+class TokenBucket:
+    """Token bucket shared by every worker through Redis.
+
+    Both scripts run atomically in Redis, so concurrent workers never spend
+    the same token. Without Redis, or while it is unreachable, the bucket
+    falls back to a per-process bucket with the same semantics.
+    """
+
+    def __init__(self, redis_client=None, key: str = 'football_api:bucket',
+                 requests_per_minute: int = 300, burst: int = 10):
+        self.redis = redis_client
+        self.key = key
+        self.capacity = float(burst)
+        self.rate = requests_per_minute / 60.0
+
+        self._acquire = redis_client.register_script(ACQUIRE_SCRIPT) if redis_client else None
+        self._sync = redis_client.register_script(SYNC_SCRIPT) if redis_client else None
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """Take tokens without blocking; returns 0 on success or the seconds to wait"""
+        if self._acquire is not None:
+            try:
+                return float(self._acquire(keys=[self.key], args=[self.capacity, self.rate, tokens]))
+            except Exception as e:
+                current_app.logger.warning(f"Shared rate limiter unavailable, using local bucket: {str(e)}")
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None, tokens: int = 1) -> bool:
+        """Block until tokens are taken or the timeout passes"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def sync(self, remaining: int) -> None:
+        """Correct the bucket from the provider's remaining-requests header"""
+        remaining = max(0, remaining)
+        if self._sync is not None:
+            try:
+                self._sync(keys=[self.key], args=[remaining])
+                return
+            except Exception as e:
+                current_app.logger.warning(f"Error syncing shared rate limiter: {str(e)}")
+
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, float(remaining))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import redis
+from flask import current_app
+
+# Seconds a response stays fresh, by endpoint and the params that matter
+LIVE_TTL = 10
+FIXTURE_DETAIL_TTL = 30
+FIXTURES_BY_DATE_TTL = 15 * 60
+SEASON_FIXTURES_TTL = 6 * 3600
+TEAMS_TTL = 3 * 86400
+DEFAULT_TTL = 5 * 60
+
+# Entries are kept this much longer than their TTL so they can still be
+# revalidated with If-None-Match after going stale
+STALE_RETENTION = 86400
+
+STAT_NAMES = ('hits', 'misses', 'stale', 'revalidated', 'stores', 'disk_hits')
+
+
+def ttl_for(endpoint: str, params: Dict[str, Any]) -> int:
+    """Freshness policy for a request"""
+    if endpoint == 'fixtures':
+        if 'live' in params:
+            return LIVE_TTL
+        if 'id' in params or 'ids' in params:
+            return FIXTURE_DETAIL_TTL
+        if 'date' in params or 'from' in params:
+            return FIXTURES_BY_DATE_TTL
+        return SEASON_FIXTURES_TTL
+    if endpoint == 'teams':
+        return TEAMS_TTL
+    return DEFAULT_TTL
+
+
+class APIResponseCache:
+    """Two-tier cache of football API responses under ``_make_request``.
+
+    Entries are keyed by endpoint plus normalized params and hold the
+    response, its ETag and when it was stored. Redis is the shared tier; an
+    optional directory adds an on-disk tier that survives Redis restarts.
+    Hit and miss counters are kept in Redis so they cover every worker.
+    """
+
+    KEY_PREFIX = 'api_cache'
+    STATS_KEY = 'api_cache:stats'
+
+    def __init__(self, redis_client=None, disk_dir: Optional[str] = None):
+        self.redis = redis_client
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._stats = dict.fromkeys(STAT_NAMES, 0)
+        self._stats_lock = threading.Lock()
+
+    def key(self, endpoint: str, params: Dict[str, Any]) -> str:
+        normalized = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{endpoint}:{digest}"
+
+    def get(self, endpoint: str, params: Dict[str, Any], record: bool = True) -> Optional[Dict]:
+        """Cached entry with a ``fresh`` flag, or None; stale entries are returned for revalidation"""
+        key = self.key(endpoint, params)
+        entry = self._redis_get(key)
+        if entry is None:
+            entry = self._disk_get(key)
+            if entry is not None:
+                if record:
+                    self._count('disk_hits')
+                self._redis_write(key, entry, json.dumps(entry))
+
+        if entry is None:
+            if record:
+                self._count('misses')
+            return None
+
+        entry['fresh'] = time.time() < entry['stored_at'] + entry['ttl']
+        if record:
+            self._count('hits' if entry['fresh'] else 'stale')
+        return entry
+
+    def store(self, endpoint: str, params: Dict[str, Any], data: Any, etag: Optional[str] = None) -> None:
+        ttl = ttl_for(endpoint, params)
+        entry = {'data': data, 'etag': etag, 'stored_at': time.time(), 'ttl': ttl}
+        self._write(self.key(endpoint, params), entry)
+        self._count('stores')
+
+    def revalidated(self, endpoint: str, params: Dict[str, Any], entry: Dict) -> None:
+        """Restart the freshness window of an entry after a 304 Not Modified"""
+        entry = {k: v for k, v in entry.items() if k != 'fresh'}
+        entry['stored_at'] = time.time()
+        self._write(self.key(endpoint, params), entry)
+        self._count('revalidated')
+
+    def stats(self) -> Dict[str, int]:
+        """Counters across all workers when Redis is available, else for this process"""
+        if self.redis is not None:
+            try:
+                shared = self.redis.hgetall(self.STATS_KEY)
+                return {name: int(shared.get(name, 0)) for name in STAT_NAMES}
+            except Exception as e:
+                current_app.logger.warning(f"Error reading API cache stats: {str(e)}")
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _write(self, key: str, entry: Dict) -> None:
+        payload = json.dumps(entry)
+        self._redis_write(key, entry, payload)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                current_app.logger.warning(f"API disk cache write error: {str(e)}")
+
+    def _redis_write(self, key: str, entry: Dict, payload: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(key, int(entry['ttl'] + STALE_RETENTION), payload)
+        except Exception as e:
+            current_app.logger.warning(f"API cache write error: {str(e)}")
+
+    def _redis_get(self, key: str) -> Optional[Dict]:
+        if self.redis is None:
+            return None
+        try:
+            payload = self.redis.get(key)
+            return json.loads(payload) if payload else None
+        except Exception as e:
+            current_app.logger.warning(f"API cache read error: {str(e)}")
+            return None
+
+    def _disk_get(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() > entry['stored_at'] + entry['ttl'] + STALE_RETENTION:
+            return None
+        return entry
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key.replace(':', '_') + '.json')
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+        if self.redis is not None:
+            try:
+                self.redis.hincrby(self.STATS_KEY, name, 1)
+            except redis.RedisError as e:
+                # Counted locally above; only the shared counter misses this one
+                current_app.logger.debug(f"API cache stats write error: {str(e)}")
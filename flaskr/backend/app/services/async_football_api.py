@@ -0,0 +1,168 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from flask import current_app
+import aiohttp
+
+from app.services.api_rate_limiter import TokenBucket
+from app.services.fixture_batcher import MAX_IDS_PER_REQUEST
+
+
+class AsyncFootballAPIService:
+    """asyncio client for the football API.
+
+    Requests share one keep-alive connection pool per event loop and are
+    capped by a concurrency semaphore. Request starts take tokens from the
+    shared rate limiter when one is given, and are otherwise spaced locally
+    to stay inside the per-minute request budget.
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int = 10, timeout: float = 10.0,
+                 requests_per_minute: int = 300, connection_limit: int = 20,
+                 rate_limiter: Optional[TokenBucket] = None):
+        self.api_key = api_key.strip()
+        self.base_url = "https://v3.football.api-sports.io"
+        self.headers = {
+            'x-rapidapi-key': self.api_key,
+            'x-rapidapi-host': 'v3.football.api-sports.io',
+            'Accept-Encoding': 'gzip'
+        }
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=min(timeout, 5.0))
+        self.min_interval = 60.0 / requests_per_minute
+        self.connection_limit = connection_limit
+        self.rate_limiter = rate_limiter
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pace_lock: Optional[asyncio.Lock] = None
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Session, semaphore and pacing lock for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                await self._close_stale_session()
+            connector = aiohttp.TCPConnector(limit=self.connection_limit, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=self.timeout,
+                connector=connector,
+                auto_decompress=True
+            )
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._pace_lock = asyncio.Lock()
+        return self._session
+
+    async def _close_stale_session(self) -> None:
+        """Close the session of a previous event loop so its connections aren't leaked"""
+        try:
+            await self._session.close()
+        except Exception as e:
+            # Its loop may already be closed; the connector is marked closed either way
+            current_app.logger.debug(f"Error closing stale football API session: {str(e)}")
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _pace(self) -> None:
+        """Wait for the next request slot in the per-minute budget"""
+        if self.rate_limiter is not None:
+            while True:
+                wait = await asyncio.to_thread(self.rate_limiter.try_acquire)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+        async with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _make_request(self, endpoint: str, params: Dict[str, Any], max_retries: int = 3) -> Optional[List[Dict]]:
+        """Make request to football API with bounded concurrency and retries on 429"""
+        session = await self._get_session()
+        url = f"{self.base_url}/{endpoint}"
+        params = {key: str(value) for key, value in params.items()}
+        retries = 0
+
+        while retries < max_retries:
+            try:
+                async with self._semaphore:
+                    await self._pace()
+                    current_app.logger.debug(f"Making async API request to: {url} with params: {params}")
+
+                    async with session.get(url, params=params) as response:
+                        remaining = response.headers.get('X-RateLimit-Remaining')
+                        if self.rate_limiter is not None and remaining is not None and remaining.isdigit():
+                            self.rate_limiter.sync(int(remaining))
+
+                        if response.status == 429:
+                            retries += 1
+                            wait_time = min(2 ** retries, 60)
+                            current_app.logger.warning(
+                                f"Rate limit exceeded. Retrying in {wait_time} seconds... (Attempt {retries}/{max_retries})"
+                            )
+                        else:
+                            response.raise_for_status()
+                            data = await response.json()
+
+                            if not data.get('response') and data.get('errors'):
+                                current_app.logger.error(f"API Error: {data['errors']}")
+                                return None
+                            return data.get('response', [])
+
+                await asyncio.sleep(wait_time)
+
+            except asyncio.TimeoutError:
+                current_app.logger.error(f"API request timed out: {url} with params: {params}")
+                break
+            except aiohttp.ClientError as e:
+                current_app.logger.error(f"API Request failed: {str(e)}")
+                break
+
+        return None
+
+    async def get_fixture_details(self, fixture_id: int) -> Optional[Dict]:
+        """Get full details for a single fixture"""
+        response = await self._make_request('fixtures', {'id': fixture_id})
+        return response[0] if response else None
+
+    async def get_fixtures_details(self, fixture_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get details for many fixtures, 20 ids per request with batches fetched concurrently"""
+        fixture_ids = list(dict.fromkeys(fixture_ids))
+        batches = [
+            fixture_ids[start:start + MAX_IDS_PER_REQUEST]
+            for start in range(0, len(fixture_ids), MAX_IDS_PER_REQUEST)
+        ]
+        results = await asyncio.gather(
+            *(self._make_request('fixtures', {'ids': '-'.join(map(str, batch))}) for batch in batches),
+            return_exceptions=True
+        )
+
+        details = dict.fromkeys(fixture_ids)
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                current_app.logger.error(f"Error fetching fixtures {batch}: {str(result)}")
+                continue
+            for fixture in result or []:
+                details[fixture['fixture']['id']] = fixture
+        return details
+
+    async def get_live_fixtures(self, league_id: int) -> Optional[List[Dict]]:
+        """Get live fixtures for a specific league"""
+        return await self._make_request('fixtures', {'league': league_id, 'live': 'all'})
@@ -38,6 +38,15 @@ class CacheService:
             current_app.logger.error(f"Cache set error: {str(e)}")
             return False
 
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        """Set value only if the key does not exist yet; True when this call stored it."""
+        try:
+            timeout = timeout or self.default_timeout
+            return bool(self.redis_client.set(key, json.dumps(value), ex=timeout, nx=True))
+        except Exception as e:
+            current_app.logger.error(f"Cache add error: {str(e)}")
+            return False
+
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
         try:
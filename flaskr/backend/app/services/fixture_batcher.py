@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterable, List, Optional
+from flask import current_app
+
+# The provider accepts at most this many ids per `fixtures?ids=` call
+MAX_IDS_PER_REQUEST = 20
+
+
+class FixtureDetailBatcher:
+    """Coalesces fixture detail lookups into multi-id provider calls.
+
+    Callers queue fixture ids and wait on a future per id. The first caller
+    to find no flush in progress becomes the leader: it waits a short
+    window so callers on other threads can join, then drains the queue in
+    batches of up to 20 ids, one request per batch, and resolves every
+    waiting future. Ids already queued or in flight share one future.
+    A caller that has waited ``timeout`` seconds on another caller's flush
+    stops waiting and fetches what it is still missing itself.
+    """
+
+    def __init__(self, fetch: Callable[[List[int]], Optional[List[Dict]]],
+                 batch_size: int = MAX_IDS_PER_REQUEST, window: float = 0.05,
+                 timeout: Optional[float] = None):
+        self.fetch = fetch
+        self.batch_size = min(batch_size, MAX_IDS_PER_REQUEST)
+        self.window = window
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queued: Dict[int, Future] = {}
+        self._in_flight: Dict[int, Future] = {}
+        self._flushing = False
+
+    def get_many(self, fixture_ids: Iterable[int]) -> Dict[int, Optional[Dict]]:
+        """Fixture details by id, None for fixtures the provider did not return"""
+        fixture_ids = list(dict.fromkeys(fixture_ids))
+        if not fixture_ids:
+            return {}
+
+        with self._lock:
+            futures = {}
+            for fixture_id in fixture_ids:
+                future = self._in_flight.get(fixture_id) or self._queued.get(fixture_id)
+                if future is None:
+                    future = Future()
+                    self._queued[fixture_id] = future
+                futures[fixture_id] = future
+
+            leader = not self._flushing
+            if leader:
+                self._flushing = True
+
+        if leader:
+            try:
+                if len(fixture_ids) < self.batch_size:
+                    time.sleep(self.window)
+                self._flush()
+            except BaseException:
+                # Let the next caller take over the queue
+                with self._lock:
+                    self._flushing = False
+                raise
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        results, missing = {}, []
+        for fixture_id, future in futures.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results[fixture_id] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                missing.append(fixture_id)
+
+        if missing:
+            current_app.logger.warning(
+                f"Timed out after {self.timeout}s waiting for batched fixtures {missing}, fetching them directly"
+            )
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                found = self._fetch_batch(batch)
+                results.update({fixture_id: found.get(fixture_id) for fixture_id in batch})
+        return results
+
+    def _flush(self) -> None:
+        """Drain the queue in provider-sized batches until it is empty"""
+        while True:
+            with self._lock:
+                if not self._queued:
+                    self._flushing = False
+                    return
+                batch = dict(list(self._queued.items())[:self.batch_size])
+                for fixture_id in batch:
+                    del self._queued[fixture_id]
+                self._in_flight.update(batch)
+
+            found = self._fetch_batch(list(batch))
+
+            with self._lock:
+                for fixture_id, future in batch.items():
+                    del self._in_flight[fixture_id]
+                    future.set_result(found.get(fixture_id))
+
+    def _fetch_batch(self, fixture_ids: List[int]) -> Dict[int, Dict]:
+        """One provider call for up to batch_size ids, keyed by fixture id"""
+        try:
+            response = self.fetch(fixture_ids) or []
+            return {fixture['fixture']['id']: fixture for fixture in response}
+        except Exception as e:
+            current_app.logger.error(f"Error fetching fixture batch {fixture_ids}: {str(e)}")
+            return {}
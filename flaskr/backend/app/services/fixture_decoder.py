@@ -0,0 +1,252 @@
+import codecs
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from app.models import MatchStatus
+
+# Provider short status codes
+STATUS_BY_SHORT = {
+    "TBD": MatchStatus.NOT_STARTED,
+    "NS": MatchStatus.NOT_STARTED,
+    "1H": MatchStatus.FIRST_HALF,
+    "HT": MatchStatus.HALFTIME,
+    "2H": MatchStatus.SECOND_HALF,
+    "ET": MatchStatus.EXTRA_TIME,
+    "BT": MatchStatus.BREAK_TIME,
+    "P": MatchStatus.PENALTY,
+    "SUSP": MatchStatus.SUSPENDED,
+    "INT": MatchStatus.INTERRUPTED,
+    "FT": MatchStatus.FINISHED,
+    "AET": MatchStatus.FINISHED_AET,
+    "PEN": MatchStatus.FINISHED_PEN,
+    "PST": MatchStatus.POSTPONED,
+    "CANC": MatchStatus.CANCELLED,
+    "ABD": MatchStatus.ABANDONED,
+    "AWD": MatchStatus.TECHNICAL_LOSS,
+    "WO": MatchStatus.WALKOVER,
+    "LIVE": MatchStatus.LIVE
+}
+
+# Provider long status names, used when a payload carries no short code
+STATUS_BY_LONG = {
+    "Time To Be Defined": MatchStatus.NOT_STARTED,
+    "Not Started": MatchStatus.NOT_STARTED,
+    "First Half": MatchStatus.FIRST_HALF,
+    "Halftime": MatchStatus.HALFTIME,
+    "Second Half": MatchStatus.SECOND_HALF,
+    "Extra Time": MatchStatus.EXTRA_TIME,
+    "Penalty In Progress": MatchStatus.PENALTY,
+    "Match Finished": MatchStatus.FINISHED,
+    "Match Finished After Extra Time": MatchStatus.FINISHED_AET,
+    "Match Finished After Penalty": MatchStatus.FINISHED_PEN,
+    "Break Time": MatchStatus.BREAK_TIME,
+    "Match Suspended": MatchStatus.SUSPENDED,
+    "Match Interrupted": MatchStatus.INTERRUPTED,
+    "Match Postponed": MatchStatus.POSTPONED,
+    "Match Cancelled": MatchStatus.CANCELLED,
+    "Match Abandoned": MatchStatus.ABANDONED,
+    "Technical Loss": MatchStatus.TECHNICAL_LOSS,
+    "Walkover": MatchStatus.WALKOVER,
+    "Live": MatchStatus.LIVE
+}
+
+FINISHED_STATUSES = (MatchStatus.FINISHED, MatchStatus.FINISHED_AET, MatchStatus.FINISHED_PEN)
+
+
+class FixtureRecord(NamedTuple):
+    """Flat, typed view of one provider fixture"""
+    fixture_id: int
+    date: datetime
+    status: MatchStatus
+    status_short: Optional[str]
+    elapsed: Optional[int]
+    home_team: str
+    away_team: str
+    home_team_logo: Optional[str]
+    away_team_logo: Optional[str]
+    home_goals: Optional[int]
+    away_goals: Optional[int]
+    halftime_score: Optional[str]
+    fulltime_score: Optional[str]
+    extratime_score: Optional[str]
+    penalty_score: Optional[str]
+    league_id: Optional[int]
+    league_name: Optional[str]
+    season: Optional[int]
+    round: Optional[str]
+    venue_city: Optional[str]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+def normalize_status(short: Optional[str], long: Optional[str] = None,
+                     default: MatchStatus = MatchStatus.NOT_STARTED) -> MatchStatus:
+    """Map a provider status to MatchStatus, preferring the short code"""
+    status = STATUS_BY_SHORT.get(short)
+    if status is None:
+        status = STATUS_BY_LONG.get(long, default)
+    return status
+
+
+def parse_date(value: Union[str, int]) -> datetime:
+    """Parse a provider fixture date: ISO 8601 with offset, or a unix timestamp"""
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value)
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+def _score(period: Optional[Dict]) -> Optional[str]:
+    if not period:
+        return None
+    home = period.get('home')
+    away = period.get('away')
+    if home is None or away is None:
+        return None
+    return f"{home}-{away}"
+
+
+def decode_fixture(item: Dict[str, Any], default_status: MatchStatus = MatchStatus.NOT_STARTED) -> FixtureRecord:
+    """Decode one provider fixture in a single pass; raises on malformed input"""
+    fixture = item['fixture']
+    status = fixture.get('status') or {}
+    teams = item['teams']
+    home = teams['home']
+    away = teams['away']
+    league = item.get('league') or {}
+    goals = item.get('goals') or {}
+    score = item.get('score') or {}
+    venue = fixture.get('venue') or {}
+
+    return FixtureRecord(
+        fixture['id'],
+        parse_date(fixture['date']),
+        normalize_status(status.get('short'), status.get('long'), default_status),
+        status.get('short'),
+        status.get('elapsed'),
+        home['name'],
+        away['name'],
+        home.get('logo'),
+        away.get('logo'),
+        goals.get('home'),
+        goals.get('away'),
+        _score(score.get('halftime')),
+        _score(score.get('fulltime')),
+        _score(score.get('extratime')),
+        _score(score.get('penalty')),
+        league.get('id'),
+        league.get('name'),
+        league.get('season'),
+        league.get('round'),
+        venue.get('city')
+    )
+
+
+def decode_response(body: Union[bytes, str]) -> List[FixtureRecord]:
+    """Decode a raw fixtures response body straight into records"""
+    return [decode_fixture(item) for item in json.loads(body).get('response') or []]
+
+
+def iter_response(chunks: Iterable[bytes], meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a body's ``response`` array as the chunks arrive.
+
+    Only the item being decoded and the unread part of the current chunk
+    are held in memory. The other top-level fields (errors, paging, ...)
+    are stored in ``meta`` when one is given.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    exhausted = False
+
+    def more() -> bool:
+        nonlocal buf, pos, exhausted
+        if exhausted:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            text = utf8.decode(b'', final=True)
+        else:
+            text = utf8.decode(chunk)
+        buf = buf[pos:] + text
+        pos = 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not more():
+                raise ValueError('Unexpected end of response body')
+
+    def expect(char: str) -> None:
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {pos} of response body")
+        pos += 1
+
+    def value() -> Any:
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not more():
+                    raise
+                continue
+            # A number running into the end of the buffer may continue in the next chunk
+            if end == len(buf) and more():
+                continue
+            pos = end
+            return result
+
+    expect('{')
+    if peek() == '}':
+        return
+    while True:
+        key = value()
+        expect(':')
+        if key == 'response' and peek() == '[':
+            pos += 1
+            if peek() == ']':
+                pos += 1
+            else:
+                while True:
+                    yield value()
+                    if peek() == ',':
+                        pos += 1
+                        continue
+                    expect(']')
+                    break
+        else:
+            field = value()
+            if meta is not None:
+                meta[key] = field
+        if peek() == ',':
+            pos += 1
+            continue
+        expect('}')
+        return
+
+
+def iter_fixtures(chunks: Iterable[bytes], meta: Optional[Dict[str, Any]] = None,
+                  on_error: Optional[Callable[[Dict, Exception], None]] = None) -> Iterator[FixtureRecord]:
+    """Stream a fixtures response body as records; malformed items go to ``on_error`` if given"""
+    for item in iter_response(chunks, meta):
+        try:
+            yield decode_fixture(item)
+        except (KeyError, TypeError, ValueError) as e:
+            if on_error is None:
+                raise
+            on_error(item, e)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from sqlalchemy import case, func, literal_column, or_, select, union
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import db, Fixture, Team, MatchStatus
+from app.services.fixture_decoder import FixtureRecord, decode_fixture
+
+# The provider reports no goals for these, so stored scores are kept as they are
+SCORELESS_STATUSES = [
+    MatchStatus.NOT_STARTED,
+    MatchStatus.POSTPONED,
+    MatchStatus.CANCELLED
+]
+
+
+class FixtureIngestionService:
+    """Set-based loading of provider fixtures into the database.
+
+    A league's payload is normalized into rows first and then written with
+    a single INSERT ... ON CONFLICT (fixture_id) DO UPDATE. Teams are
+    derived from the fixtures table with one INSERT ... SELECT.
+    """
+
+    def normalize(self, fixtures: List[Dict], league_name: str, league_id: int, season: int) -> List[Dict]:
+        """Turn a provider fixtures payload into fixture rows"""
+        rows = {}
+        now = datetime.utcnow()
+        for fixture_data in fixtures:
+            try:
+                record = decode_fixture(fixture_data)
+            except (KeyError, TypeError, ValueError) as e:
+                current_app.logger.error(
+                    f"Skipping malformed fixture {fixture_data.get('fixture', {}).get('id')}: {str(e)}"
+                )
+                continue
+
+            row = self.to_row(record, league_name, league_id, season, now)
+            # ON CONFLICT cannot touch the same row twice in one statement
+            rows[record.fixture_id] = row
+        return list(rows.values())
+
+    def to_row(self, record: FixtureRecord, league_name: str, league_id: int,
+               season: int, checked_at: datetime) -> Dict:
+        """Fixture table row for a decoded record"""
+        row = {
+            'fixture_id': record.fixture_id,
+            'home_team': record.home_team,
+            'away_team': record.away_team,
+            'home_team_logo': record.home_team_logo,
+            'away_team_logo': record.away_team_logo,
+            'date': record.date,
+            'league': league_name,
+            'season': str(season),
+            'round': record.round,
+            'status': record.status,
+            'home_score': record.home_goals if record.home_goals is not None else 0,
+            'away_score': record.away_goals if record.away_goals is not None else 0,
+            'venue_city': record.venue_city,
+            'competition_id': league_id,
+            'match_timestamp': record.date,
+            'halftime_score': record.halftime_score,
+            'fulltime_score': record.fulltime_score,
+            'last_checked': checked_at
+        }
+        row['content_hash'] = self.content_hash(row)
+        return row
+
+    @staticmethod
+    def content_hash(row: Dict) -> str:
+        """Fingerprint of a fixture row's provider data, ignoring bookkeeping columns"""
+        content = {
+            key: value.name if isinstance(value, MatchStatus) else value
+            for key, value in row.items()
+            if key not in ('last_checked', 'content_hash')
+        }
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def upsert_fixtures(self, rows: List[Dict]) -> Dict[str, int]:
+        """Insert or update fixture rows in one statement; committed by the caller"""
+        if not rows:
+            return {'inserted': 0, 'updated': 0}
+
+        stmt = insert(Fixture).values(rows)
+        scoreless = stmt.excluded.status.in_(SCORELESS_STATUSES)
+        home_score = case((scoreless, Fixture.home_score), else_=stmt.excluded.home_score)
+        away_score = case((scoreless, Fixture.away_score), else_=stmt.excluded.away_score)
+        changed = or_(
+            Fixture.status.is_distinct_from(stmt.excluded.status),
+            Fixture.home_score.is_distinct_from(home_score),
+            Fixture.away_score.is_distinct_from(away_score)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Fixture.fixture_id],
+            set_={
+                # Everything the content hash covers, so a stored hash always matches the row
+                'home_team': stmt.excluded.home_team,
+                'away_team': stmt.excluded.away_team,
+                'home_team_logo': stmt.excluded.home_team_logo,
+                'away_team_logo': stmt.excluded.away_team_logo,
+                'date': stmt.excluded.date,
+                'match_timestamp': stmt.excluded.match_timestamp,
+                'league': stmt.excluded.league,
+                'season': stmt.excluded.season,
+                'round': stmt.excluded.round,
+                'venue_city': stmt.excluded.venue_city,
+                'competition_id': stmt.excluded.competition_id,
+                'status': stmt.excluded.status,
+                'home_score': home_score,
+                'away_score': away_score,
+                'halftime_score': func.coalesce(stmt.excluded.halftime_score, Fixture.halftime_score),
+                'fulltime_score': func.coalesce(stmt.excluded.fulltime_score, Fixture.fulltime_score),
+                'content_hash': stmt.excluded.content_hash,
+                'last_checked': stmt.excluded.last_checked,
+                # Only real changes move the watermark used by verification and recovery
+                'last_updated': case((changed, datetime.utcnow()), else_=Fixture.last_updated)
+            }
+        ).returning(literal_column('xmax = 0'))
+
+        inserted = sum(1 for (was_inserted,) in db.session.execute(stmt) if was_inserted)
+        return {'inserted': inserted, 'updated': len(rows) - inserted}
+
+    def ingest_league(self, fixtures: Optional[List[Dict]], league_name: str,
+                      league_id: int, season: int, fetch_seconds: float = 0.0) -> Dict:
+        """Normalize and write one league's fixtures, reporting throughput"""
+        started = time.perf_counter()
+        report = {
+            'league': league_name,
+            'fixtures': len(fixtures or []),
+            'inserted': 0,
+            'updated': 0,
+            'fetch_seconds': round(fetch_seconds, 3)
+        }
+
+        try:
+            rows = self.normalize(fixtures or [], league_name, league_id, season)
+            report.update(self.upsert_fixtures(rows))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error ingesting fixtures for {league_name}: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        report['write_seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['fixtures'] / elapsed, 1) if elapsed > 0 else 0.0
+        current_app.logger.info(
+            f"Ingested {report['fixtures']} fixtures for {league_name} season {season}: "
+            f"{report['inserted']} new, {report['updated']} updated in {report['write_seconds']}s "
+            f"({report['rows_per_second']} rows/s, fetched in {report['fetch_seconds']}s)"
+        )
+        return report
+
+    def ingest_league_stream(self, records: Iterable[FixtureRecord], league_name: str,
+                             league_id: int, season: int, batch_size: Optional[int] = None) -> Dict:
+        """Write a stream of decoded fixtures in bounded upsert batches, committing once"""
+        batch_size = batch_size or current_app.config.get('INGESTION_BATCH_SIZE', 500)
+        started = time.perf_counter()
+        report = {
+            'league': league_name,
+            'fixtures': 0,
+            'inserted': 0,
+            'updated': 0,
+            'batches': 0
+        }
+
+        try:
+            now = datetime.utcnow()
+            batch = {}
+            for record in records:
+                batch[record.fixture_id] = self.to_row(record, league_name, league_id, season, now)
+                report['fixtures'] += 1
+                if len(batch) >= batch_size:
+                    self._write_batch(batch, report)
+                    batch = {}
+            if batch:
+                self._write_batch(batch, report)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error ingesting fixtures for {league_name}: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        report['elapsed_seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['fixtures'] / elapsed, 1) if elapsed > 0 else 0.0
+        current_app.logger.info(
+            f"Ingested {report['fixtures']} fixtures for {league_name} season {season} in "
+            f"{report['batches']} batches: {report['inserted']} new, {report['updated']} updated "
+            f"in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)"
+        )
+        return report
+
+    def _write_batch(self, batch: Dict[int, Dict], report: Dict) -> None:
+        counts = self.upsert_fixtures(list(batch.values()))
+        report['inserted'] += counts['inserted']
+        report['updated'] += counts['updated']
+        report['batches'] += 1
+
+    def populate_teams(self) -> int:
+        """Add every team seen in fixtures that is not in the teams table yet"""
+        try:
+            teams = union(
+                select(Fixture.home_team.label('team'), Fixture.home_team_logo.label('logo')),
+                select(Fixture.away_team.label('team'), Fixture.away_team_logo.label('logo'))
+            ).subquery()
+            source = select(teams.c.team, teams.c.logo).distinct(teams.c.team).order_by(teams.c.team)
+
+            stmt = insert(Team).from_select(['team_name', 'team_logo'], source)
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Team.team_name]).returning(Team.id)
+
+            added = len(db.session.execute(stmt).all())
+            db.session.commit()
+            current_app.logger.info(f"Populated {added} new teams into the teams table.")
+            return added
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error populating teams: {str(e)}")
+            raise
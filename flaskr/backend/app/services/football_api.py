@@ -1,85 +1,305 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, has_request_context
 from app.db import get_db
+from app.services.api_rate_limiter import TokenBucket
+from app.services.api_response_cache import APIResponseCache
+from app.services.fixture_batcher import FixtureDetailBatcher
+from app.services.single_flight import SingleFlight
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.cache_service import CacheService
+from app.services.fixture_decoder import FixtureRecord, decode_fixture, iter_fixtures
 import requests
-from typing import Optional, List, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, List, Dict, Any, Iterator
+import random
+import threading
 import time
-from datetime import datetime, timedelta
+
+# Total seconds a call may take across retries, by call site
+LATENCY_BUDGETS = {
+    'live': 5.0,
+    'details': 8.0,
+    'default': 15.0,
+    'season': 30.0
+}
+
+# Bytes read at a time when streaming a response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# Request kinds whose stale responses would be written back as current
+# scores and statuses, so a failed call returns nothing instead
+NO_STALE_KINDS = ('live', 'details')
+
+
+def request_kind(endpoint: str, params: Dict[str, Any]) -> str:
+    """Call site a request belongs to, as keyed in LATENCY_BUDGETS"""
+    if endpoint == 'fixtures':
+        if 'live' in params:
+            return 'live'
+        if 'id' in params or 'ids' in params:
+            return 'details'
+        if 'season' in params and 'date' not in params:
+            return 'season'
+    return 'default'
+
+
+def latency_budget(endpoint: str, params: Dict[str, Any]) -> float:
+    """Default latency budget for a request"""
+    return LATENCY_BUDGETS[request_kind(endpoint, params)]
 
 class FootballAPIService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, rate_limiter: Optional[TokenBucket] = None,
+                 response_cache: Optional[APIResponseCache] = None):
         self.api_key = api_key.strip()  # Remove any whitespace
         self.base_url = "https://v3.football.api-sports.io"
         self.headers = {
             'x-rapidapi-key': self.api_key,
             'x-rapidapi-host': 'v3.football.api-sports.io'
         }
-        # Pro Plan rate limiting
-        self.requests_per_minute = 300
-        self.minute_requests = 0
-        self.last_request_time = datetime.now()
-        self.last_reset_time = datetime.now()
-
-    def _check_rate_limits(self):
-        """Check and handle rate limits"""
-        current_time = datetime.now()
-
-        # Reset minute counter if it's been more than a minute
-        if (current_time - self.last_reset_time) >= timedelta(minutes=1):
-            self.minute_requests = 0
-            self.last_reset_time = current_time
-            current_app.logger.debug("Rate limit counter reset")
-
-        # Check if we're approaching the limit (leave some buffer)
-        if self.minute_requests >= (self.requests_per_minute - 10):
-            seconds_until_reset = 60 - (current_time - self.last_reset_time).seconds
-            if seconds_until_reset > 0:
-                current_app.logger.info(f"Approaching rate limit. Waiting {seconds_until_reset} seconds...")
-                time.sleep(seconds_until_reset)
-                self.minute_requests = 0
-                self.last_reset_time = datetime.now()
-
-    def _make_request(self, endpoint: str, params: Dict[str, Any], max_retries: int = 3) -> Optional[List[Dict]]:
-        """Make request to football API with error handling and rate limiting"""
-        retries = 0
-        while retries < max_retries:
+        redis_client = CacheService().redis_client
+
+        # Responses are cached per endpoint and params to save quota
+        self.response_cache = response_cache or APIResponseCache(
+            redis_client,
+            disk_dir=current_app.config.get('FOOTBALL_API_CACHE_DIR')
+        )
+
+        self.single_flight = SingleFlight(
+            redis_client,
+            lock_timeout=current_app.config.get('FOOTBALL_API_SINGLE_FLIGHT_TIMEOUT', 30)
+        )
+
+        # Concurrent fixture detail lookups share multi-id requests
+        self.fixture_batcher = FixtureDetailBatcher(
+            self.get_fixtures_by_ids,
+            window=current_app.config.get('FIXTURE_BATCH_WINDOW', 0.05),
+            timeout=LATENCY_BUDGETS['details']
+        )
+
+        # Timeouts, hedging of live calls and a breaker for a degraded provider
+        self.session = requests.Session()
+        self.connect_timeout = current_app.config.get('FOOTBALL_API_CONNECT_TIMEOUT', 3.05)
+        self.hedge_after = current_app.config.get('FOOTBALL_API_HEDGE_AFTER', 1.5)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='api-hedge')
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=current_app.config.get('FOOTBALL_API_CIRCUIT_THRESHOLD', 5),
+            reset_timeout=current_app.config.get('FOOTBALL_API_CIRCUIT_RESET', 30)
+        )
+        self._metrics = dict.fromkeys(('retries', 'timeouts', 'hedges', 'hedge_wins', 'stale_served'), 0)
+        self._metrics_lock = threading.Lock()
+
+        # Pro Plan rate limiting, shared by every worker through Redis
+        self.requests_per_minute = current_app.config.get('FOOTBALL_API_REQUESTS_PER_MINUTE', 300)
+        self.max_queue_wait = current_app.config.get('FOOTBALL_API_MAX_QUEUE_WAIT', 60)
+        self.rate_limiter = rate_limiter or TokenBucket(
+            redis_client,
+            requests_per_minute=self.requests_per_minute - 10,  # leave some buffer
+            burst=current_app.config.get('FOOTBALL_API_BURST', 10)
+        )
+
+    def _check_rate_limits(self) -> bool:
+        """Take a request token; request threads fail fast while background jobs wait"""
+        if has_request_context():
+            wait = self.rate_limiter.try_acquire()
+            if wait > 0:
+                current_app.logger.warning(f"API rate limit reached, next request slot in {wait:.1f} seconds")
+                return False
+            return True
+
+        if not self.rate_limiter.acquire(timeout=self.max_queue_wait):
+            current_app.logger.warning(f"No API request slot within {self.max_queue_wait} seconds")
+            return False
+        return True
+
+    def _make_request(self, endpoint: str, params: Dict[str, Any], max_retries: int = 3,
+                      budget: Optional[float] = None) -> Optional[List[Dict]]:
+        """Make request to football API with caching, error handling and rate limiting"""
+        cached = self.response_cache.get(endpoint, params)
+        if cached is not None and cached['fresh']:
+            current_app.logger.debug(f"API cache hit for {endpoint} with params: {params}")
+            return cached['data']
+
+        if budget is None:
+            budget = latency_budget(endpoint, params)
+
+        # Identical concurrent requests, here or in other workers, share one call
+        return self.single_flight.do(
+            self.response_cache.key(endpoint, params),
+            lambda: self._fetch(endpoint, params, cached, max_retries, budget),
+            lambda: self._fresh_cached(endpoint, params)
+        )
+
+    def _fresh_cached(self, endpoint: str, params: Dict[str, Any]) -> Optional[List[Dict]]:
+        cached = self.response_cache.get(endpoint, params, record=False)
+        return cached['data'] if cached is not None and cached['fresh'] else None
+
+    def _fetch(self, endpoint: str, params: Dict[str, Any], cached: Optional[Dict],
+               max_retries: int, budget: float) -> Optional[List[Dict]]:
+        """Call the provider within a latency budget, revalidating a stale cache entry when there is one"""
+        if not self.circuit_breaker.allow():
+            current_app.logger.warning(f"Circuit open for football API, not calling {endpoint}")
+            return self._serve_stale(endpoint, params, cached)
+
+        headers = dict(self.headers)
+        if cached is not None and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        url = f"{self.base_url}/{endpoint}"
+        hedge = 'live' in params and self.hedge_after is not None
+        deadline = time.monotonic() + budget
+        attempt = 0
+
+        while attempt < max_retries:
+            attempt += 1
+            retry_after = None
             try:
-                self._check_rate_limits()
-                
-                url = f"{self.base_url}/{endpoint}"
+                if not self._check_rate_limits():
+                    return self._serve_stale(endpoint, params, cached)
+
+                remaining_budget = deadline - time.monotonic()
+                if remaining_budget <= 0:
+                    break
+
                 current_app.logger.debug(f"Making API request to: {url} with params: {params}")
+                response = self._send(url, headers, params, remaining_budget, hedge)
                 
-                response = requests.get(url, headers=self.headers, params=params)
-                
-                # Update rate limit counter
-                self.minute_requests += 1
-                self.last_request_time = datetime.now()
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                if not data.get('response') and data.get('errors'):
-                    current_app.logger.error(f"API Error: {data['errors']}")
-                    return None
-                
-                # Log successful response
-                current_app.logger.info(f"API request successful. Found {len(data.get('response', []))} items")
+                # Correct the shared bucket from the provider's own count
+                remaining = response.headers.get('X-RateLimit-Remaining')
+                if remaining is not None and remaining.isdigit():
+                    self.rate_limiter.sync(int(remaining))
+
+                if response.status_code == 304:
+                    self.circuit_breaker.record_success()
+                    if cached is not None:
+                        self.response_cache.revalidated(endpoint, params, cached)
+                        return cached['data']
+                    # Nothing to revalidate against, so ask again for the full body
+                    headers.pop('If-None-Match', None)
+                    retry_after = 0.0
+                    current_app.logger.warning(
+                        f"Not Modified without a cached response for {endpoint} (Attempt {attempt}/{max_retries})"
+                    )
+                elif response.status_code == 429:
+                    # The provider is up, just throttling us
+                    self.circuit_breaker.record_success()
+                    if has_request_context():
+                        current_app.logger.warning("Rate limit exceeded, not retrying in a request thread")
+                        return self._serve_stale(endpoint, params, cached)
+                    retry_after = self._retry_after(response)
+                    current_app.logger.warning(f"Rate limit exceeded (Attempt {attempt}/{max_retries})")
+                elif response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                    retry_after = self._retry_after(response)
+                    current_app.logger.warning(
+                        f"API server error {response.status_code} (Attempt {attempt}/{max_retries})"
+                    )
+                else:
+                    self.circuit_breaker.record_success()
+                    response.raise_for_status()
+
+                    data = response.json()
+                    if not data.get('response') and data.get('errors'):
+                        current_app.logger.error(f"API Error: {data['errors']}")
+                        return None
                     
-                return data.get('response', [])
-                
+                    # Log successful response
+                    current_app.logger.info(f"API request successful. Found {len(data.get('response', []))} items")
+
+                    result = data.get('response', [])
+                    self.response_cache.store(endpoint, params, result, response.headers.get('ETag'))
+                    return result
+
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Too Many Requests
-                    retries += 1
-                    wait_time = min(2 ** retries, 60)  # Exponential backoff, max 60 seconds
-                    current_app.logger.warning(f"Rate limit exceeded. Retrying in {wait_time} seconds... (Attempt {retries}/{max_retries})")
-                    time.sleep(wait_time)
-                    continue
                 current_app.logger.error(f"HTTP Error: {str(e)}")
-                break
+                return None
+            except requests.exceptions.Timeout:
+                self.circuit_breaker.record_failure()
+                self._count('timeouts')
+                current_app.logger.warning(f"API request timed out (Attempt {attempt}/{max_retries})")
             except requests.exceptions.RequestException as e:
-                current_app.logger.error(f"API Request failed: {str(e)}")
+                self.circuit_breaker.record_failure()
+                current_app.logger.warning(f"API Request failed: {str(e)} (Attempt {attempt}/{max_retries})")
+
+            if attempt >= max_retries:
                 break
+            wait_time = self._backoff(attempt, retry_after)
+            if time.monotonic() + wait_time >= deadline:
+                current_app.logger.warning(f"Latency budget of {budget}s exhausted for {endpoint}")
+                break
+            self._count('retries')
+            time.sleep(wait_time)
             
-        return None
+        return self._serve_stale(endpoint, params, cached)
+
+    def _send(self, url: str, headers: Dict, params: Dict[str, Any],
+              remaining_budget: float, hedge: bool) -> requests.Response:
+        """Send one request, hedging it with a second one if the first is slow"""
+        timeout = (min(self.connect_timeout, remaining_budget), remaining_budget)
+        if not hedge:
+            return self.session.get(url, headers=headers, params=params, timeout=timeout)
+
+        first = self._hedge_pool.submit(self.session.get, url, headers=headers, params=params, timeout=timeout)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done or self.rate_limiter.try_acquire() > 0:
+            return first.result()
+
+        self._count('hedges')
+        second = self._hedge_pool.submit(self.session.get, url, headers=headers, params=params, timeout=timeout)
+        done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        other = second if winner is first else first
+        try:
+            response = winner.result()
+        except requests.exceptions.RequestException:
+            return other.result()
+        # The slower request is still in flight; give its connection back once it lands
+        other.add_done_callback(self._close_response)
+        if winner is second:
+            self._count('hedge_wins')
+        return response
+
+    @staticmethod
+    def _close_response(future) -> None:
+        if future.exception() is None:
+            future.result().close()
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+        """Provider-requested delay, else full-jitter exponential backoff"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 0.5)
+        return random.uniform(0, min(2 ** attempt, 60))
+
+    def _serve_stale(self, endpoint: str, params: Dict[str, Any], cached: Optional[Dict]) -> Optional[List[Dict]]:
+        if cached is None:
+            return None
+        if request_kind(endpoint, params) in NO_STALE_KINDS:
+            current_app.logger.warning(f"Not serving stale cached response for {endpoint} with params: {params}")
+            return None
+        self._count('stale_served')
+        current_app.logger.warning(f"Serving stale cached response for {endpoint} with params: {params}")
+        return cached['data']
+
+    def _count(self, name: str) -> None:
+        with self._metrics_lock:
+            self._metrics[name] += 1
+
+    def api_metrics(self) -> Dict[str, float]:
+        """Retry, hedging and circuit breaker metrics for this process"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics.update(self.circuit_breaker.metrics())
+        return metrics
 
     def get_fixtures_by_season(self, league_id: int, season: int) -> Optional[List[Dict]]:
         """Get fixtures for a specific league and season"""
@@ -87,7 +307,78 @@ class FootballAPIService:
             'league': league_id,
             'season': season
         }
-        return self._make_request('fixtures', params)
+        return self._make_request('fixtures', params, budget=LATENCY_BUDGETS['season'])
+
+    def stream_fixtures_by_season(self, league_id: int, season: int) -> Iterator[FixtureRecord]:
+        """Stream a season's fixtures as records, decoding the body as it downloads.
+
+        Season payloads are not written to the response cache on this path,
+        since that would hold the whole season in memory again. A fresh
+        cached season is still used, and any failure before the body starts
+        falls back to the regular request with its retries and stale serving.
+        """
+        params = {
+            'league': league_id,
+            'season': season
+        }
+        cached = self._fresh_cached('fixtures', params)
+        if cached is not None:
+            yield from self._decode_all(cached)
+            return
+
+        response = None
+        if self.circuit_breaker.allow() and self._check_rate_limits():
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/fixtures",
+                    headers=self.headers,
+                    params=params,
+                    timeout=(self.connect_timeout, LATENCY_BUDGETS['season']),
+                    stream=True
+                )
+            except requests.exceptions.RequestException as e:
+                self.circuit_breaker.record_failure()
+                current_app.logger.warning(f"Streaming request failed: {str(e)}")
+
+        if response is None or response.status_code != 200:
+            if response is not None:
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                response.close()
+            yield from self._decode_all(self.get_fixtures_by_season(league_id, season))
+            return
+
+        self.circuit_breaker.record_success()
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if remaining is not None and remaining.isdigit():
+            self.rate_limiter.sync(int(remaining))
+
+        meta = {}
+        count = 0
+        with response:
+            for record in iter_fixtures(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                meta,
+                on_error=lambda item, e: current_app.logger.error(
+                    f"Skipping malformed fixture {item.get('fixture', {}).get('id')}: {str(e)}"
+                )
+            ):
+                count += 1
+                yield record
+
+        if not count and meta.get('errors'):
+            current_app.logger.error(f"API Error: {meta['errors']}")
+        current_app.logger.info(f"Streamed {count} fixtures for league {league_id} season {season}")
+
+    @staticmethod
+    def _decode_all(fixtures: Optional[List[Dict]]) -> Iterator[FixtureRecord]:
+        for item in fixtures or []:
+            try:
+                yield decode_fixture(item)
+            except (KeyError, TypeError, ValueError) as e:
+                current_app.logger.error(
+                    f"Skipping malformed fixture {item.get('fixture', {}).get('id')}: {str(e)}"
+                )
 
     def get_fixtures_by_date(self, league_id: int, season: int, date: Optional[str] = None) -> Optional[List[Dict]]:
         """Get fixtures for a specific date"""
@@ -100,13 +391,46 @@ class FootballAPIService:
             
         return self._make_request('fixtures', params)
 
+    def get_fixtures_in_window(self, league_id: int, season: int,
+                               date_from: str, date_to: str) -> Optional[List[Dict]]:
+        """Get fixtures for a league between two dates (YYYY-MM-DD, inclusive)"""
+        params = {
+            'league': league_id,
+            'season': season,
+            'from': date_from,
+            'to': date_to
+        }
+        return self._make_request('fixtures', params)
+
     def get_live_fixtures(self, league_id: int) -> Optional[List[Dict]]:
         """Get live fixtures for a specific league"""
         params = {
             'league': league_id,
             'live': 'all'
         }
-        return self._make_request('fixtures', params)
+        return self._make_request('fixtures', params, budget=LATENCY_BUDGETS['live'])
+
+    def get_fixture_details(self, fixture_id: int) -> Optional[Dict]:
+        """Get full details for a single fixture"""
+        return self.fixture_batcher.get_many([fixture_id])[fixture_id]
+
+    def get_fixtures_details(self, fixture_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get full details for many fixtures, batched 20 ids per request"""
+        return self.fixture_batcher.get_many(fixture_ids)
+
+    def get_fixtures_by_ids(self, fixture_ids: List[int]) -> Optional[List[Dict]]:
+        """Get up to 20 fixtures in a single request"""
+        params = {
+            'ids': '-'.join(str(fixture_id) for fixture_id in fixture_ids)
+        }
+        return self._make_request('fixtures', params, budget=LATENCY_BUDGETS['details'])
+
+    def get_live_fixtures_for_leagues(self, league_ids: List[int]) -> Optional[List[Dict]]:
+        """Get live fixtures for several leagues in a single request"""
+        params = {
+            'live': '-'.join(str(league_id) for league_id in league_ids)
+        }
+        return self._make_request('fixtures', params, budget=LATENCY_BUDGETS['live'])
 
 bp = Blueprint('football_api', __name__, url_prefix='/api')
 
@@ -0,0 +1,254 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from app.models import (
+    db, Fixture, UserPredictions, Group, GroupStanding, VerificationCheckpoint,
+    VerificationChecksum, MatchStatus, PredictionStatus
+)
+from app.services.points_audit import PointsAuditService
+
+FINISHED_STATUSES = [
+    MatchStatus.FINISHED,
+    MatchStatus.FINISHED_AET,
+    MatchStatus.FINISHED_PEN
+]
+
+# (row_count, points_sum, digest)
+Checksum = Tuple[int, int, str]
+
+
+class IncrementalVerificationService:
+    """Verification that only revisits what changed since the last run.
+
+    Fixtures updated, or with predictions modified, after the stored
+    watermark are candidates. A candidate whose checksum over its score
+    and processed predictions still matches the stored one is skipped,
+    as is a group whose standings checksum is unchanged and whose league
+    had no fixture audited.
+
+    Watermarks are taken when a run starts, so rows written by transactions
+    still open at that moment can carry an earlier timestamp than the
+    watermark. Scans therefore start an overlap before it; rows seen twice
+    cost only a checksum comparison.
+    """
+
+    VERIFY_TASK = 'verify_points_and_tables'
+    RECOVERY_TASK = 'recover_failed_processing'
+    STORE_BATCH_SIZE = 1000
+
+    def __init__(self, auditor: PointsAuditService):
+        self.auditor = auditor
+
+    def verify(self) -> Dict:
+        """Audit only fixtures and groups whose checksums changed since the watermark"""
+        started_at = datetime.utcnow()
+        watermark = self.scan_from(self.VERIFY_TASK)
+
+        if watermark is None:
+            current_app.logger.info("No verification watermark found, running full audit")
+            report = self.auditor.run()
+            self._store_checksums('fixture', self._fixture_checksums())
+            self._store_checksums('group', self._group_checksums())
+            self.set_watermark(self.VERIFY_TASK, started_at)
+            db.session.commit()
+            report['mode'] = 'full'
+            return report
+
+        candidates = self._changed_fixtures(watermark)
+        fixture_ids = list(candidates)
+        current = self._fixture_checksums(fixture_ids)
+        stored = self._stored_checksums('fixture', fixture_ids)
+        audit_fixture_ids = [fid for fid in fixture_ids if current.get(fid) != stored.get(fid)]
+        audit_leagues = {candidates[fid] for fid in audit_fixture_ids}
+
+        groups = self._groups_in_leagues(set(candidates.values()))
+        group_ids = list(groups)
+        current_groups = self._group_checksums(group_ids)
+        stored_groups = self._stored_checksums('group', group_ids)
+        audit_group_ids = [
+            gid for gid in group_ids
+            if groups[gid] in audit_leagues or current_groups.get(gid) != stored_groups.get(gid)
+        ]
+
+        report = self.auditor.run(fixture_ids=audit_fixture_ids, group_ids=audit_group_ids)
+
+        try:
+            self._store_checksums('fixture', self._fixture_checksums(audit_fixture_ids))
+            self._store_checksums('group', self._group_checksums(audit_group_ids))
+            self.set_watermark(self.VERIFY_TASK, started_at)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error storing verification checksums: {str(e)}")
+            raise
+
+        report.update({
+            'mode': 'incremental',
+            'fixtures_changed': len(fixture_ids),
+            'fixtures_skipped': len(fixture_ids) - len(audit_fixture_ids),
+            'groups_changed': len(group_ids),
+            'groups_skipped': len(group_ids) - len(audit_group_ids)
+        })
+        current_app.logger.info(
+            f"Incremental verification since {watermark.isoformat()}: "
+            f"audited {len(audit_fixture_ids)}/{len(fixture_ids)} fixtures and "
+            f"{len(audit_group_ids)}/{len(group_ids)} groups"
+        )
+        return report
+
+    def get_watermark(self, task: str) -> Optional[datetime]:
+        """Get the stored watermark for a task"""
+        return db.session.execute(
+            select(VerificationCheckpoint.watermark).where(VerificationCheckpoint.task == task)
+        ).scalar()
+
+    def scan_from(self, task: str) -> Optional[datetime]:
+        """Where a task's next scan starts: its watermark less the overlap, or None without one"""
+        watermark = self.get_watermark(task)
+        if watermark is None:
+            return None
+        overlap = current_app.config.get('VERIFICATION_WATERMARK_OVERLAP_MINUTES', 10)
+        return watermark - timedelta(minutes=overlap)
+
+    def set_watermark(self, task: str, watermark: datetime) -> None:
+        """Store the watermark for a task; committed by the caller"""
+        stmt = insert(VerificationCheckpoint).values(
+            task=task,
+            watermark=watermark,
+            updated_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VerificationCheckpoint.task],
+            set_={'watermark': stmt.excluded.watermark, 'updated_at': stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt)
+
+    def _changed_fixtures(self, watermark: datetime) -> Dict[int, str]:
+        """Finished fixtures touched since the watermark, mapped to their league"""
+        modified_predictions = select(UserPredictions.fixture_id).where(
+            UserPredictions.last_modified > watermark
+        )
+        rows = db.session.execute(
+            select(Fixture.fixture_id, Fixture.league).where(
+                Fixture.status.in_(FINISHED_STATUSES),
+                or_(
+                    Fixture.last_updated > watermark,
+                    Fixture.fixture_id.in_(modified_predictions)
+                )
+            )
+        ).all()
+        return {row.fixture_id: row.league for row in rows}
+
+    def _groups_in_leagues(self, leagues: Iterable[str]) -> Dict[int, str]:
+        leagues = list(leagues)
+        if not leagues:
+            return {}
+        rows = db.session.execute(
+            select(Group.id, Group.league).where(Group.league.in_(leagues))
+        ).all()
+        return {row.id: row.league for row in rows}
+
+    def _fixture_checksums(self, fixture_ids: Optional[List[int]] = None) -> Dict[int, Checksum]:
+        """Checksum over each fixture's score and its processed predictions"""
+        if fixture_ids is not None and not fixture_ids:
+            return {}
+
+        entries = func.string_agg(
+            func.concat(
+                UserPredictions.id, ':', UserPredictions.score1, '-',
+                UserPredictions.score2, ':', UserPredictions.points
+            ),
+            aggregate_order_by(literal_column("','"), UserPredictions.id)
+        )
+        stmt = select(
+            Fixture.fixture_id,
+            func.count(UserPredictions.id),
+            func.coalesce(func.sum(UserPredictions.points), 0),
+            func.md5(func.concat(
+                Fixture.home_score, '-', Fixture.away_score, '|', func.coalesce(entries, '')
+            ))
+        ).outerjoin(
+            UserPredictions,
+            and_(
+                UserPredictions.fixture_id == Fixture.fixture_id,
+                UserPredictions.prediction_status == PredictionStatus.PROCESSED
+            )
+        ).group_by(
+            Fixture.fixture_id, Fixture.home_score, Fixture.away_score
+        )
+
+        if fixture_ids is None:
+            stmt = stmt.where(Fixture.status.in_(FINISHED_STATUSES))
+        else:
+            stmt = stmt.where(Fixture.fixture_id.in_(fixture_ids))
+
+        return {row[0]: (row[1], int(row[2]), row[3]) for row in db.session.execute(stmt)}
+
+    def _group_checksums(self, group_ids: Optional[List[int]] = None) -> Dict[int, Checksum]:
+        """Checksum over each group's standings rows"""
+        if group_ids is not None and not group_ids:
+            return {}
+
+        entries = func.string_agg(
+            func.concat(
+                GroupStanding.user_id, ':', GroupStanding.season, ':', GroupStanding.points, ':',
+                GroupStanding.exact_hits, ':', GroupStanding.correct_results, ':', GroupStanding.predictions
+            ),
+            aggregate_order_by(literal_column("','"), GroupStanding.user_id, GroupStanding.season)
+        )
+        stmt = select(
+            GroupStanding.group_id,
+            func.count(GroupStanding.id),
+            func.coalesce(func.sum(GroupStanding.points), 0),
+            func.md5(func.coalesce(entries, ''))
+        ).group_by(
+            GroupStanding.group_id
+        )
+
+        if group_ids is not None:
+            stmt = stmt.where(GroupStanding.group_id.in_(group_ids))
+
+        return {row[0]: (row[1], int(row[2]), row[3]) for row in db.session.execute(stmt)}
+
+    def _stored_checksums(self, scope: str, scope_ids: List[int]) -> Dict[int, Checksum]:
+        if not scope_ids:
+            return {}
+        rows = db.session.execute(
+            select(
+                VerificationChecksum.scope_id,
+                VerificationChecksum.row_count,
+                VerificationChecksum.points_sum,
+                VerificationChecksum.digest
+            ).where(
+                VerificationChecksum.scope == scope,
+                VerificationChecksum.scope_id.in_(scope_ids)
+            )
+        ).all()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def _store_checksums(self, scope: str, checksums: Dict[int, Checksum]) -> None:
+        now = datetime.utcnow()
+        rows = [{
+            'scope': scope,
+            'scope_id': scope_id,
+            'row_count': row_count,
+            'points_sum': points_sum,
+            'digest': digest,
+            'verified_at': now
+        } for scope_id, (row_count, points_sum, digest) in checksums.items()]
+
+        for start in range(0, len(rows), self.STORE_BATCH_SIZE):
+            stmt = insert(VerificationChecksum).values(rows[start:start + self.STORE_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                constraint='_verification_scope_uc',
+                set_={
+                    'row_count': stmt.excluded.row_count,
+                    'points_sum': stmt.excluded.points_sum,
+                    'digest': stmt.excluded.digest,
+                    'verified_at': stmt.excluded.verified_at
+                }
+            )
+            db.session.execute(stmt)
@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from flask import Flask, current_app
+
+# (league_name, league_id, season)
+IngestionJob = Tuple[str, int, int]
+
+_BATCH = 'batch'
+_END = 'end'
+_ERROR = 'error'
+
+
+class RecordStream:
+    """Records a fetcher thread streams for one job, handed over in bounded batches"""
+
+    def __init__(self, max_batches: int):
+        self._batches = queue.Queue(maxsize=max_batches)
+        self._cancelled = threading.Event()
+        self.fetch_seconds = 0.0
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            kind, value = self._batches.get()
+            if kind == _END:
+                return
+            if kind == _ERROR:
+                raise value
+            yield from value
+
+    def put(self, kind: str, value: Any = None) -> bool:
+        """Hand a batch to the writer; False once the writer has given up on the stream"""
+        while not self._cancelled.is_set():
+            try:
+                self._batches.put((kind, value), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+
+class IngestionOrchestrator:
+    """Fetches many leagues concurrently and writes them as they arrive.
+
+    Fetchers run on pool threads, each inside its own application context,
+    and hand their payloads to the calling thread through a bounded queue.
+    The calling thread does every database write, so fetching the next
+    leagues overlaps with writing the previous ones. Fetchers outside a
+    request wait on the shared API token bucket, so the provider budget
+    holds however many leagues are queued.
+
+    ``fetch`` may return a list or an iterator. An iterator is consumed on
+    the fetcher thread and reaches the writer as a ``RecordStream`` of
+    ``batch_size`` records, with at most ``max_buffered_batches`` waiting
+    per fetcher, so memory stays flat however large the payloads are.
+    """
+
+    def __init__(self, fetch: Callable[[int, int], Optional[Iterable]],
+                 write: Callable[[IngestionJob, Optional[Iterable], float], Optional[Dict]],
+                 max_fetchers: int = 4, batch_size: int = 500, max_buffered_batches: int = 2):
+        self.fetch = fetch
+        self.write = write
+        self.max_fetchers = max_fetchers
+        self.batch_size = batch_size
+        self.max_buffered_batches = max_buffered_batches
+
+    def run(self, jobs: List[IngestionJob]) -> Dict:
+        """Fetch and write every job, reporting per-league results"""
+        started = time.perf_counter()
+        report = {
+            'jobs': len(jobs),
+            'written': 0,
+            'failed': [],
+            'fetch_seconds': 0.0,
+            'write_seconds': 0.0,
+            'results': []
+        }
+        if not jobs:
+            report['elapsed_seconds'] = 0.0
+            return report
+
+        app = current_app._get_current_object()
+        # Bounded so fetchers cannot run far ahead of the writer
+        fetched = queue.Queue(maxsize=self.max_fetchers * 2)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_fetchers, len(jobs)),
+                                thread_name_prefix='ingestion') as pool:
+            for job in jobs:
+                pool.submit(self._fetch_one, app, job, fetched)
+
+            for _ in jobs:
+                job, payload, fetch_seconds, error = fetched.get()
+                report['fetch_seconds'] += fetch_seconds
+                if error is not None:
+                    current_app.logger.error(f"Error fetching fixtures for {job[0]} season {job[2]}: {error}")
+                    report['failed'].append(job[0])
+                    continue
+
+                write_started = time.perf_counter()
+                try:
+                    result = self.write(job, payload, fetch_seconds)
+                except Exception as e:
+                    current_app.logger.error(f"Error writing fixtures for {job[0]} season {job[2]}: {str(e)}")
+                    report['failed'].append(job[0])
+                    continue
+                finally:
+                    report['write_seconds'] += time.perf_counter() - write_started
+                    if isinstance(payload, RecordStream):
+                        # Streams download while they are written, so their time counts as fetching too
+                        payload.cancel()
+                        report['fetch_seconds'] += payload.fetch_seconds
+
+                report['written'] += 1
+                if result:
+                    report['results'].append(result)
+
+        report['fetch_seconds'] = round(report['fetch_seconds'], 3)
+        report['write_seconds'] = round(report['write_seconds'], 3)
+        report['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        current_app.logger.info(
+            f"Ingested {report['written']}/{report['jobs']} leagues in {report['elapsed_seconds']}s "
+            f"({report['fetch_seconds']}s fetching across workers, {report['write_seconds']}s writing, "
+            f"{len(report['failed'])} failed)"
+        )
+        return report
+
+    def _fetch_one(self, app: Flask, job: IngestionJob, fetched: queue.Queue) -> None:
+        """Fetch one league on a pool thread and queue the payload for the writer"""
+        league_name, league_id, season = job
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                payload = self.fetch(league_id, season)
+                error = None
+                if payload is not None and not isinstance(payload, list):
+                    stream = RecordStream(self.max_buffered_batches)
+                    fetched.put((job, stream, 0.0, None))
+                    self._pump(payload, stream, started)
+                    return
+            except Exception as e:
+                payload = None
+                error = str(e)
+        fetched.put((job, payload, time.perf_counter() - started, error))
+
+    def _pump(self, records: Iterable, stream: RecordStream, started: float) -> None:
+        """Move an iterator's records into a stream, batch by batch"""
+        batch = []
+        try:
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    if not stream.put(_BATCH, batch):
+                        return
+                    batch = []
+            if batch and not stream.put(_BATCH, batch):
+                return
+            stream.fetch_seconds = time.perf_counter() - started
+            stream.put(_END)
+        except Exception as e:
+            stream.fetch_seconds = time.perf_counter() - started
+            stream.put(_ERROR, e)
+        finally:
+            close = getattr(records, 'close', None)
+            if close is not None:
+                close()
@@ -0,0 +1,181 @@
+import json
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from flask import current_app
+from sqlalchemy import select, update
+
+from app.models import db, Fixture, MatchStatus
+from app.services.cache_service import CacheService
+from app.services.fixture_decoder import FixtureRecord, decode_fixture
+
+# Fixture columns tracked for live changes
+TRACKED_FIELDS = (
+    'status', 'home_score', 'away_score',
+    'halftime_score', 'fulltime_score', 'extratime_score', 'penalty_score'
+)
+
+
+class LiveDeltaTracker:
+    """Keeps the last written live state per fixture and writes only changes.
+
+    State lives in a Redis hash when a cache is available, so every worker
+    shares it, and in process memory otherwise. Fixtures without known
+    state are seeded from the database. Each poll applies all changed
+    fixtures with one batched UPDATE and one commit, then hands the list
+    of changes to registered listeners and the Redis changes channel.
+    """
+
+    STATE_KEY = 'live:fixture_state'
+    CHANGES_CHANNEL = 'live:changes'
+    STATE_TTL = 6 * 3600
+
+    def __init__(self, cache: Optional[CacheService] = None):
+        self.cache = cache
+        self._memory: Dict[int, Dict] = {}
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+
+    def add_listener(self, listener: Callable[[List[Dict]], None]) -> None:
+        """Register a callable that receives the changed fixtures of each poll"""
+        self._listeners.append(listener)
+
+    def apply(self, matches: List[Dict]) -> List[Dict]:
+        """Write the changed fixtures of a poll and return the changes"""
+        incoming = {}
+        for match in matches:
+            try:
+                record = decode_fixture(match, default_status=MatchStatus.LIVE)
+            except (KeyError, TypeError, ValueError):
+                current_app.logger.warning("Skipping malformed live match")
+                continue
+            incoming[record.fixture_id] = record
+        if not incoming:
+            return []
+
+        try:
+            previous, seeded = self._load_state(list(incoming))
+            changes = []
+            rows = []
+            now = datetime.now(timezone.utc)
+
+            for fixture_id, record in incoming.items():
+                state = previous.get(fixture_id)
+                if state is None:
+                    current_app.logger.warning(f"Fixture not found: {fixture_id}")
+                    continue
+
+                snapshot = self._snapshot(record, state)
+                diff = {
+                    field: snapshot[field] for field in TRACKED_FIELDS
+                    if snapshot[field] != state.get(field)
+                }
+                if not diff:
+                    continue
+
+                snapshot['id'] = state['id']
+                previous[fixture_id] = snapshot
+                rows.append(dict(self._to_columns(snapshot), last_checked=now))
+                changes.append({'fixture_id': fixture_id, 'changes': diff})
+
+            if rows:
+                db.session.execute(update(Fixture), rows)
+                db.session.commit()
+            dirty = seeded | {c['fixture_id'] for c in changes}
+            self._save_state({fixture_id: previous[fixture_id] for fixture_id in dirty})
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error applying live updates: {str(e)}")
+            raise
+
+        current_app.logger.info(
+            f"Live poll: {len(changes)} of {len(incoming)} fixtures changed"
+        )
+        for change in changes:
+            current_app.logger.debug(f"Fixture {change['fixture_id']} changed: {change['changes']}")
+
+        if changes:
+            self._publish(changes)
+        return changes
+
+    def _snapshot(self, record: FixtureRecord, state: Dict) -> Dict:
+        """Compact live state for a fixture from a decoded payload"""
+        snapshot = {
+            'status': record.status.value,
+            'home_score': record.home_goals if record.home_goals is not None else state.get('home_score'),
+            'away_score': record.away_goals if record.away_goals is not None else state.get('away_score')
+        }
+        for period in ('halftime', 'fulltime', 'extratime', 'penalty'):
+            value = getattr(record, f"{period}_score")
+            snapshot[f"{period}_score"] = value if value is not None else state.get(f"{period}_score")
+        return snapshot
+
+    @staticmethod
+    def _to_columns(snapshot: Dict) -> Dict:
+        columns = {field: snapshot[field] for field in TRACKED_FIELDS}
+        columns['status'] = MatchStatus(snapshot['status'])
+        columns['id'] = snapshot['id']
+        return columns
+
+    def _load_state(self, fixture_ids: List[int]) -> Tuple[Dict[int, Dict], Set[int]]:
+        """Known state for the fixtures, seeding unknown ones from the database"""
+        state = self._redis_state(fixture_ids)
+        if state is None:
+            state = {
+                fixture_id: self._memory[fixture_id]
+                for fixture_id in fixture_ids if fixture_id in self._memory
+            }
+
+        missing = [fixture_id for fixture_id in fixture_ids if fixture_id not in state]
+        if missing:
+            rows = db.session.execute(
+                select(Fixture.id, Fixture.fixture_id, *(getattr(Fixture, f) for f in TRACKED_FIELDS))
+                .where(Fixture.fixture_id.in_(missing))
+            ).all()
+            for row in rows:
+                seeded = {field: getattr(row, field) for field in TRACKED_FIELDS}
+                seeded['status'] = row.status.value if row.status else None
+                seeded['id'] = row.id
+                state[row.fixture_id] = seeded
+        return state, {fixture_id for fixture_id in missing if fixture_id in state}
+
+    def _redis_state(self, fixture_ids: List[int]) -> Optional[Dict[int, Dict]]:
+        if self.cache is None:
+            return None
+        try:
+            values = self.cache.redis_client.hmget(self.STATE_KEY, fixture_ids)
+            return {
+                fixture_id: json.loads(value)
+                for fixture_id, value in zip(fixture_ids, values) if value
+            }
+        except Exception as e:
+            current_app.logger.warning(f"Live state unavailable in Redis, using memory: {str(e)}")
+            return None
+
+    def _save_state(self, state: Dict[int, Dict]) -> None:
+        if not state:
+            return
+        self._memory.update(state)
+        if self.cache is None:
+            return
+        try:
+            pipe = self.cache.redis_client.pipeline()
+            pipe.hset(self.STATE_KEY, mapping={
+                fixture_id: json.dumps(value) for fixture_id, value in state.items()
+            })
+            pipe.expire(self.STATE_KEY, self.STATE_TTL)
+            pipe.execute()
+        except Exception as e:
+            current_app.logger.warning(f"Error saving live state to Redis: {str(e)}")
+
+    def _publish(self, changes: List[Dict]) -> None:
+        if self.cache is not None:
+            try:
+                self.cache.redis_client.publish(self.CHANGES_CHANNEL, json.dumps(changes))
+            except Exception as e:
+                current_app.logger.warning(f"Error publishing live changes: {str(e)}")
+
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                current_app.logger.error(f"Error in live change listener: {str(e)}")
@@ -1,16 +1,25 @@
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional
 from flask import current_app
 
 from app.models import Fixture, MatchStatus, PredictionStatus
 from app.services.score_processing import ScoreProcessingService
 from app.services.football_api import FootballAPIService
+from app.services.async_football_api import AsyncFootballAPIService
+from app.services.fixture_decoder import decode_fixture
 
 class MatchMonitorService:
     def __init__(self, football_api_service: FootballAPIService, 
-                 score_processor: ScoreProcessingService):
+                 score_processor: ScoreProcessingService,
+                 async_api: Optional[AsyncFootballAPIService] = None):
         self.api = football_api_service
         self.score_processor = score_processor
+        self.async_api = async_api or AsyncFootballAPIService(
+            football_api_service.api_key,
+            max_concurrency=current_app.config.get('FOOTBALL_API_CONCURRENCY', 10),
+            timeout=current_app.config.get('FOOTBALL_API_TIMEOUT', 10.0),
+            rate_limiter=football_api_service.rate_limiter
+        )
 
     async def monitor_live_matches(self):
         """Monitor all live matches and process completed ones"""
@@ -27,18 +36,22 @@ class MatchMonitorService:
                 ])
             ).all()
 
+            if not matches:
+                return
+
+            # Fetch the latest data for every live match concurrently
+            async with self.async_api:
+                details = await self.async_api.get_fixtures_details([match.fixture_id for match in matches])
+
             for match in matches:
                 try:
-                    # Get latest match data from API
-                    api_data = await self.api.get_fixture_details(match.fixture_id)
+                    api_data = details.get(match.fixture_id)
                     if not api_data:
                         continue
 
-                    current_status = api_data['fixture']['status']['short']
-                    
                     # Check if match has completed
-                    if current_status in ['FT', 'AET', 'PEN']:
-                        await self.process_completed_match(match, api_data)
+                    if decode_fixture(api_data).is_finished:
+                        self.process_completed_match(match, api_data)
                         
                 except Exception as e:
                     current_app.logger.error(
@@ -50,14 +63,14 @@ class MatchMonitorService:
             current_app.logger.error(f"Error in match monitoring: {str(e)}")
             raise
 
-    async def process_completed_match(self, match: Fixture, api_data: Dict):
+    def process_completed_match(self, match: Fixture, api_data: Dict):
         """Process a completed match and update all related data"""
         try:
             # Update match status and scores
-            await self.score_processor.update_fixture_status(match, api_data)
+            self.score_processor.update_fixture_status(match, api_data)
             
             # Process predictions and update points
-            await self.score_processor.process_final_score(match, api_data)
+            self.score_processor.process_final_score(match, api_data)
             
             current_app.logger.info(
                 f"Successfully processed completed match {match.fixture_id}"
@@ -67,4 +80,4 @@ class MatchMonitorService:
             current_app.logger.error(
                 f"Error processing completed match {match.fixture_id}: {str(e)}"
             )
-            raise
\ No newline at end of file
+            raise
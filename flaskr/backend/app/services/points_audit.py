@@ -0,0 +1,190 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set
+from flask import current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+import numpy as np
+
+from app.models import (
+    db, Fixture, UserPredictions, UserResults, MatchStatus, PredictionStatus
+)
+from app.services.scoring_rules import get_rule_set
+from app.services.analytics_rollup import AnalyticsRollupService
+from app.services.standings_service import StandingsService
+
+# Column order of the streamed audit rows
+ID, SCORE1, SCORE2, HOME_SCORE, AWAY_SCORE, POINTS = range(6)
+
+
+def find_drift(rule_set_name: str, chunk: np.ndarray):
+    """Recompute points for a chunk of audit rows and return the drifted ones.
+
+    Kept at module level so it can run in a process pool worker.
+    """
+    rule_set = get_rule_set(rule_set_name)
+    expected = rule_set.score_batch(
+        chunk[:, SCORE1], chunk[:, SCORE2], chunk[:, HOME_SCORE], chunk[:, AWAY_SCORE]
+    )
+    drift = expected != chunk[:, POINTS]
+    return chunk[drift, ID], expected[drift], chunk[drift, POINTS]
+
+
+class PointsAuditService:
+    """Memory-bounded audit of processed prediction points and group standings.
+
+    Audit rows are streamed from a server-side cursor in fixed-size chunks,
+    points are recomputed per chunk with the compiled scoring table and
+    corrections are written back with one batched UPDATE per chunk. Chunks
+    can optionally be scored in a process pool. The season totals of every
+    author with a corrected prediction are recomputed in the same
+    transaction.
+    """
+
+    def __init__(self, rule_set_name: Optional[str] = None,
+                 chunk_size: int = 5000, workers: int = 0):
+        self.rule_set_name = rule_set_name or get_rule_set().name
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def run(self, fixture_ids: Optional[List[int]] = None,
+            group_ids: Optional[List[int]] = None) -> Dict:
+        """Audit all finished fixtures and groups, or only the given ones, and fix any drift"""
+        started = time.perf_counter()
+        report = {
+            'scanned': 0,
+            'chunks': 0,
+            'mismatched': 0,
+            'fixed': 0,
+            'points_drift': 0,
+            'results_fixed': 0,
+            'group_rows_fixed': 0
+        }
+
+        try:
+            if self.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    authors = self._audit_predictions(fixture_ids, report, pool)
+            else:
+                authors = self._audit_predictions(fixture_ids, report, None)
+
+            report['results_fixed'] = self._reconcile_user_results(authors)
+            report['group_rows_fixed'] = StandingsService.rebuild(group_ids)
+            if report['fixed']:
+                # Rollups were built from the drifted points
+                AnalyticsRollupService.rebuild(group_ids)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error in points audit: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        report['elapsed_seconds'] = round(elapsed, 2)
+        report['rows_per_second'] = round(report['scanned'] / elapsed, 1) if elapsed > 0 else 0.0
+
+        log = current_app.logger.warning if report['mismatched'] or report['group_rows_fixed'] else current_app.logger.info
+        log(
+            f"Points audit: scanned {report['scanned']} predictions in {report['chunks']} chunks, "
+            f"fixed {report['fixed']} predictions ({report['points_drift']} points of drift), "
+            f"{report['results_fixed']} season totals and {report['group_rows_fixed']} group table rows in {report['elapsed_seconds']}s"
+        )
+        return report
+
+    def _stream_chunks(self, fixture_ids: Optional[List[int]]) -> Iterator[np.ndarray]:
+        """Yield audit rows as (n, 6) integer arrays from a server-side cursor"""
+        stmt = select(
+            UserPredictions.id,
+            UserPredictions.score1,
+            UserPredictions.score2,
+            func.coalesce(Fixture.home_score, 0),
+            func.coalesce(Fixture.away_score, 0),
+            UserPredictions.points
+        ).join(
+            Fixture, Fixture.fixture_id == UserPredictions.fixture_id
+        ).where(
+            Fixture.status.in_([
+                MatchStatus.FINISHED,
+                MatchStatus.FINISHED_AET,
+                MatchStatus.FINISHED_PEN
+            ]),
+            UserPredictions.prediction_status == PredictionStatus.PROCESSED
+        ).execution_options(yield_per=self.chunk_size)
+
+        if fixture_ids is not None:
+            if not fixture_ids:
+                return
+            stmt = stmt.where(UserPredictions.fixture_id.in_(fixture_ids))
+
+        for rows in db.session.execute(stmt).partitions():
+            yield np.array(rows, dtype=np.int64).reshape(-1, 6)
+
+    def _audit_predictions(self, fixture_ids: Optional[List[int]], report: Dict,
+                           pool: Optional[ProcessPoolExecutor]) -> Set[int]:
+        """Score every streamed chunk, write back corrections per chunk and return their authors"""
+        authors = set()
+        for ids, expected, recorded in self._score_chunks(fixture_ids, report, pool):
+            if not len(ids):
+                continue
+
+            report['mismatched'] += len(ids)
+            report['points_drift'] += int(np.abs(expected.astype(np.int64) - recorded).sum())
+            db.session.execute(
+                update(UserPredictions),
+                [{'id': int(i), 'points': int(p)} for i, p in zip(ids, expected)]
+            )
+            report['fixed'] += len(ids)
+            authors.update(db.session.execute(
+                select(UserPredictions.author_id).where(
+                    UserPredictions.id.in_([int(i) for i in ids])
+                ).distinct()
+            ).scalars())
+        return authors
+
+    def _reconcile_user_results(self, author_ids: Set[int]) -> int:
+        """Recompute the season totals of the given authors, writing only the rows that differ"""
+        if not author_ids:
+            return 0
+
+        totals = select(
+            UserPredictions.author_id,
+            func.sum(UserPredictions.points),
+            Fixture.season
+        ).join(
+            Fixture, Fixture.fixture_id == UserPredictions.fixture_id
+        ).where(
+            UserPredictions.author_id.in_(author_ids),
+            UserPredictions.prediction_status == PredictionStatus.PROCESSED
+        ).group_by(
+            UserPredictions.author_id, Fixture.season
+        )
+
+        stmt = insert(UserResults).from_select(['author_id', 'points', 'season'], totals)
+        stmt = stmt.on_conflict_do_update(
+            constraint='_user_season_uc',
+            set_={'points': stmt.excluded.points},
+            where=UserResults.points != stmt.excluded.points
+        )
+        return db.session.execute(stmt).rowcount
+
+    def _score_chunks(self, fixture_ids: Optional[List[int]], report: Dict,
+                      pool: Optional[ProcessPoolExecutor]) -> Iterator:
+        """Yield drift results per chunk, in-process or through the pool"""
+        in_flight = deque()
+        for chunk in self._stream_chunks(fixture_ids):
+            report['chunks'] += 1
+            report['scanned'] += len(chunk)
+
+            if pool is None:
+                yield find_drift(self.rule_set_name, chunk)
+                continue
+
+            # Bound the number of chunks held in memory while workers are busy
+            in_flight.append(pool.submit(find_drift, self.rule_set_name, chunk))
+            if len(in_flight) >= self.workers * 2:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
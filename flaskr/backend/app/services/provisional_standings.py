@@ -0,0 +1,215 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from sqlalchemy import and_, func, select
+import numpy as np
+
+from app.models import (
+    db, Fixture, UserPredictions, Users, Group, GroupStanding,
+    MatchStatus, PredictionStatus, group_membership
+)
+from app.services.cache_service import CacheService
+from app.services.scoring_rules import ScoringRuleSet, get_rule_set
+
+# Fixtures whose LOCKED predictions count provisionally. Finished fixtures
+# stay in until settlement marks their predictions PROCESSED, so points do
+# not disappear between the final whistle and settlement.
+IN_PLAY_STATUSES = [
+    MatchStatus.LIVE,
+    MatchStatus.FIRST_HALF,
+    MatchStatus.HALFTIME,
+    MatchStatus.SECOND_HALF,
+    MatchStatus.BREAK_TIME,
+    MatchStatus.EXTRA_TIME,
+    MatchStatus.PENALTY,
+    MatchStatus.FINISHED,
+    MatchStatus.FINISHED_AET,
+    MatchStatus.FINISHED_PEN
+]
+
+
+class ProvisionalStandingsService:
+    """"As it stands" group leaderboards while matches are in progress.
+
+    Settled standings are merged with LOCKED predictions scored against the
+    current live score. Results are cached per group and refreshed only for
+    the leagues whose live scores changed in a poll, so requests read the
+    cache instead of recomputing.
+    """
+
+    CACHE_TIMEOUT = 900
+
+    def __init__(self, cache: Optional[CacheService] = None,
+                 rule_set: Optional[ScoringRuleSet] = None):
+        self.cache = cache or CacheService()
+        self.rule_set = rule_set or get_rule_set()
+
+    @staticmethod
+    def cache_key(group_id: int) -> str:
+        return f"group:{group_id}:provisional"
+
+    def get(self, group_id: int) -> Optional[Dict]:
+        """Get a group's provisional standings, computing them on a cache miss"""
+        cached = self.cache.get(self.cache_key(group_id))
+        if cached is not None:
+            return cached
+
+        try:
+            league = db.session.execute(
+                select(Group.league).where(Group.id == group_id)
+            ).scalar()
+            if league is None:
+                return None
+
+            standings = self._compute_league(league, [group_id]).get(group_id)
+            if standings is not None:
+                self.cache.set(self.cache_key(group_id), standings, self.CACHE_TIMEOUT)
+            return standings
+
+        except Exception as e:
+            current_app.logger.error(f"Error getting provisional standings: {str(e)}")
+            return None
+
+    def refresh_fixtures(self, fixture_ids: Iterable[int]) -> int:
+        """Recompute and cache standings for every group in the leagues of these fixtures"""
+        fixture_ids = list(fixture_ids)
+        if not fixture_ids:
+            return 0
+
+        try:
+            leagues = db.session.execute(
+                select(Fixture.league).where(Fixture.fixture_id.in_(fixture_ids)).distinct()
+            ).scalars().all()
+
+            refreshed = 0
+            for league in leagues:
+                group_ids = db.session.execute(
+                    select(Group.id).where(Group.league == league)
+                ).scalars().all()
+                for group_id, standings in self._compute_league(league, group_ids).items():
+                    self.cache.set(self.cache_key(group_id), standings, self.CACHE_TIMEOUT)
+                    refreshed += 1
+
+            current_app.logger.info(
+                f"Refreshed provisional standings for {refreshed} groups in {len(leagues)} leagues"
+            )
+            return refreshed
+
+        except Exception as e:
+            current_app.logger.error(f"Error refreshing provisional standings: {str(e)}")
+            return 0
+
+    def _compute_league(self, league: str, group_ids: List[int]) -> Dict[int, Dict]:
+        """Provisional standings for groups of one league, keyed by group id"""
+        if not group_ids:
+            return {}
+
+        season = db.session.execute(
+            select(func.max(Fixture.season)).where(Fixture.league == league)
+        ).scalar()
+        live, live_fixtures = self._live_totals(league, season)
+
+        membership = group_membership()
+        rows = db.session.execute(
+            select(
+                membership.c.group_id,
+                membership.c.user_id,
+                Users.username,
+                func.coalesce(GroupStanding.points, 0),
+                func.coalesce(GroupStanding.exact_hits, 0),
+                func.coalesce(GroupStanding.correct_results, 0),
+                func.coalesce(GroupStanding.predictions, 0),
+                GroupStanding.rank
+            ).select_from(
+                membership
+            ).join(
+                Users, Users.id == membership.c.user_id
+            ).outerjoin(
+                GroupStanding,
+                and_(
+                    GroupStanding.group_id == membership.c.group_id,
+                    GroupStanding.user_id == membership.c.user_id,
+                    GroupStanding.season == season
+                )
+            ).where(
+                membership.c.group_id.in_(group_ids)
+            )
+        ).all()
+
+        members = {group_id: [] for group_id in group_ids}
+        for group_id, user_id, username, points, exact, correct, predictions, rank in rows:
+            live_points, live_exact, live_correct, live_predictions = live.get(user_id, (0, 0, 0, 0))
+            members[group_id].append({
+                'user_id': user_id,
+                'username': username,
+                'points': points + live_points,
+                'exact_hits': exact + live_exact,
+                'correct_results': correct + live_correct,
+                'predictions': predictions + live_predictions,
+                'live_points': live_points,
+                'settled_rank': rank
+            })
+
+        updated_at = datetime.now(timezone.utc).isoformat()
+        return {
+            group_id: {
+                'season': season,
+                'live_fixtures': live_fixtures,
+                'updated_at': updated_at,
+                'standings': self._rank(entries)
+            }
+            for group_id, entries in members.items()
+        }
+
+    def _live_totals(self, league: str, season: Optional[str]):
+        """Provisional points per user from LOCKED predictions on in-play fixtures"""
+        rows = db.session.execute(
+            select(
+                UserPredictions.author_id,
+                UserPredictions.fixture_id,
+                UserPredictions.score1,
+                UserPredictions.score2,
+                func.coalesce(Fixture.home_score, 0),
+                func.coalesce(Fixture.away_score, 0)
+            ).join(
+                Fixture, Fixture.fixture_id == UserPredictions.fixture_id
+            ).where(
+                Fixture.league == league,
+                Fixture.season == season,
+                Fixture.status.in_(IN_PLAY_STATUSES),
+                UserPredictions.prediction_status == PredictionStatus.LOCKED
+            )
+        ).all()
+        if not rows:
+            return {}, 0
+
+        data = np.array(rows, dtype=np.int64)
+        authors, fixtures, score1, score2, home, away = data.T
+        points = self.rule_set.score_batch(score1, score2, home, away)
+        exact = (score1 == home) & (score2 == away)
+        correct = (np.sign(score1 - score2) == np.sign(home - away)) & ~exact
+
+        users, index = np.unique(authors, return_inverse=True)
+        totals = np.stack([
+            np.bincount(index, weights=points, minlength=len(users)),
+            np.bincount(index, weights=exact, minlength=len(users)),
+            np.bincount(index, weights=correct, minlength=len(users)),
+            np.bincount(index, minlength=len(users))
+        ], axis=1).astype(np.int64)
+
+        live = {int(user): tuple(int(v) for v in total) for user, total in zip(users, totals)}
+        return live, len(np.unique(fixtures))
+
+    @staticmethod
+    def _rank(entries: List[Dict]) -> List[Dict]:
+        """Order by points then exact hits, with tied entries sharing a rank"""
+        entries.sort(key=lambda e: (-e['points'], -e['exact_hits'], e['username']))
+        previous = None
+        for position, entry in enumerate(entries, start=1):
+            key = (entry['points'], entry['exact_hits'])
+            if key != previous:
+                rank = position
+                previous = key
+            entry['rank'] = rank
+            entry['movement'] = entry['settled_rank'] - rank if entry['settled_rank'] else None
+        return entries
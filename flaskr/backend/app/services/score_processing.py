@@ -2,13 +2,31 @@ from datetime import datetime, timezone
 from typing import List, Dict
 from flask import current_app
 from app.models import (
-    Fixture, UserPredictions, UserResults, db, 
-    MatchStatus, PredictionStatus, Group
+    Fixture, UserPredictions, db,
+    MatchStatus, PredictionStatus
 )
+from app.services.settlement_service import SettlementService
+from app.services.settlement_dispatcher import SettlementDispatcher
+from app.services.live_delta import LiveDeltaTracker
+from app.services.fixture_decoder import decode_fixture
+from app.services.cache_service import CacheService
+from app.services.provisional_standings import ProvisionalStandingsService
+from app.services.points_audit import PointsAuditService
+from app.services.incremental_verification import IncrementalVerificationService
 
 class ScoreProcessingService:
     def __init__(self, football_api_service):
         self.api = football_api_service
+        self.settlement = SettlementService()
+        self.dispatcher = SettlementDispatcher(
+            self.settlement,
+            max_workers=current_app.config.get('SETTLEMENT_WORKERS', 4)
+        )
+        cache = CacheService()
+        self.live_tracker = LiveDeltaTracker(
+            cache if current_app.config.get('LIVE_STATE_BACKEND', 'redis') == 'redis' else None
+        )
+        self.provisional = ProvisionalStandingsService(cache, self.settlement.rule_set)
 
     def process_live_matches(self, league_id: int):
         """Process all live matches for a league"""
@@ -18,64 +36,89 @@ class ScoreProcessingService:
             if not live_matches:
                 current_app.logger.info(f"No live matches found for league {league_id}")
                 return
-                
-            for match in live_matches:
-                try:
-                    fixture = Fixture.query.filter_by(
-                        fixture_id=match['fixture']['id']
-                    ).first()
-                    
-                    if not fixture:
-                        current_app.logger.warning(f"Fixture not found: {match['fixture']['id']}")
-                        continue
-                        
-                    self.update_fixture_status(fixture, match)
-                    
-                    # Check for match completion
-                    if match['fixture']['status']['short'] in ['FT', 'AET', 'PEN', 'Match Finished']:
-                        self.process_final_score(fixture, match)
-                        
-                except Exception as e:
-                    current_app.logger.error(f"Error processing match {match.get('fixture', {}).get('id')}: {str(e)}")
-                    continue
+
+            return self._apply_live_matches(live_matches)
                     
         except Exception as e:
             current_app.logger.error(f"Error processing live matches: {str(e)}")
             raise
 
+    def process_all_live_matches(self, league_ids: List[int]) -> Dict:
+        """Process live matches for several leagues from a single API request"""
+        try:
+            live_matches = self.api.get_live_fixtures_for_leagues(league_ids)
+            if live_matches is None:
+                raise RuntimeError("Live fixtures request failed")
+
+            by_league = {league_id: [] for league_id in league_ids}
+            for match in live_matches:
+                league_id = match.get('league', {}).get('id')
+                if league_id in by_league:
+                    by_league[league_id].append(match)
+                else:
+                    current_app.logger.warning(
+                        f"Ignoring live match {match.get('fixture', {}).get('id')} from league {league_id}"
+                    )
+
+            counts = {league_id: len(matches) for league_id, matches in by_league.items()}
+            current_app.logger.info(f"Live matches per league: {counts}")
+
+            matches = [match for league_matches in by_league.values() for match in league_matches]
+            if not matches:
+                return {'leagues': counts, 'changed': 0, 'settlement': None}
+
+            return dict(self._apply_live_matches(matches), leagues=counts)
+
+        except Exception as e:
+            current_app.logger.error(f"Error processing live matches: {str(e)}")
+            raise
+
+    def _apply_live_matches(self, live_matches: List[Dict]) -> Dict:
+        """Write live changes and settle finished fixtures for one poll"""
+        # Write only the fixtures whose live state changed, in one commit
+        changes = self.live_tracker.apply(live_matches)
+
+        finished = []
+        for match in live_matches:
+            try:
+                record = decode_fixture(match, default_status=MatchStatus.LIVE)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if record.is_finished:
+                finished.append((record.fixture_id, record.home_goals, record.away_goals))
+
+        # Settle every fixture that finished in this poll together
+        settlement = self.dispatcher.dispatch(finished)
+
+        # Refresh provisional leaderboards only where a score or status moved
+        moved = {
+            change['fixture_id'] for change in changes
+            if {'status', 'home_score', 'away_score'} & set(change['changes'])
+        }
+        moved.update(job[0] for job in finished)
+        self.provisional.refresh_fixtures(moved)
+
+        return {
+            'changed': len(changes),
+            'settlement': settlement
+        }
+
     def update_fixture_status(self, fixture: Fixture, match_data: dict):
         """Update fixture status and scores"""
         try:
-            status_mapping = {
-                "1H": MatchStatus.FIRST_HALF,
-                "HT": MatchStatus.HALFTIME,
-                "2H": MatchStatus.SECOND_HALF,
-                "FT": MatchStatus.FINISHED,
-                "PEN": MatchStatus.PENALTY,
-                "AET": MatchStatus.EXTRA_TIME,
-                "LIVE": MatchStatus.LIVE,
-                "PST": MatchStatus.POSTPONED,
-                "CANC": MatchStatus.CANCELLED
-            }
-
-            api_status = match_data['fixture']['status']['short']
-            new_status = status_mapping.get(api_status, MatchStatus.LIVE)
+            record = decode_fixture(match_data, default_status=MatchStatus.LIVE)
+            new_status = record.status
 
             fixture.status = new_status
-            fixture.home_score = match_data['goals']['home'] if match_data['goals']['home'] is not None else fixture.home_score
-            fixture.away_score = match_data['goals']['away'] if match_data['goals']['away'] is not None else fixture.away_score
+            fixture.home_score = record.home_goals if record.home_goals is not None else fixture.home_score
+            fixture.away_score = record.away_goals if record.away_goals is not None else fixture.away_score
             fixture.last_checked = datetime.now(timezone.utc)
 
             # Add additional scores if available
-            if 'score' in match_data:
-                if 'halftime' in match_data['score']:
-                    fixture.halftime_score = f"{match_data['score']['halftime']['home']}-{match_data['score']['halftime']['away']}"
-                if 'fulltime' in match_data['score']:
-                    fixture.fulltime_score = f"{match_data['score']['fulltime']['home']}-{match_data['score']['fulltime']['away']}"
-                if 'extratime' in match_data['score']:
-                    fixture.extratime_score = f"{match_data['score']['extratime']['home']}-{match_data['score']['extratime']['away']}"
-                if 'penalty' in match_data['score']:
-                    fixture.penalty_score = f"{match_data['score']['penalty']['home']}-{match_data['score']['penalty']['away']}"
+            for period in ('halftime', 'fulltime', 'extratime', 'penalty'):
+                value = getattr(record, f"{period}_score")
+                if value is not None:
+                    setattr(fixture, f"{period}_score", value)
 
             db.session.commit()
             current_app.logger.info(
@@ -87,113 +130,22 @@ class ScoreProcessingService:
             current_app.logger.error(f"Error updating fixture status: {str(e)}")
             raise
 
-    def process_final_score(self, fixture: Fixture, match_data: dict):
+    def process_final_score(self, fixture: Fixture, match_data: dict) -> Dict:
         """Process final scores and update user points"""
         try:
-            predictions = UserPredictions.query.filter_by(
-                fixture_id=fixture.fixture_id,
-                prediction_status=PredictionStatus.LOCKED
-            ).all()
-
-            if not predictions:
-                current_app.logger.info(f"No unprocessed predictions found for fixture {fixture.fixture_id}")
-                return
-
-            for prediction in predictions:
-                try:
-                    points = self._calculate_points(
-                        prediction.score1,
-                        prediction.score2,
-                        match_data['goals']['home'],
-                        match_data['goals']['away']
-                    )
-
-                    # Update prediction
-                    prediction.points = points
-                    prediction.prediction_status = PredictionStatus.PROCESSED
-                    prediction.processed_at = datetime.now(timezone.utc)
-
-                    # Get user's leagues and update points
-                    user_leagues = Group.query.join(
-                        Group.member_roles
-                    ).filter(
-                        Group.member_roles.any(user_id=prediction.author_id)
-                    ).all()
-
-                    # Update user season results
-                    user_result = UserResults.query.filter_by(
-                        author_id=prediction.author_id,
-                        season=fixture.season
-                    ).first()
-
-                    if not user_result:
-                        user_result = UserResults(
-                            author_id=prediction.author_id,
-                            points=0,
-                            season=fixture.season
-                        )
-                        db.session.add(user_result)
-
-                    user_result.points += points
-
-                    # Update league tables
-                    for league in user_leagues:
-                        self._update_league_table(league.id, prediction.author_id, points)
-
-                    current_app.logger.info(
-                        f"Updated points for user {prediction.author_id}: +{points} points "
-                        f"(Fixture: {fixture.fixture_id})"
-                    )
-
-                except Exception as e:
-                    current_app.logger.error(
-                        f"Error processing prediction for user {prediction.author_id}: {str(e)}"
-                    )
-                    continue
-
-            db.session.commit()
-            current_app.logger.info(f"Processed final score for fixture {fixture.fixture_id}")
-            
+            return self.settlement.settle_fixture(
+                fixture,
+                match_data['goals']['home'],
+                match_data['goals']['away']
+            )
         except Exception as e:
-            db.session.rollback()
             current_app.logger.error(f"Error processing final score: {str(e)}")
             raise
 
     def _calculate_points(self, pred_home: int, pred_away: int, 
                          actual_home: int, actual_away: int) -> int:
         """Calculate prediction points"""
-        # Exact score match
-        if pred_home == actual_home and pred_away == actual_away:
-            return 3
-            
-        # Correct result but wrong score
-        pred_result = pred_home - pred_away
-        actual_result = actual_home - actual_away
-        if (pred_result > 0 and actual_result > 0) or \
-           (pred_result < 0 and actual_result < 0) or \
-           (pred_result == 0 and actual_result == 0):
-            return 1
-            
-        return 0
-
-    def _update_league_table(self, league_id: int, user_id: int, points: int) -> None:
-        """Update league table with new points"""
-        try:
-            league = Group.query.get(league_id)
-            if not league:
-                return
-
-            # Update user's points in the league
-            member = next((m for m in league.member_roles if m.user_id == user_id), None)
-            if member:
-                member.points = (member.points or 0) + points
-                current_app.logger.info(
-                    f"Updated league table for user {user_id} in league {league_id}: +{points} points"
-                )
-
-        except Exception as e:
-            current_app.logger.error(f"Error updating league table: {str(e)}")
-            raise
+        return self.settlement.rule_set.points_for(pred_home, pred_away, actual_home, actual_away)
 
     def get_live_scores(self, league_id: int) -> List[Dict]:
         """Get current live scores for a league"""
@@ -227,11 +179,15 @@ class ScoreProcessingService:
             current_app.logger.error(f"Error getting live scores: {str(e)}")
             return []
 
-    def recover_failed_processing(self):
+    def recover_failed_processing(self, incremental: bool = True):
         """Recover any matches that failed to process properly"""
         try:
+            verifier = self._verifier()
+            started_at = datetime.utcnow()
+            watermark = verifier.scan_from(verifier.RECOVERY_TASK) if incremental else None
+
             # Find matches that might have failed processing
-            potential_failed_matches = Fixture.query.filter(
+            query = Fixture.query.filter(
                 Fixture.status.in_([
                     MatchStatus.FINISHED,
                     MatchStatus.FINISHED_AET,
@@ -242,89 +198,66 @@ class ScoreProcessingService:
                 Fixture.predictions.any(
                     UserPredictions.prediction_status != PredictionStatus.PROCESSED
                 )
-            ).all()
+            )
+            if watermark is not None:
+                # Only fixtures that finished or changed since the last run
+                query = query.filter(Fixture.last_updated >= watermark)
+            potential_failed_matches = query.all()
+
+            # Get latest match data for every candidate in batched requests
+            details = self.api.get_fixtures_details([f.fixture_id for f in potential_failed_matches])
 
+            failed = []
+            jobs = []
             for fixture in potential_failed_matches:
                 try:
                     current_app.logger.info(f"Attempting to recover processing for match {fixture.fixture_id}")
                     
-                    # Get latest match data
-                    match_data = self.api.get_fixture_details(fixture.fixture_id)
+                    match_data = details.get(fixture.fixture_id)
                     if not match_data:
+                        failed.append(fixture)
                         continue
 
-                    # Reprocess the match
-                    self.process_final_score(fixture, match_data)
-                    
-                    current_app.logger.info(f"Successfully recovered match {fixture.fixture_id}")
+                    jobs.append((fixture.fixture_id, match_data['goals']['home'], match_data['goals']['away']))
                     
                 except Exception as e:
                     current_app.logger.error(f"Failed to recover match {fixture.fixture_id}: {str(e)}")
+                    failed.append(fixture)
                     continue
 
+            # Reprocess the matches
+            report = self.dispatcher.dispatch(jobs)
+            failed_ids = set(report['failed'])
+            failed.extend(f for f in potential_failed_matches if f.fixture_id in failed_ids)
+
+            # Keep the watermark at the oldest failure so it is retried next run
+            verifier.set_watermark(
+                verifier.RECOVERY_TASK,
+                min([started_at] + [f.last_updated for f in failed if f.last_updated])
+            )
+            db.session.commit()
+
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Error in recovery process: {str(e)}")
             raise
 
-    def verify_points_and_tables(self):
+    def verify_points_and_tables(self, full: bool = False) -> Dict:
         """Verify all points and league tables are correct"""
         try:
-            # Get all completed matches
-            completed_matches = Fixture.query.filter(
-                Fixture.status.in_([
-                    MatchStatus.FINISHED,
-                    MatchStatus.FINISHED_AET,
-                    MatchStatus.FINISHED_PEN
-                ])
-            ).all()
-
-            for fixture in completed_matches:
-                # Get all processed predictions
-                predictions = UserPredictions.query.filter_by(
-                    fixture_id=fixture.fixture_id,
-                    prediction_status=PredictionStatus.PROCESSED
-                ).all()
-
-                for prediction in predictions:
-                    # Recalculate points
-                    expected_points = self._calculate_points(
-                        prediction.score1,
-                        prediction.score2,
-                        fixture.home_score,
-                        fixture.away_score
-                    )
-
-                    # Check if points match
-                    if prediction.points != expected_points:
-                        current_app.logger.warning(
-                            f"Points mismatch for prediction {prediction.id}: "
-                            f"has {prediction.points}, should be {expected_points}"
-                        )
-                        # Update points
-                        prediction.points = expected_points
-                        db.session.commit()
-
-            # Verify league tables
-            groups = Group.query.all()
-            for group in groups:
-                user_points = {}
-                for member in group.member_roles:
-                    total_points = sum(
-                        pred.points for pred in member.user.predictions 
-                        if pred.prediction_status == PredictionStatus.PROCESSED
-                    )
-                    user_points[member.user_id] = total_points
-
-                    # Update if there's a mismatch
-                    if member.points != total_points:
-                        current_app.logger.warning(
-                            f"Points mismatch in group {group.id} for user {member.user_id}: "
-                            f"has {member.points}, should be {total_points}"
-                        )
-                        member.points = total_points
-                        db.session.commit()
+            verifier = self._verifier()
+            if full:
+                return verifier.auditor.run()
+            return verifier.verify()
 
         except Exception as e:
             current_app.logger.error(f"Error in verification process: {str(e)}")
-            db.session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+    def _verifier(self) -> IncrementalVerificationService:
+        auditor = PointsAuditService(
+            rule_set_name=self.settlement.rule_set.name,
+            chunk_size=current_app.config.get('POINTS_AUDIT_CHUNK_SIZE', 5000),
+            workers=current_app.config.get('POINTS_AUDIT_WORKERS', 0)
+        )
+        return IncrementalVerificationService(auditor)
@@ -0,0 +1,150 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import current_app, has_app_context
+from sqlalchemy import and_, func
+import numpy as np
+
+# Lookup tables cover 0..MAX_TABLE_GOALS goals per side; anything larger is
+# evaluated directly from the rules.
+MAX_TABLE_GOALS = 10
+
+
+def _sign(values):
+    return np.sign(np.asarray(values, dtype=np.int16))
+
+
+class ScoringRule(ABC):
+    """Base class for a scoring rule evaluated on (broadcastable) score arrays"""
+
+    def __init__(self, points: int):
+        self.points = points
+
+    @abstractmethod
+    def matches(self, pred_home, pred_away, actual_home, actual_away) -> np.ndarray:
+        """Boolean array, True where the rule applies"""
+
+    def evaluate(self, pred_home, pred_away, actual_home, actual_away) -> np.ndarray:
+        """Points awarded by this rule for each prediction"""
+        return np.where(self.matches(pred_home, pred_away, actual_home, actual_away), self.points, 0)
+
+
+class ExactScoreRule(ScoringRule):
+    def matches(self, pred_home, pred_away, actual_home, actual_away):
+        return (np.asarray(pred_home) == actual_home) & (np.asarray(pred_away) == actual_away)
+
+
+class CorrectResultRule(ScoringRule):
+    def matches(self, pred_home, pred_away, actual_home, actual_away):
+        return _sign(np.asarray(pred_home) - pred_away) == _sign(np.asarray(actual_home) - actual_away)
+
+
+class GoalDifferenceBonusRule(ScoringRule):
+    """Bonus for the right goal difference without the exact score"""
+
+    def matches(self, pred_home, pred_away, actual_home, actual_away):
+        same_difference = (np.asarray(pred_home) - pred_away) == (np.asarray(actual_home) - actual_away)
+        exact = ExactScoreRule(0).matches(pred_home, pred_away, actual_home, actual_away)
+        return same_difference & ~exact
+
+
+# SQL counterparts of the outcome categories, for counting exact scores and
+# correct results from prediction and fixture columns whatever the points
+def exact_score_clause(pred_home, pred_away, actual_home, actual_away):
+    """Condition matching ExactScoreRule"""
+    return and_(pred_home == actual_home, pred_away == actual_away)
+
+
+def correct_result_clause(pred_home, pred_away, actual_home, actual_away):
+    """Condition matching CorrectResultRule, exact scores included"""
+    return func.sign(pred_home - pred_away) == func.sign(actual_home - actual_away)
+
+
+class ScoringRuleSet:
+    """A compiled set of scoring rules.
+
+    Tier rules are mutually exclusive and the best matching tier wins;
+    bonus rules are added on top. The set is compiled into a dense table
+    indexed by (predicted home, predicted away, actual home, actual away)
+    so scoring a prediction, or a whole batch of them, is an array lookup.
+    """
+
+    def __init__(self, name: str, tiers: List[ScoringRule], bonuses: Optional[List[ScoringRule]] = None):
+        self.name = name
+        self.tiers = tiers
+        self.bonuses = bonuses or []
+        self.table = self._compile()
+
+    def _evaluate(self, pred_home, pred_away, actual_home, actual_away) -> np.ndarray:
+        shape = np.broadcast(pred_home, pred_away, actual_home, actual_away).shape
+        points = np.zeros(shape, dtype=np.int16)
+        for rule in self.tiers:
+            points = np.maximum(points, rule.evaluate(pred_home, pred_away, actual_home, actual_away))
+        for rule in self.bonuses:
+            points = points + rule.evaluate(pred_home, pred_away, actual_home, actual_away)
+        return points
+
+    def _compile(self) -> np.ndarray:
+        size = MAX_TABLE_GOALS + 1
+        pred_home, pred_away, actual_home, actual_away = np.indices((size, size, size, size))
+        return self._evaluate(pred_home, pred_away, actual_home, actual_away).astype(np.int8)
+
+    def points_for(self, pred_home: int, pred_away: int, actual_home: int, actual_away: int) -> int:
+        """Points for a single prediction"""
+        if max(pred_home, pred_away, actual_home, actual_away) <= MAX_TABLE_GOALS:
+            return int(self.table[pred_home, pred_away, actual_home, actual_away])
+        return int(self._evaluate(pred_home, pred_away, actual_home, actual_away))
+
+    def score_batch(self, pred_home, pred_away, actual_home, actual_away) -> np.ndarray:
+        """Points for a batch of predictions given as equally sized arrays"""
+        arrays = np.broadcast_arrays(
+            np.asarray(pred_home, dtype=np.int64),
+            np.asarray(pred_away, dtype=np.int64),
+            np.asarray(actual_home, dtype=np.int64),
+            np.asarray(actual_away, dtype=np.int64)
+        )
+        in_table = np.all([a <= MAX_TABLE_GOALS for a in arrays], axis=0)
+        clipped = [np.minimum(a, MAX_TABLE_GOALS) for a in arrays]
+
+        points = self.table[tuple(clipped)].astype(np.int16)
+        if not in_table.all():
+            outside = ~in_table
+            points[outside] = self._evaluate(*(a[outside] for a in arrays))
+        return points
+
+    def points_for_pairs(self, pairs: Iterable[Tuple[int, int]],
+                         actual_home: int, actual_away: int) -> Dict[Tuple[int, int], int]:
+        """Points for each distinct predicted score of a single fixture"""
+        pairs = list(pairs)
+        if not pairs:
+            return {}
+        pred_home, pred_away = np.array(pairs, dtype=np.int64).T
+        points = self.score_batch(pred_home, pred_away, actual_home, actual_away)
+        return {pair: int(p) for pair, p in zip(pairs, points)}
+
+
+RULE_SET_DEFINITIONS = {
+    'standard': lambda: ScoringRuleSet(
+        'standard',
+        tiers=[ExactScoreRule(3), CorrectResultRule(1)]
+    ),
+    'goal_difference': lambda: ScoringRuleSet(
+        'goal_difference',
+        tiers=[ExactScoreRule(3), CorrectResultRule(1)],
+        bonuses=[GoalDifferenceBonusRule(1)]
+    ),
+}
+
+_compiled_rule_sets: Dict[str, ScoringRuleSet] = {}
+
+
+def get_rule_set(name: Optional[str] = None) -> ScoringRuleSet:
+    """Get a compiled rule set, defaulting to the SCORING_RULE_SET config value"""
+    if name is None:
+        name = current_app.config.get('SCORING_RULE_SET', 'standard') if has_app_context() else 'standard'
+
+    if name not in RULE_SET_DEFINITIONS:
+        raise ValueError(f"Unknown scoring rule set: {name}")
+
+    if name not in _compiled_rule_sets:
+        _compiled_rule_sets[name] = RULE_SET_DEFINITIONS[name]()
+    return _compiled_rule_sets[name]
@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from flask import Flask, current_app
+
+from app.models import Fixture
+from app.services.settlement_service import SettlementService
+
+# (fixture_id, home_goals, away_goals)
+SettlementJob = Tuple[int, int, int]
+
+
+class SettlementDispatcher:
+    """Settles many finished fixtures concurrently.
+
+    Each job runs on a pool thread inside its own application context, so
+    it gets its own scoped session and connection. Double settlement is
+    prevented by the per-fixture advisory lock taken in ``SettlementService``.
+    """
+
+    def __init__(self, settlement: Optional[SettlementService] = None, max_workers: int = 4):
+        self.settlement = settlement or SettlementService()
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='settlement')
+
+    def dispatch(self, jobs: List[SettlementJob]) -> Dict:
+        """Settle the given fixtures in parallel and report per-fixture timings"""
+        started = time.perf_counter()
+        report = {
+            'fixtures': len(jobs),
+            'settled': 0,
+            'skipped': 0,
+            'failed': [],
+            'predictions': 0,
+            'timings': {}
+        }
+        if not jobs:
+            report['elapsed_seconds'] = 0.0
+            return report
+
+        app = current_app._get_current_object()
+        queued_at = time.perf_counter()
+        futures = {
+            self._pool.submit(self._settle_one, app, job, queued_at): job[0]
+            for job in jobs
+        }
+
+        for future in as_completed(futures):
+            fixture_id = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                current_app.logger.error(f"Settlement worker failed for fixture {fixture_id}: {str(e)}")
+                report['failed'].append(fixture_id)
+                continue
+
+            if stats is None:
+                report['failed'].append(fixture_id)
+                continue
+            if stats['skipped']:
+                report['skipped'] += 1
+            else:
+                report['settled'] += 1
+                report['predictions'] += stats['predictions']
+            report['timings'][fixture_id] = {
+                'queued_seconds': stats['queued_seconds'],
+                'elapsed_seconds': stats.get('elapsed_seconds', 0.0),
+                'predictions': stats['predictions']
+            }
+
+        report['elapsed_seconds'] = round(time.perf_counter() - started, 4)
+        current_app.logger.info(
+            f"Settled {report['settled']}/{report['fixtures']} fixtures "
+            f"({report['predictions']} predictions, {report['skipped']} skipped, "
+            f"{len(report['failed'])} failed) in {report['elapsed_seconds']}s"
+        )
+        return report
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def _settle_one(self, app: Flask, job: SettlementJob, queued_at: float) -> Optional[Dict]:
+        fixture_id, home_goals, away_goals = job
+        with app.app_context():
+            queued_seconds = round(time.perf_counter() - queued_at, 4)
+            fixture = Fixture.query.filter_by(fixture_id=fixture_id).first()
+            if not fixture:
+                current_app.logger.warning(f"Fixture not found for settlement: {fixture_id}")
+                return None
+
+            stats = self.settlement.settle_fixture(fixture, home_goals, away_goals)
+            stats['queued_seconds'] = queued_seconds
+            return stats
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from flask import current_app
+from sqlalchemy import Integer, and_, column, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import (
+    db, Fixture, UserPredictions, UserResults, PredictionStatus
+)
+from app.services.scoring_rules import ScoringRuleSet, get_rule_set
+from app.services.analytics_rollup import AnalyticsRollupService
+from app.services.standings_service import StandingsService
+
+
+class SettlementService:
+    """Set-based settlement of every prediction for a finished fixture.
+
+    A fixture is settled with a fixed handful of statements regardless of
+    how many predictions it has: one UPDATE that scores and processes the
+    LOCKED predictions from the compiled scoring rule table, one upsert
+    into ``user_results`` and one delta upsert into ``group_standings``.
+    """
+
+    # First key of the transaction-level advisory lock held while a fixture
+    # is settled, so live monitoring and recovery never settle it twice
+    LOCK_NAMESPACE = 7301
+
+    def __init__(self, rule_set: Optional[ScoringRuleSet] = None):
+        self.rule_set = rule_set or get_rule_set()
+
+    def settle_fixture(self, fixture: Fixture, home_goals: int, away_goals: int) -> Dict:
+        """Score all LOCKED predictions for a fixture and report throughput"""
+        started = time.perf_counter()
+        try:
+            if not self._acquire_lock(fixture.fixture_id):
+                db.session.rollback()
+                current_app.logger.info(
+                    f"Fixture {fixture.fixture_id} is already being settled elsewhere, skipping"
+                )
+                return {'fixture_id': fixture.fixture_id, 'predictions': 0, 'skipped': True}
+
+            settled_ids = self._score_predictions(fixture, home_goals, away_goals)
+
+            if settled_ids:
+                self._upsert_user_results(fixture, settled_ids)
+                StandingsService.apply_settlement(fixture, settled_ids, home_goals, away_goals)
+                AnalyticsRollupService.apply_settlement(fixture, settled_ids, home_goals, away_goals)
+
+            db.session.commit()
+
+            elapsed = time.perf_counter() - started
+            stats = {
+                'fixture_id': fixture.fixture_id,
+                'predictions': len(settled_ids),
+                'elapsed_seconds': round(elapsed, 4),
+                'rows_per_second': round(len(settled_ids) / elapsed, 1) if elapsed > 0 else 0.0,
+                'skipped': False
+            }
+            current_app.logger.info(
+                f"Settled fixture {fixture.fixture_id}: {stats['predictions']} predictions "
+                f"in {stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)"
+            )
+
+            # The last settlement of a round refreshes its groups' cached analytics
+            warmer = current_app.config.get('ANALYTICS_WARMER')
+            if warmer is not None:
+                warmer.fixture_settled(fixture)
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error settling fixture {fixture.fixture_id}: {str(e)}")
+            raise
+
+    def _acquire_lock(self, fixture_id: int) -> bool:
+        """Take the per-fixture settlement lock for the current transaction"""
+        return bool(db.session.execute(
+            select(func.pg_try_advisory_xact_lock(self.LOCK_NAMESPACE, fixture_id))
+        ).scalar())
+
+    def _score_predictions(self, fixture: Fixture, home_goals: int, away_goals: int) -> list:
+        """Score and mark processed every LOCKED prediction in one UPDATE"""
+        locked = and_(
+            UserPredictions.fixture_id == fixture.fixture_id,
+            UserPredictions.prediction_status == PredictionStatus.LOCKED
+        )
+
+        # Score each distinct predicted scoreline once from the rule table and
+        # join the result back in as a VALUES list
+        pairs = db.session.execute(
+            select(UserPredictions.score1, UserPredictions.score2).where(locked).distinct()
+        ).all()
+        if not pairs:
+            return []
+
+        lookup = self.rule_set.points_for_pairs(
+            [(pair.score1, pair.score2) for pair in pairs], home_goals, away_goals
+        )
+        points_lut = values(
+            column('score1', Integer),
+            column('score2', Integer),
+            column('points', Integer),
+            name='points_lut'
+        ).data([(score1, score2, points) for (score1, score2), points in lookup.items()])
+
+        stmt = update(UserPredictions).where(
+            locked,
+            UserPredictions.score1 == points_lut.c.score1,
+            UserPredictions.score2 == points_lut.c.score2
+        ).values(
+            points=points_lut.c.points,
+            prediction_status=PredictionStatus.PROCESSED,
+            last_modified=datetime.utcnow()
+        ).returning(
+            UserPredictions.id
+        ).execution_options(synchronize_session=False)
+
+        return db.session.execute(stmt).scalars().all()
+
+    def _upsert_user_results(self, fixture: Fixture, settled_ids: list) -> None:
+        """Add the freshly scored points to each author's season total"""
+        source = select(
+            UserPredictions.author_id,
+            func.sum(UserPredictions.points),
+            literal(fixture.season)
+        ).where(
+            UserPredictions.id.in_(settled_ids)
+        ).group_by(
+            UserPredictions.author_id
+        )
+
+        stmt = insert(UserResults).from_select(['author_id', 'points', 'season'], source)
+        stmt = stmt.on_conflict_do_update(
+            constraint='_user_season_uc',
+            set_={'points': UserResults.points + stmt.excluded.points}
+        )
+        db.session.execute(stmt)
@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from flask import current_app
+
+# Deletes the lock only if it still holds this caller's token
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one.
+
+    Within a process, callers of a key already in flight wait for that call
+    and share its result. Across processes, the caller holding the Redis
+    lock for the key makes the call while the others poll ``lookup`` (the
+    shared response cache) for its result, making the call themselves only
+    if the lock is released or expires without one.
+    """
+
+    LOCK_PREFIX = 'single_flight'
+
+    def __init__(self, redis_client=None, lock_timeout: float = 30.0, poll_interval: float = 0.1):
+        self.redis = redis_client
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._release = redis_client.register_script(RELEASE_SCRIPT) if redis_client else None
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any], lookup: Optional[Callable[[], Any]] = None) -> Any:
+        """Run ``fn`` once for all concurrent callers of ``key``"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn, lookup)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_shared(self, key: str, fn: Callable[[], Any], lookup: Optional[Callable[[], Any]]) -> Any:
+        """Run ``fn`` under the cross-process lock, or wait for its holder's result"""
+        if self.redis is None or lookup is None:
+            return fn()
+
+        lock_key = f"{self.LOCK_PREFIX}:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+        except Exception as e:
+            current_app.logger.warning(f"Single-flight lock unavailable: {str(e)}")
+            return fn()
+
+        if acquired:
+            try:
+                return fn()
+            finally:
+                try:
+                    self._release(keys=[lock_key], args=[token])
+                except Exception as e:
+                    current_app.logger.warning(f"Error releasing single-flight lock: {str(e)}")
+
+        # Another process is making this call; wait for it to publish the result
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            result = lookup()
+            if result is not None:
+                return result
+            try:
+                if not self.redis.exists(lock_key):
+                    break
+            except Exception:
+                break
+
+        result = lookup()
+        return result if result is not None else fn()
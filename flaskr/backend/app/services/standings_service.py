@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import and_, case, delete, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import (
+    db, Fixture, UserPredictions, Users, Group, GroupStanding, PredictionStatus,
+    group_membership
+)
+from app.services.scoring_rules import correct_result_clause, exact_score_clause
+
+
+class StandingsService:
+    """Maintains the materialized ``group_standings`` table.
+
+    Settlement applies a per-fixture delta, the audit rebuilds drifted rows,
+    and leaderboard reads are a single range scan on (group, season, rank).
+    """
+
+    @staticmethod
+    def apply_settlement(fixture: Fixture, settled_ids: List[int],
+                         home_goals: int, away_goals: int) -> None:
+        """Add the freshly settled predictions of a fixture to every group of its league"""
+        actual = (literal(home_goals), literal(away_goals))
+        exact = exact_score_clause(UserPredictions.score1, UserPredictions.score2, *actual)
+        correct = correct_result_clause(UserPredictions.score1, UserPredictions.score2, *actual)
+
+        members = group_membership()
+        delta = select(
+            members.c.group_id,
+            UserPredictions.author_id,
+            literal(fixture.season),
+            UserPredictions.points,
+            case((exact, 1), else_=0),
+            case((and_(correct, ~exact), 1), else_=0),
+            literal(1)
+        ).join(
+            members, members.c.user_id == UserPredictions.author_id
+        ).join(
+            Group, Group.id == members.c.group_id
+        ).where(
+            Group.league == fixture.league,
+            UserPredictions.id.in_(settled_ids)
+        )
+
+        stmt = insert(GroupStanding).from_select(
+            ['group_id', 'user_id', 'season', 'points', 'exact_hits', 'correct_results', 'predictions'],
+            delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint='_group_standing_uc',
+            set_={
+                'points': GroupStanding.points + stmt.excluded.points,
+                'exact_hits': GroupStanding.exact_hits + stmt.excluded.exact_hits,
+                'correct_results': GroupStanding.correct_results + stmt.excluded.correct_results,
+                'predictions': GroupStanding.predictions + stmt.excluded.predictions,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        db.session.execute(stmt)
+
+        members = group_membership()
+        affected_groups = select(members.c.group_id).join(
+            Group, Group.id == members.c.group_id
+        ).where(
+            Group.league == fixture.league,
+            members.c.user_id.in_(
+                select(UserPredictions.author_id).where(UserPredictions.id.in_(settled_ids))
+            )
+        )
+        StandingsService.rerank(affected_groups, fixture.season)
+
+    @staticmethod
+    def rebuild(group_ids: Optional[List[int]] = None) -> int:
+        """Recompute standings from processed predictions, writing only drifted rows.
+
+        Rows of users who have left a group are deleted and counted as fixed.
+        """
+        if group_ids is not None and not group_ids:
+            return 0
+
+        scores = (UserPredictions.score1, UserPredictions.score2, Fixture.home_score, Fixture.away_score)
+        exact = exact_score_clause(*scores)
+        correct = correct_result_clause(*scores)
+
+        members = group_membership()
+        totals = select(
+            members.c.group_id,
+            UserPredictions.author_id,
+            Fixture.season,
+            func.sum(UserPredictions.points),
+            func.sum(case((exact, 1), else_=0)),
+            func.sum(case((and_(correct, ~exact), 1), else_=0)),
+            func.count(UserPredictions.id)
+        ).select_from(
+            members
+        ).join(
+            Group, Group.id == members.c.group_id
+        ).join(
+            UserPredictions, UserPredictions.author_id == members.c.user_id
+        ).join(
+            Fixture,
+            and_(
+                Fixture.fixture_id == UserPredictions.fixture_id,
+                Fixture.league == Group.league
+            )
+        ).where(
+            UserPredictions.prediction_status == PredictionStatus.PROCESSED
+        ).group_by(
+            members.c.group_id, UserPredictions.author_id, Fixture.season
+        )
+        if group_ids is not None:
+            totals = totals.where(members.c.group_id.in_(group_ids))
+
+        stmt = insert(GroupStanding).from_select(
+            ['group_id', 'user_id', 'season', 'points', 'exact_hits', 'correct_results', 'predictions'],
+            totals
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint='_group_standing_uc',
+            set_={
+                'points': stmt.excluded.points,
+                'exact_hits': stmt.excluded.exact_hits,
+                'correct_results': stmt.excluded.correct_results,
+                'predictions': stmt.excluded.predictions,
+                'updated_at': datetime.utcnow()
+            },
+            where=or_(
+                GroupStanding.points != stmt.excluded.points,
+                GroupStanding.exact_hits != stmt.excluded.exact_hits,
+                GroupStanding.correct_results != stmt.excluded.correct_results,
+                GroupStanding.predictions != stmt.excluded.predictions
+            )
+        ).returning(GroupStanding.id)
+
+        fixed = len(db.session.execute(stmt).scalars().all())
+
+        members = group_membership()
+        departed = delete(GroupStanding).where(
+            ~exists().where(
+                members.c.group_id == GroupStanding.group_id,
+                members.c.user_id == GroupStanding.user_id
+            )
+        ).execution_options(synchronize_session=False)
+        if group_ids is not None:
+            departed = departed.where(GroupStanding.group_id.in_(group_ids))
+        fixed += db.session.execute(departed).rowcount
+
+        if fixed:
+            StandingsService.rerank(group_ids if group_ids is not None else select(GroupStanding.group_id))
+        return fixed
+
+    @staticmethod
+    def rerank(group_ids, season: Optional[str] = None) -> None:
+        """Recompute ranks for the given groups (a list or a subquery of ids)"""
+        ranked = select(
+            GroupStanding.id,
+            func.rank().over(
+                partition_by=(GroupStanding.group_id, GroupStanding.season),
+                order_by=(GroupStanding.points.desc(), GroupStanding.exact_hits.desc())
+            ).label('rank')
+        ).where(
+            GroupStanding.group_id.in_(group_ids)
+        )
+        if season is not None:
+            ranked = ranked.where(GroupStanding.season == season)
+        ranked = ranked.subquery()
+
+        db.session.execute(
+            update(GroupStanding).where(
+                GroupStanding.id == ranked.c.id,
+                GroupStanding.rank.is_distinct_from(ranked.c.rank)
+            ).values(
+                rank=ranked.c.rank
+            ).execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def get_leaderboard(group_id: int, season: Optional[str] = None,
+                        limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get a group's standings in rank order, defaulting to its latest season"""
+        try:
+            if season is None:
+                season_filter = GroupStanding.season == select(
+                    func.max(GroupStanding.season)
+                ).where(
+                    GroupStanding.group_id == group_id
+                ).scalar_subquery()
+            else:
+                season_filter = GroupStanding.season == season
+
+            query = db.session.query(
+                GroupStanding, Users.username
+            ).join(
+                Users, Users.id == GroupStanding.user_id
+            ).filter(
+                GroupStanding.group_id == group_id,
+                season_filter
+            ).order_by(
+                GroupStanding.rank, Users.username
+            ).offset(offset)
+            if limit:
+                query = query.limit(limit)
+
+            return [{
+                'rank': standing.rank,
+                'user_id': standing.user_id,
+                'username': username,
+                'season': standing.season,
+                'points': standing.points,
+                'exact_hits': standing.exact_hits,
+                'correct_results': standing.correct_results,
+                'predictions': standing.predictions
+            } for standing, username in query.all()]
+
+        except Exception as e:
+            current_app.logger.error(f"Error getting group standings: {str(e)}")
+            return []
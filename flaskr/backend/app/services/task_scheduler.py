@@ -54,7 +54,15 @@ class TaskScheduler:
     def schedule_verification_tasks(self):
         """Schedule verification tasks"""
         try:
-            # Schedule points verification (daily)
+            # Schedule incremental points verification (every few minutes)
+            self.eventbridge.put_rule(
+                Name='incremental-points-verification',
+                ScheduleExpression='rate(5 minutes)',
+                State='ENABLED',
+                Description='Verify points and league tables changed since the last run'
+            )
+
+            # Schedule full points verification (daily)
             self.eventbridge.put_rule(
                 Name='daily-points-verification',
                 ScheduleExpression='rate(1 day)',
@@ -62,26 +70,35 @@ class TaskScheduler:
                 Description='Verify all points and league tables daily'
             )
 
-            # Schedule failed processing recovery (hourly)
+            # Schedule failed processing recovery (every few minutes)
             self.eventbridge.put_rule(
-                Name='hourly-processing-recovery',
-                ScheduleExpression='rate(1 hour)',
+                Name='processing-recovery',
+                ScheduleExpression='rate(5 minutes)',
                 State='ENABLED',
                 Description='Recover any failed match processing'
             )
 
             # Add targets
+            self.eventbridge.put_targets(
+                Rule='incremental-points-verification',
+                Targets=[{
+                    'Id': 'VerifyPointsIncremental',
+                    'Arn': current_app.config['VERIFICATION_LAMBDA_ARN'],
+                    'Input': '{"task": "verify_points_and_tables"}'
+                }]
+            )
+
             self.eventbridge.put_targets(
                 Rule='daily-points-verification',
                 Targets=[{
                     'Id': 'VerifyPoints',
                     'Arn': current_app.config['VERIFICATION_LAMBDA_ARN'],
-                    'Input': '{"task": "verify_points_and_tables"}'
+                    'Input': '{"task": "verify_points_and_tables", "full": true}'
                 }]
             )
 
             self.eventbridge.put_targets(
-                Rule='hourly-processing-recovery',
+                Rule='processing-recovery',
                 Targets=[{
                     'Id': 'RecoverProcessing',
                     'Arn': current_app.config['RECOVERY_LAMBDA_ARN'],
@@ -89,12 +106,24 @@ class TaskScheduler:
                 }]
             )
 
+            # Recovery used to run hourly under another rule; drop it so it doesn't run twice
+            self._retire_rule('hourly-processing-recovery', ['RecoverProcessing'])
+
             current_app.logger.info("Successfully scheduled verification tasks")
 
         except Exception as e:
             current_app.logger.error(f"Error scheduling verification tasks: {str(e)}")
             raise
 
+    def _retire_rule(self, name, target_ids):
+        """Remove a rule that is no longer scheduled, along with its targets"""
+        try:
+            self.eventbridge.remove_targets(Rule=name, Ids=target_ids)
+            self.eventbridge.delete_rule(Name=name)
+            current_app.logger.info(f"Removed retired EventBridge rule {name}")
+        except self.eventbridge.exceptions.ResourceNotFoundException:
+            pass
+
     async def execute_monitoring(self):
         """Execute the monitoring task"""
         try:
@@ -0,0 +1,101 @@
+"""Micro-benchmark: provider fixture decoding.
+
+Compares the nested-dict walking with strptime that ingestion used to do
+per fixture against ``fixture_decoder``, both from parsed payloads and
+straight from the response bytes.
+
+    python -m benchmarks.bench_fixture_decoding [--fixtures 380] [--repeat 20]
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from app.services.fixture_decoder import STATUS_BY_LONG, decode_fixture, decode_response
+
+STATUSES = [('FT', 'Match Finished'), ('NS', 'Not Started'), ('1H', 'First Half'), ('PST', 'Match Postponed')]
+
+
+def make_payload(count: int) -> bytes:
+    """A season-sized fixtures response shaped like the provider's"""
+    kickoff = datetime(2024, 8, 16, 19, 0)
+    response = []
+    for i in range(count):
+        short, long = STATUSES[i % len(STATUSES)]
+        finished = short == 'FT'
+        response.append({
+            'fixture': {
+                'id': 1000000 + i,
+                'referee': None,
+                'timezone': 'UTC',
+                'date': (kickoff + timedelta(hours=i * 7)).strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+                'timestamp': 1723834800 + i * 25200,
+                'venue': {'id': i % 20, 'name': f"Stadium {i % 20}", 'city': f"City {i % 20}"},
+                'status': {'long': long, 'short': short, 'elapsed': 90 if finished else None}
+            },
+            'league': {'id': 39, 'name': 'Premier League', 'country': 'England',
+                       'season': 2024, 'round': f"Regular Season - {i // 10 + 1}"},
+            'teams': {
+                'home': {'id': i % 20, 'name': f"Team {i % 20}", 'logo': f"https://logos/{i % 20}.png", 'winner': None},
+                'away': {'id': (i + 7) % 20, 'name': f"Team {(i + 7) % 20}", 'logo': f"https://logos/{(i + 7) % 20}.png", 'winner': None}
+            },
+            'goals': {'home': 2 if finished else None, 'away': 1 if finished else None},
+            'score': {
+                'halftime': {'home': 1 if finished else None, 'away': 0 if finished else None},
+                'fulltime': {'home': 2 if finished else None, 'away': 1 if finished else None},
+                'extratime': {'home': None, 'away': None},
+                'penalty': {'home': None, 'away': None}
+            }
+        })
+    return json.dumps({'get': 'fixtures', 'results': count, 'response': response}).encode()
+
+
+def legacy_decode(body: bytes) -> list:
+    """The per-fixture walk the ingestion paths used before the decoder"""
+    rows = []
+    for fixture_data in json.loads(body)['response']:
+        fixture_date = fixture_data['fixture']['date']
+        fixture_datetime = datetime.strptime(fixture_date, '%Y-%m-%dT%H:%M:%S%z')
+        rows.append({
+            'fixture_id': fixture_data['fixture']['id'],
+            'home_team': fixture_data['teams']['home']['name'],
+            'away_team': fixture_data['teams']['away']['name'],
+            'home_team_logo': fixture_data['teams']['home']['logo'],
+            'away_team_logo': fixture_data['teams']['away']['logo'],
+            'date': fixture_datetime,
+            'round': fixture_data['league']['round'],
+            'status': STATUS_BY_LONG.get(fixture_data['fixture']['status']['long']),
+            'home_score': fixture_data['goals']['home'] if fixture_data['goals']['home'] is not None else 0,
+            'away_score': fixture_data['goals']['away'] if fixture_data['goals']['away'] is not None else 0,
+            'venue_city': fixture_data['fixture']['venue']['city'],
+            'halftime_score': f"{fixture_data['score']['halftime']['home']}-{fixture_data['score']['halftime']['away']}",
+            'fulltime_score': f"{fixture_data['score']['fulltime']['home']}-{fixture_data['score']['fulltime']['away']}"
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', type=int, default=380)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_payload(args.fixtures)
+    parsed = json.loads(body)['response']
+    assert len(decode_response(body)) == len(legacy_decode(body)) == args.fixtures
+
+    cases = {
+        'legacy walk + strptime (bytes)': lambda: legacy_decode(body),
+        'decode_response (bytes)': lambda: decode_response(body),
+        'decode_fixture (parsed)': lambda: [decode_fixture(item) for item in parsed],
+    }
+    print(f"{args.fixtures} fixtures, best of {args.repeat}")
+    baseline = None
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"  {name:<34} {best * 1000:8.2f} ms  {args.fixtures / best:10.0f} fixtures/s  x{baseline / best:.2f}")
+
+
+if __name__ == '__main__':
+    main()
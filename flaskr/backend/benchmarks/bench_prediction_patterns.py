@@ -0,0 +1,127 @@
+"""Micro-benchmark: group prediction patterns.
+
+Compares the per-prediction Python loops the analytics patterns used to
+run (one pass per metric, a fixture lookup per prediction) against
+``AnalyticsEngine`` building columns from projection rows and computing
+every pattern in vectorized passes. Both run on the same synthetic rows,
+so the database is left out of the comparison.
+
+    python -m benchmarks.bench_prediction_patterns [--predictions 200000] [--repeat 5]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.analytics_engine import AnalyticsEngine
+
+
+def make_rows(count: int, seed: int = 7) -> list:
+    """(author, score1, score2, points, lead_seconds, home, away) rows"""
+    rng = random.Random(seed)
+    teams = [f"Team {i}" for i in range(20)]
+    rows = []
+    for _ in range(count):
+        home, away = rng.sample(teams, 2)
+        lead = None if rng.random() < 0.05 else rng.uniform(0, 72) * 3600
+        rows.append((rng.randrange(5000), rng.randrange(5), rng.randrange(4), rng.choice((0, 0, 1, 3)), lead, home, away))
+    return rows
+
+
+def as_predictions(rows: list) -> list:
+    """ORM-shaped objects for the legacy loops"""
+    kickoff = datetime(2024, 8, 16, 19, 0)
+    fixtures = {}
+    predictions = []
+    for author, score1, score2, points, lead, home, away in rows:
+        fixture = fixtures.setdefault((home, away), SimpleNamespace(home_team=home, away_team=away, date=kickoff))
+        predictions.append(SimpleNamespace(
+            author_id=author, score1=score1, score2=score2, points=points, fixture=fixture,
+            submission_time=None if lead is None else kickoff - timedelta(seconds=lead)
+        ))
+    return predictions
+
+
+def legacy_patterns(predictions: list) -> dict:
+    """The four separate passes of the original prediction pattern code"""
+    total = len(predictions)
+    home_wins_predicted = sum(1 for p in predictions if p.score1 > p.score2)
+    home_wins_correct = sum(1 for p in predictions if p.score1 > p.score2 and p.points > 0)
+    home_bias = {
+        'rate': round(home_wins_predicted / total * 100, 2),
+        'accuracy': round(home_wins_correct / home_wins_predicted * 100, 2) if home_wins_predicted else 0
+    }
+
+    scores = {}
+    for pred in predictions:
+        entry = scores.setdefault(f"{pred.score1}-{pred.score2}", {'count': 0, 'correct': 0})
+        entry['count'] += 1
+        if pred.points == 3:
+            entry['correct'] += 1
+    distribution = dict(sorted(scores.items(), key=lambda x: x[1]['count'], reverse=True)[:5])
+
+    team_stats = {}
+    for pred in predictions:
+        for team in (pred.fixture.home_team, pred.fixture.away_team):
+            entry = team_stats.setdefault(team, {'total': 0, 'correct': 0})
+            entry['total'] += 1
+            if pred.points > 0:
+                entry['correct'] += 1
+    teams = {
+        team: {'success_rate': round(s['correct'] / s['total'] * 100, 2), 'predictions': s['total']}
+        for team, s in team_stats.items()
+    }
+
+    brackets = {name: {'count': 0, 'correct': 0} for name in ('early', 'normal', 'late')}
+    for pred in predictions:
+        if not pred.submission_time:
+            continue
+        hours_before = (pred.fixture.date - pred.submission_time).total_seconds() / 3600
+        bracket = 'early' if hours_before > 24 else 'normal' if hours_before > 12 else 'late'
+        brackets[bracket]['count'] += 1
+        if pred.points > 0:
+            brackets[bracket]['correct'] += 1
+    timing = {
+        name: {'accuracy': round(s['correct'] / s['count'] * 100, 2) if s['count'] else 0, 'predictions': s['count']}
+        for name, s in brackets.items()
+    }
+
+    return {'home_bias': home_bias, 'score_distribution': distribution,
+            'success_by_team': teams, 'time_based_accuracy': timing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--predictions', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.predictions)
+    predictions = as_predictions(rows)
+    engine = AnalyticsEngine()
+
+    legacy = legacy_patterns(predictions)
+    columnar = engine.patterns(engine.columns(rows))
+    assert legacy['home_bias'] == columnar['home_bias']
+    assert legacy['success_by_team'] == columnar['success_by_team']
+    assert legacy['time_based_accuracy'] == columnar['time_based_accuracy']
+    assert {k: v['count'] for k, v in legacy['score_distribution'].items()} == \
+        {k: v['count'] for k, v in columnar['score_distribution'].items()}
+
+    cols = engine.columns(rows)
+    cases = {
+        'legacy loops (4 passes)': lambda: legacy_patterns(predictions),
+        'engine: rows -> columns + patterns': lambda: engine.patterns(engine.columns(rows)),
+        'engine: patterns on loaded columns': lambda: engine.patterns(cols),
+    }
+    print(f"{args.predictions} predictions, best of {args.repeat}")
+    baseline = None
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"  {name:<36} {best * 1000:9.2f} ms  x{baseline / best:.2f}")
+
+
+if __name__ == '__main__':
+    main()
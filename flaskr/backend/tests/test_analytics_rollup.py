@@ -0,0 +1,173 @@
+import pytest
+
+from app.models import (
+    GroupWeekParticipant, GroupWeekRollup, GroupWeekScorePair, PredictionStatus, Users, user_groups
+)
+from app.services.analytics_rollup import AnalyticsRollupService
+from app.services.analytics_service import AnalyticsService
+from app.services.scoring_rules import CorrectResultRule, ExactScoreRule, ScoringRuleSet
+from app.services.settlement_service import SettlementService
+
+
+@pytest.fixture
+def group(session, make_user, make_group, make_fixture, make_prediction):
+    """A group settled over two weeks; dave predicts but is not a member"""
+    alice, bob, carol, dave = (make_user(name) for name in ('alice', 'bob', 'carol', 'dave'))
+    group = make_group('Friends', alice, members=[alice, bob], api_members=[bob, carol])
+
+    results = {1001: (1, 2, 1), 1002: (1, 0, 0), 1003: (2, 1, 3)}
+    fixtures = {
+        fixture_id: make_fixture(fixture_id, week=week, home_score=home, away_score=away)
+        for fixture_id, (week, home, away) in results.items()
+    }
+    for user, fixture_id, score1, score2 in (
+        (alice, 1001, 2, 1), (alice, 1002, 1, 0), (alice, 1003, 0, 2),
+        (bob, 1001, 1, 0), (bob, 1003, 1, 3),
+        (carol, 1002, 0, 0),
+        (dave, 1001, 2, 1)
+    ):
+        make_prediction(user, fixtures[fixture_id], score1, score2)
+    session.commit()
+
+    settlement = SettlementService()
+    for fixture_id, (_, home, away) in results.items():
+        settlement.settle_fixture(fixtures[fixture_id], home, away)
+    return group
+
+
+def snapshot(session, group_id):
+    rollups = {
+        (r.season, r.week): (r.predictions, r.points, r.exact_hits, r.participants, r.home_predicted, r.home_correct)
+        for r in session.query(GroupWeekRollup).filter_by(group_id=group_id)
+    }
+    participants = {
+        (p.season, p.week, p.user_id)
+        for p in session.query(GroupWeekParticipant).filter_by(group_id=group_id)
+    }
+    pairs = {
+        (p.season, p.week, p.score1, p.score2): (p.predictions, p.exact_hits)
+        for p in session.query(GroupWeekScorePair).filter_by(group_id=group_id)
+    }
+    return rollups, participants, pairs
+
+
+def test_settlement_builds_weekly_rollups_of_members_only(session, group):
+    rollups, participants, _ = snapshot(session, group.id)
+
+    # (predictions, points, exact hits, participants, home wins predicted, of which scored)
+    assert rollups == {
+        ('2024', 1): (4, 7, 2, 3, 3, 2),
+        ('2024', 2): (2, 4, 1, 2, 0, 0)
+    }
+    assert len(participants) == 5
+
+
+def test_rebuild_matches_the_settlement_deltas(session, group):
+    settled = snapshot(session, group.id)
+
+    AnalyticsRollupService.rebuild([group.id])
+    session.commit()
+    assert snapshot(session, group.id) == settled
+
+    AnalyticsRollupService.rebuild()
+    session.commit()
+    assert snapshot(session, group.id) == settled
+
+
+def test_weeks_are_latest_first(session, group):
+    assert [(r.season, r.week) for r in AnalyticsRollupService.weeks(group.id)] == [('2024', 2), ('2024', 1)]
+    assert [r.week for r in AnalyticsRollupService.weeks(group.id, limit=1)] == [2]
+    assert AnalyticsRollupService.weeks(group.id, season='2023') == []
+
+
+def test_totals_sum_the_weeks(session, group):
+    assert AnalyticsRollupService.totals(group.id) == {
+        'predictions': 6,
+        'points': 11,
+        'exact_hits': 3,
+        'home_predicted': 3,
+        'home_correct': 2,
+        'participants': 3
+    }
+
+
+def test_totals_count_current_members_as_participants(session, group):
+    carol = Users.query.filter_by(username='carol').one()
+    session.execute(user_groups.delete().where(
+        user_groups.c.group_id == group.id,
+        user_groups.c.user_id == carol.id
+    ))
+    session.commit()
+
+    assert AnalyticsRollupService.totals(group.id)['participants'] == 2
+
+
+def test_backfill_covers_history_settled_before_the_first_rollup(session, make_user, make_group, make_fixture,
+                                                                make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    group = make_group('Friends', alice, members=[alice, bob])
+    # Settled before rollups existed: processed, but never added to them
+    earlier = make_fixture(1001, week=1, home_score=2, away_score=1)
+    make_prediction(alice, earlier, 2, 1, status=PredictionStatus.PROCESSED, points=3)
+    make_prediction(bob, earlier, 1, 0, status=PredictionStatus.PROCESSED, points=1)
+    later = make_fixture(1002, week=2, home_score=0, away_score=0)
+    make_prediction(alice, later, 0, 0)
+    session.commit()
+
+    SettlementService().settle_fixture(later, 0, 0)
+    assert AnalyticsRollupService.totals(group.id)['predictions'] == 1
+    assert not AnalyticsRollupService.is_built(group.id)
+
+    AnalyticsService()._ensure_rollups(group.id)
+
+    assert AnalyticsRollupService.is_built(group.id)
+    totals = AnalyticsRollupService.totals(group.id)
+    assert (totals['predictions'], totals['points'], totals['exact_hits']) == (3, 7, 2)
+
+
+def test_exact_hits_follow_the_scores_not_the_points(session, make_user, make_group, make_fixture,
+                                                     make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    group = make_group('Friends', alice, members=[alice, bob])
+    fixture = make_fixture(1001, home_score=2, away_score=1)
+    make_prediction(alice, fixture, 2, 1)
+    make_prediction(bob, fixture, 1, 0)
+    session.commit()
+
+    rule_set = ScoringRuleSet('generous', [ExactScoreRule(5), CorrectResultRule(3)])
+    SettlementService(rule_set=rule_set).settle_fixture(fixture, 2, 1)
+
+    settled = snapshot(session, group.id)
+    assert settled[0] == {('2024', 1): (2, 8, 1, 2, 2, 2)}
+    assert settled[2] == {('2024', 1, 2, 1): (1, 1), ('2024', 1, 1, 0): (1, 0)}
+
+    AnalyticsRollupService.rebuild([group.id])
+    session.commit()
+    assert snapshot(session, group.id) == settled
+
+
+def test_empty_group_totals(session, make_user, make_group):
+    alice = make_user('alice')
+    group = make_group('Empty', alice, members=[alice])
+    session.commit()
+
+    assert not AnalyticsRollupService.is_built(group.id)
+    assert AnalyticsRollupService.totals(group.id) == {
+        'predictions': 0,
+        'points': 0,
+        'exact_hits': 0,
+        'home_predicted': 0,
+        'home_correct': 0,
+        'participants': 0
+    }
+
+
+def test_score_distribution(session, group):
+    assert AnalyticsRollupService.score_distribution(group.id) == {
+        '1-0': {'count': 2, 'correct': 0},
+        '2-1': {'count': 1, 'correct': 1},
+        '0-0': {'count': 1, 'correct': 1},
+        '0-2': {'count': 1, 'correct': 0},
+        '1-3': {'count': 1, 'correct': 1}
+    }
+    assert list(AnalyticsRollupService.score_distribution(group.id, top=1)) == ['1-0']
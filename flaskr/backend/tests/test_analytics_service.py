@@ -0,0 +1,31 @@
+from app.services.analytics_service import AnalyticsService
+from app.services.settlement_service import SettlementService
+
+
+def test_numpy_engine_patterns_match_sql(app, session, make_user, make_group, make_fixture, make_prediction,
+                                         monkeypatch):
+    alice, bob = make_user('alice'), make_user('bob')
+    group = make_group('Friends', alice, members=[alice, bob])
+    results = {1001: (2, 1), 1002: (0, 0), 1003: (1, 3)}
+    fixtures = {fixture_id: make_fixture(fixture_id, home_score=home, away_score=away)
+                for fixture_id, (home, away) in results.items()}
+    for user, fixture_id, score1, score2 in (
+        (alice, 1001, 2, 1), (alice, 1002, 1, 0), (alice, 1003, 0, 2),
+        (bob, 1001, 1, 0), (bob, 1002, 0, 0)
+    ):
+        make_prediction(user, fixtures[fixture_id], score1, score2)
+    session.commit()
+
+    settlement = SettlementService()
+    for fixture_id, (home, away) in results.items():
+        settlement.settle_fixture(fixtures[fixture_id], home, away)
+
+    service = AnalyticsService()
+    service._ensure_rollups(group.id)
+    monkeypatch.setitem(app.config, 'ANALYTICS_ENGINE', 'sql')
+    from_sql = service._get_prediction_patterns(group.id)
+    monkeypatch.setitem(app.config, 'ANALYTICS_ENGINE', 'numpy')
+    from_numpy = service._get_prediction_patterns(group.id)
+
+    assert from_sql['home_bias'] == {'rate': 60.0, 'accuracy': 66.67}
+    assert from_numpy == from_sql
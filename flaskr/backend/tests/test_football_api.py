@@ -0,0 +1,52 @@
+import time
+
+import fakeredis
+import pytest
+from flask import Flask
+
+from app.services import football_api
+from app.services.football_api import FootballAPIService
+
+
+class FakeCacheService:
+    def __init__(self):
+        self.redis_client = fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(football_api, 'CacheService', FakeCacheService)
+    with Flask('tests').app_context():
+        api = FootballAPIService('key')
+        yield api
+        api._hedge_pool.shutdown()
+
+
+def cache_stale(api, endpoint, params, data):
+    """Store a response that went stale an hour ago"""
+    entry = {'data': data, 'etag': None, 'stored_at': time.time() - 3600, 'ttl': 10}
+    api.response_cache._write(api.response_cache.key(endpoint, params), entry)
+
+
+def open_circuit(api):
+    for _ in range(api.circuit_breaker.failure_threshold):
+        api.circuit_breaker.record_failure()
+
+
+def test_open_circuit_serves_no_stale_live_or_detail_data(api):
+    cache_stale(api, 'fixtures', {'league': 39, 'live': 'all'}, [{'fixture': {'id': 1}}])
+    cache_stale(api, 'fixtures', {'ids': '1-2'}, [{'fixture': {'id': 1}}])
+    open_circuit(api)
+
+    assert api.get_live_fixtures(39) is None
+    assert api.get_fixtures_by_ids([1, 2]) is None
+    assert api.api_metrics()['stale_served'] == 0
+
+
+def test_open_circuit_serves_stale_schedule_data(api):
+    fixtures = [{'fixture': {'id': 1}}]
+    cache_stale(api, 'fixtures', {'league': 39, 'season': 2024}, fixtures)
+    open_circuit(api)
+
+    assert api.get_fixtures_by_season(39, 2024) == fixtures
+    assert api.api_metrics()['stale_served'] == 1
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Fixture, MatchStatus, PredictionStatus, UserPredictions
+from app.services.fixture_ingestion import FixtureIngestionService
+from app.services.match_processing import MatchProcessingService
+
+LEAGUE_ID = 39
+
+
+def provider_fixture(fixture_id, status='NS', goals=(None, None), date='2024-09-14T15:00:00',
+                     round_name='Regular Season - 4', city='London'):
+    """A fixture as the provider returns it"""
+    return {
+        'fixture': {'id': fixture_id, 'date': date, 'status': {'short': status}, 'venue': {'city': city}},
+        'league': {'id': LEAGUE_ID, 'name': 'Premier League', 'season': 2024, 'round': round_name},
+        'teams': {'home': {'name': 'Arsenal', 'logo': None}, 'away': {'name': 'Chelsea', 'logo': None}},
+        'goals': {'home': goals[0], 'away': goals[1]},
+        'score': {}
+    }
+
+
+@pytest.fixture
+def service():
+    # The provider is only called by fetch_daily_matches, which these tests don't use
+    return MatchProcessingService(football_api=None)
+
+
+@pytest.fixture
+def window_start():
+    return datetime.utcnow().date() - timedelta(days=2)
+
+
+def test_stale_fixtures_are_unresolved_unchecked_fixtures_of_the_season(session, service, make_fixture,
+                                                                          window_start):
+    now = datetime.utcnow()
+    before_window = datetime.combine(window_start, datetime.min.time()) - timedelta(days=3)
+
+    def past(fixture_id, status=MatchStatus.POSTPONED, date=before_window, **fields):
+        return make_fixture(fixture_id, status=status, date=date, **fields)
+
+    past(1)
+    past(2, last_checked=now - timedelta(hours=30))
+    past(3, last_checked=now - timedelta(hours=1))
+    past(4, status=MatchStatus.FINISHED)
+    past(5, status=MatchStatus.CANCELLED)
+    past(6, season='2023')
+    past(7, competition_id=140)
+    past(8, date=now)
+    past(9, date=before_window - timedelta(days=7))
+    session.commit()
+
+    assert service._stale_fixture_ids(LEAGUE_ID, 2024, window_start) == [9, 1, 2]
+
+
+def test_stale_fixtures_are_capped(app, session, service, make_fixture, window_start, monkeypatch):
+    monkeypatch.setitem(app.config, 'DAILY_SYNC_STALE_LIMIT', 2)
+    for fixture_id in range(1, 5):
+        make_fixture(fixture_id, status=MatchStatus.POSTPONED, date=datetime(2024, 8, fixture_id))
+    session.commit()
+
+    assert service._stale_fixture_ids(LEAGUE_ID, 2024, window_start) == [1, 2]
+
+
+def test_daily_sync_writes_only_changed_fixtures(session, service):
+    matches = [provider_fixture(1), provider_fixture(2)]
+    assert service.apply_daily_matches(LEAGUE_ID, matches) == {'checked': 2, 'changed': 2, 'settled': 0}
+
+    matches[1] = provider_fixture(2, round_name='Regular Season - 5', city='Manchester',
+                                  date='2024-09-21T17:30:00')
+    assert service.apply_daily_matches(LEAGUE_ID, matches) == {'checked': 2, 'changed': 1, 'settled': 0}
+
+    moved = Fixture.query.filter_by(fixture_id=2).one()
+    assert (moved.round, moved.venue_city, moved.date) == (
+        'Regular Season - 5', 'Manchester', datetime(2024, 9, 21, 17, 30)
+    )
+
+
+def test_stored_hash_matches_the_stored_row(session, service):
+    service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1)])
+    service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1, round_name='Regular Season - 5', city='Leeds')])
+
+    fixture = Fixture.query.filter_by(fixture_id=1).one()
+    stored = {column: getattr(fixture, column) for column in (
+        'fixture_id', 'home_team', 'away_team', 'home_team_logo', 'away_team_logo', 'date', 'league',
+        'season', 'round', 'status', 'home_score', 'away_score', 'venue_city', 'competition_id',
+        'match_timestamp', 'halftime_score', 'fulltime_score'
+    )}
+    assert fixture.content_hash == FixtureIngestionService.content_hash(stored)
+
+
+def test_unchanged_fixtures_are_marked_checked(session, service):
+    service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1)])
+    checked_long_ago = datetime(2024, 1, 1)
+    Fixture.query.filter_by(fixture_id=1).update({'last_checked': checked_long_ago})
+    session.commit()
+
+    report = service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1)])
+
+    assert report['changed'] == 0
+    session.expire_all()
+    assert Fixture.query.filter_by(fixture_id=1).one().last_checked > checked_long_ago
+
+
+def test_newly_finished_fixtures_are_settled(session, service, make_user, make_prediction):
+    alice = make_user('alice')
+    service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1)])
+    prediction = make_prediction(alice, Fixture.query.filter_by(fixture_id=1).one(), 2, 1)
+    session.commit()
+
+    report = service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1, status='FT', goals=(2, 1))])
+    assert report == {'checked': 1, 'changed': 1, 'settled': 1}
+
+    session.expire_all()
+    prediction = UserPredictions.query.get(prediction.id)
+    assert (prediction.points, prediction.prediction_status) == (3, PredictionStatus.PROCESSED)
+
+    # Seeing the same final score again settles nothing
+    report = service.apply_daily_matches(LEAGUE_ID, [provider_fixture(1, status='FT', goals=(2, 1))])
+    assert report == {'checked': 1, 'changed': 0, 'settled': 0}
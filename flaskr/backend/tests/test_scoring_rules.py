@@ -0,0 +1,82 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.services.scoring_rules import MAX_TABLE_GOALS, RULE_SET_DEFINITIONS, ScoringRule, get_rule_set
+
+RULE_SETS = sorted(RULE_SET_DEFINITIONS)
+
+# Scores on both sides of the table edge
+EDGE_GOALS = [0, 1, 2, MAX_TABLE_GOALS - 1, MAX_TABLE_GOALS, MAX_TABLE_GOALS + 1, MAX_TABLE_GOALS + 5]
+
+
+@pytest.mark.parametrize('name', RULE_SETS)
+def test_table_matches_direct_evaluation(name):
+    rule_set = get_rule_set(name)
+    size = MAX_TABLE_GOALS + 1
+    expected = rule_set._evaluate(*np.indices((size, size, size, size)))
+    assert np.array_equal(rule_set.table, expected)
+
+
+@pytest.mark.parametrize('name', RULE_SETS)
+def test_points_for_matches_direct_evaluation_beyond_the_table(name):
+    rule_set = get_rule_set(name)
+    for scores in itertools.product(EDGE_GOALS, repeat=4):
+        assert rule_set.points_for(*scores) == int(rule_set._evaluate(*scores)), scores
+
+
+@pytest.mark.parametrize('name', RULE_SETS)
+def test_score_batch_matches_direct_evaluation_beyond_the_table(name):
+    rule_set = get_rule_set(name)
+    pred_home, pred_away, actual_home, actual_away = np.array(
+        list(itertools.product(EDGE_GOALS, repeat=4))
+    ).T
+
+    points = rule_set.score_batch(pred_home, pred_away, actual_home, actual_away)
+
+    assert np.array_equal(points, rule_set._evaluate(pred_home, pred_away, actual_home, actual_away))
+
+
+@pytest.mark.parametrize('scores, expected', [
+    ((2, 1, 2, 1), 3),
+    ((1, 0, 2, 1), 1),
+    ((1, 1, 0, 0), 1),
+    ((0, 2, 2, 1), 0),
+    ((12, 11, 12, 11), 3),
+    ((11, 0, 1, 0), 1),
+    ((0, 11, 1, 0), 0)
+])
+def test_standard_points(scores, expected):
+    assert get_rule_set('standard').points_for(*scores) == expected
+
+
+@pytest.mark.parametrize('scores, expected', [
+    ((2, 1, 2, 1), 3),
+    ((2, 0, 3, 1), 2),
+    ((1, 1, 0, 0), 2),
+    ((2, 0, 3, 0), 1),
+    ((11, 0, 12, 1), 2)
+])
+def test_goal_difference_points(scores, expected):
+    assert get_rule_set('goal_difference').points_for(*scores) == expected
+
+
+def test_points_for_pairs_scores_each_pair():
+    rule_set = get_rule_set('standard')
+    pairs = [(2, 1), (1, 0), (0, 0), (MAX_TABLE_GOALS + 2, 0)]
+    assert rule_set.points_for_pairs(pairs, 2, 1) == {(2, 1): 3, (1, 0): 1, (0, 0): 0, (MAX_TABLE_GOALS + 2, 0): 1}
+    assert rule_set.points_for_pairs([], 2, 1) == {}
+
+
+def test_unknown_rule_set():
+    with pytest.raises(ValueError):
+        get_rule_set('no_such_rules')
+
+
+def test_rules_must_implement_matches():
+    class Incomplete(ScoringRule):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(1)
@@ -0,0 +1,99 @@
+from sqlalchemy import text
+
+from app.db import upgrade_schema
+from app.models import UserPredictions, UserResults, PredictionStatus
+from app.services.settlement_service import SettlementService
+
+
+def season_totals(session):
+    return {(r.author_id, r.season): r.points for r in session.query(UserResults)}
+
+
+def test_settlement_scores_locked_predictions(session, make_user, make_fixture, make_prediction):
+    alice, bob, carol = make_user('alice'), make_user('bob'), make_user('carol')
+    fixture = make_fixture(1001)
+    exact = make_prediction(alice, fixture, 2, 1)
+    result = make_prediction(bob, fixture, 1, 0)
+    wrong = make_prediction(carol, fixture, 0, 2)
+    session.commit()
+
+    stats = SettlementService().settle_fixture(fixture, 2, 1)
+
+    assert stats['predictions'] == 3
+    assert not stats['skipped']
+    session.expire_all()
+    assert [(p.points, p.prediction_status) for p in (exact, result, wrong)] == [
+        (3, PredictionStatus.PROCESSED),
+        (1, PredictionStatus.PROCESSED),
+        (0, PredictionStatus.PROCESSED)
+    ]
+
+
+def test_settlement_leaves_unlocked_predictions_alone(session, make_user, make_fixture, make_prediction):
+    alice = make_user('alice')
+    fixture = make_fixture(1001)
+    editable = make_prediction(alice, fixture, 2, 1, status=PredictionStatus.EDITABLE)
+    session.commit()
+
+    stats = SettlementService().settle_fixture(fixture, 2, 1)
+
+    assert stats['predictions'] == 0
+    session.expire_all()
+    assert editable.prediction_status == PredictionStatus.EDITABLE
+    assert season_totals(session) == {}
+
+
+def test_settlement_accumulates_season_totals(session, make_user, make_fixture, make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    first, second = make_fixture(1001, week=1), make_fixture(1002, week=2)
+    make_prediction(alice, first, 2, 1)
+    make_prediction(bob, first, 0, 0)
+    make_prediction(alice, second, 1, 0)
+    make_prediction(bob, second, 1, 1)
+    session.commit()
+
+    settlement = SettlementService()
+    settlement.settle_fixture(first, 2, 1)
+    assert season_totals(session) == {(alice.id, '2024'): 3, (bob.id, '2024'): 0}
+
+    settlement.settle_fixture(second, 3, 0)
+    assert season_totals(session) == {(alice.id, '2024'): 4, (bob.id, '2024'): 0}
+
+
+def test_settling_a_fixture_twice_adds_nothing(session, make_user, make_fixture, make_prediction):
+    alice = make_user('alice')
+    fixture = make_fixture(1001)
+    make_prediction(alice, fixture, 2, 1)
+    session.commit()
+
+    settlement = SettlementService()
+    settlement.settle_fixture(fixture, 2, 1)
+    stats = settlement.settle_fixture(fixture, 2, 1)
+
+    assert stats['predictions'] == 0
+    assert season_totals(session) == {(alice.id, '2024'): 3}
+
+
+def test_schema_upgrade_merges_duplicate_season_totals(session, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    session.execute(text("ALTER TABLE user_results DROP CONSTRAINT _user_season_uc"))
+    session.add_all([
+        UserResults(author_id=alice.id, season='2024', points=5),
+        UserResults(author_id=alice.id, season='2024', points=3),
+        UserResults(author_id=alice.id, season='2023', points=2),
+        UserResults(author_id=bob.id, season='2024', points=1)
+    ])
+    session.commit()
+
+    upgrade_schema()
+    upgrade_schema()
+
+    assert sorted((r.author_id, r.season, r.points) for r in session.query(UserResults)) == [
+        (alice.id, '2023', 2),
+        (alice.id, '2024', 8),
+        (bob.id, '2024', 1)
+    ]
+    constraint = session.execute(
+        text("SELECT count(*) FROM pg_constraint WHERE conname = '_user_season_uc'")
+    ).scalar()
+    assert constraint == 1
@@ -0,0 +1,126 @@
+import pytest
+
+from app.models import GroupMember, GroupStanding, user_groups
+from app.services.scoring_rules import CorrectResultRule, ExactScoreRule, ScoringRuleSet
+from app.services.settlement_service import SettlementService
+from app.services.standings_service import StandingsService
+
+
+@pytest.fixture
+def league(session, make_user, make_group, make_fixture, make_prediction):
+    """Two settled fixtures and a group whose members are spread over both membership tables"""
+    alice, bob, carol, dave = (make_user(name) for name in ('alice', 'bob', 'carol', 'dave'))
+    group = make_group('Friends', alice, members=[alice, bob], api_members=[bob, carol])
+    other = make_group('Cup', alice, league='La Liga', members=[alice])
+
+    first = make_fixture(1001, week=1, home_score=2, away_score=1)
+    second = make_fixture(1002, week=2, home_score=1, away_score=1)
+    for user, (score1, score2) in zip((alice, bob, carol, dave), ((2, 1), (1, 0), (0, 0), (2, 1))):
+        make_prediction(user, first, score1, score2)
+    for user, (score1, score2) in zip((alice, bob, carol), ((0, 1), (1, 1), (1, 1))):
+        make_prediction(user, second, score1, score2)
+    session.commit()
+
+    settlement = SettlementService()
+    settlement.settle_fixture(first, 2, 1)
+    settlement.settle_fixture(second, 1, 1)
+    return group, other, (alice, bob, carol, dave)
+
+
+def standings(session, group_id):
+    rows = session.query(GroupStanding).filter_by(group_id=group_id).all()
+    return {
+        row.user_id: (row.points, row.exact_hits, row.correct_results, row.predictions, row.rank)
+        for row in rows
+    }
+
+
+def test_settlement_counts_members_from_both_tables_once(session, league):
+    group, other, (alice, bob, carol, dave) = league
+
+    assert standings(session, group.id) == {
+        alice.id: (3, 1, 0, 2, 2),
+        bob.id: (4, 1, 1, 2, 1),
+        carol.id: (3, 1, 0, 2, 2)
+    }
+    assert standings(session, other.id) == {}
+
+
+def test_settlement_deltas_match_a_rebuild(session, league):
+    group = league[0]
+    settled = standings(session, group.id)
+
+    assert StandingsService.rebuild() == 0
+    session.commit()
+    assert standings(session, group.id) == settled
+
+
+def test_rebuild_fixes_drifted_rows_and_reranks(session, league):
+    group, _, (alice, bob, carol, _) = league
+    session.query(GroupStanding).filter_by(group_id=group.id, user_id=carol.id).update({'points': 9})
+    StandingsService.rerank([group.id])
+    session.commit()
+    assert standings(session, group.id)[carol.id][4] == 1
+    assert standings(session, group.id)[bob.id][4] == 2
+    assert standings(session, group.id)[alice.id][4] == 3
+
+    assert StandingsService.rebuild([group.id]) == 1
+    session.commit()
+
+    assert standings(session, group.id) == {
+        alice.id: (3, 1, 0, 2, 2),
+        bob.id: (4, 1, 1, 2, 1),
+        carol.id: (3, 1, 0, 2, 2)
+    }
+
+
+def test_rebuild_drops_users_who_left_the_group(session, league):
+    group, _, (alice, bob, carol, _) = league
+    GroupMember.query.filter_by(group_id=group.id, user_id=bob.id).delete()
+    session.execute(user_groups.delete().where(
+        user_groups.c.group_id == group.id,
+        user_groups.c.user_id == bob.id
+    ))
+    session.commit()
+
+    assert StandingsService.rebuild([group.id]) == 1
+    session.commit()
+
+    assert standings(session, group.id) == {
+        alice.id: (3, 1, 0, 2, 1),
+        carol.id: (3, 1, 0, 2, 1)
+    }
+
+
+def test_outcomes_follow_the_scores_not_the_points(session, make_user, make_group, make_fixture, make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    group = make_group('Friends', alice, members=[alice, bob])
+    fixture = make_fixture(1001, home_score=2, away_score=1)
+    make_prediction(alice, fixture, 2, 1)
+    make_prediction(bob, fixture, 1, 0)
+    session.commit()
+
+    rule_set = ScoringRuleSet('generous', [ExactScoreRule(5), CorrectResultRule(3)])
+    SettlementService(rule_set=rule_set).settle_fixture(fixture, 2, 1)
+
+    assert standings(session, group.id) == {
+        alice.id: (5, 1, 0, 1, 1),
+        bob.id: (3, 0, 1, 1, 2)
+    }
+    assert StandingsService.rebuild([group.id]) == 0
+
+
+def test_leaderboard_orders_by_rank_then_name(session, league):
+    group, _, (alice, bob, carol, _) = league
+    session.query(GroupStanding).filter_by(group_id=group.id, user_id=bob.id).update({'points': 5})
+    StandingsService.rerank([group.id])
+    session.commit()
+
+    leaderboard = StandingsService.get_leaderboard(group.id)
+
+    assert [(row['username'], row['rank'], row['points']) for row in leaderboard] == [
+        ('bob', 1, 5),
+        ('alice', 2, 3),
+        ('carol', 2, 3)
+    ]
+    assert [row['username'] for row in StandingsService.get_leaderboard(group.id, limit=1, offset=1)] == ['alice']